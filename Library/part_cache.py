@@ -0,0 +1,177 @@
+"""
+Persistent cache of normalized Digi-Key product records.
+
+Records are keyed by the stripped, upper-cased part number and stored in a
+small SQLite file next to this module (override with DIGIKEY_CACHE_PATH).
+Entries expire after a TTL, misses are remembered for a shorter negative
+TTL, and the table is kept under a size bound by evicting the least
+recently used rows.
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+
+CACHE_PATH = Path(os.getenv("DIGIKEY_CACHE_PATH") or Path(__file__).parent / "part_cache.sqlite3")
+DEFAULT_TTL = float(os.getenv("DIGIKEY_CACHE_TTL", str(7 * 24 * 3600)))
+DEFAULT_NEGATIVE_TTL = float(os.getenv("DIGIKEY_CACHE_NEGATIVE_TTL", str(24 * 3600)))
+DEFAULT_MAX_ENTRIES = int(os.getenv("DIGIKEY_CACHE_MAX_ENTRIES", "50000"))
+
+# SQLite's default limit on host parameters per statement is 999
+_CHUNK = 500
+
+
+def cache_key(part):
+    return part.strip().upper()
+
+
+class PartCache:
+    """Thread-safe on-disk cache: part number -> record (or a remembered miss)."""
+
+    def __init__(self, path=CACHE_PATH, ttl=DEFAULT_TTL, negative_ttl=DEFAULT_NEGATIVE_TTL,
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS parts ("
+            " key TEXT PRIMARY KEY,"
+            " record TEXT,"
+            " stored_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS parts_last_access ON parts (last_access)")
+        self._conn.commit()
+        self.counters = {"hits": 0, "negative_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _fresh(self, record, stored_at, now):
+        ttl = self.negative_ttl if record is None else self.ttl
+        return now - stored_at < ttl
+
+    def get_many(self, parts):
+        """Look up several part numbers at once.
+
+        Returns ``{key: record}`` for every cached key; ``record`` is None for
+        a remembered miss. Expired rows are dropped and left out.
+        """
+        keys = list(dict.fromkeys(cache_key(p) for p in parts))
+        now = time.time()
+        found = {}
+        expired = []
+        with self._lock:
+            for i in range(0, len(keys), _CHUNK):
+                chunk = keys[i:i + _CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT key, record, stored_at FROM parts WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, record, stored_at in rows:
+                    if record is not None:
+                        record = json.loads(record)
+                    if self._fresh(record, stored_at, now):
+                        found[key] = record
+                    else:
+                        expired.append(key)
+            self._conn.executemany("UPDATE parts SET last_access = ? WHERE key = ?", [(now, k) for k in found])
+            self._conn.executemany("DELETE FROM parts WHERE key = ?", [(k,) for k in expired])
+            self._conn.commit()
+            hits = sum(1 for r in found.values() if r is not None)
+            self.counters["hits"] += hits
+            self.counters["negative_hits"] += len(found) - hits
+            self.counters["misses"] += len(keys) - len(found)
+        return found
+
+    def get(self, part):
+        """Return ``(hit, record)``; ``(True, None)`` means a remembered miss."""
+        found = self.get_many([part])
+        key = cache_key(part)
+        return key in found, found.get(key)
+
+    def put_many(self, entries):
+        """Store ``(part, record)`` pairs; a ``None`` record caches a miss."""
+        now = time.time()
+        rows = [
+            (cache_key(part), None if record is None else json.dumps(record, ensure_ascii=False), now, now)
+            for part, record in entries
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO parts VALUES (?, ?, ?, ?)", rows)
+            self.counters["stores"] += len(rows)
+            self._evict()
+            self._conn.commit()
+
+    def put(self, part, record):
+        self.put_many([(part, record)])
+
+    def put_miss(self, part):
+        self.put_many([(part, None)])
+
+    def _evict(self):
+        """Trim to ``max_entries`` rows, least recently used first. Lock must be held."""
+        count = self._conn.execute("SELECT COUNT(*) FROM parts").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM parts WHERE key IN (SELECT key FROM parts ORDER BY last_access LIMIT ?)",
+                (excess,),
+            )
+            self.counters["evictions"] += excess
+
+    def purge_expired(self):
+        """Delete every expired entry. Returns the number of rows removed."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM parts WHERE (record IS NULL AND stored_at < ?) OR (record IS NOT NULL AND stored_at < ?)",
+                (now - self.negative_ttl, now - self.ttl),
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def records(self):
+        """Return ``[(key, record)]`` for every fresh, non-miss entry (no LRU touch)."""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, record FROM parts WHERE record IS NOT NULL AND stored_at >= ?", (cutoff,)
+            ).fetchall()
+        return [(key, json.loads(record)) for key, record in rows]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM parts")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM parts").fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_part_cache():
+    """Return the process-wide :class:`PartCache` at ``CACHE_PATH``."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = PartCache()
+        return _default_cache
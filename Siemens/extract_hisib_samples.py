@@ -1,177 +1,61 @@
+import argparse
 import json
-import re
-import openpyxl
+import multiprocessing
 import os
-from datetime import datetime
+import time
 import tkinter as tk
 from tkinter import filedialog, messagebox
 
-# Error code table from the image
-ERROR_TABLE = {
-    '0': 'HS_NO_ERROR',
-    '1': 'HS_AUDIO_SPI_ERROR',
-    '2': 'HS_AUDIO_THREAD_LOCK_ERROR',
-    '3': 'HS_AUDIO_THREAD_EXIT_ERROR',
-    '4': 'HS_ETCO2_CONFIG_NOT_SET_ERROR',
-    '5': 'HS_ETCO2_INIT_ERROR',
-    '6': 'HS_ETCO2_THREAD_EXIT_ERROR',
-    '7': 'HS_SPO2_INIT_ERROR',
-    '8': 'HS_SPO2_CONN_ERROR',
-    '9': 'HS_SPO2_THREAD_EXIT_ERROR',
-    'A': 'HS_NBP_INIT_ERROR',
-    'B': 'HS_NBP_CONN_ERROR',
-    'C': 'HS_NBP_THREAD_EXIT_ERROR',
-    'D': 'HS_ADAS_SPORT_ERROR',
-    'E': 'HS_ADAS_THREAD_EXIT_ERROR',
-    'F': 'HS_ECG_CORE_ERROR',
-    '10': 'HS_ECG_DISCONNECT_ERROR',
-    '11': 'HS_GPA_DISCONNECT_ERROR',
-    '12': 'HS_WDOG_TIMEOUT_ERROR',
-    '13': 'HS_FW_UPDATE_ERROR',
-    '14': 'HS_FW_WRITE_FAIL',
-    '15': 'HS_TCP_THREAD_EXIT_ERROR',
-    '16': 'HS_GPA_CORE_ERROR',
-    '17': 'HS_SPO2_FRAME_ERROR',
-    '18': 'HS_SPO2_PARITY_ERROR',
-    '19': 'HS_NBP_PARITY_ERROR',
-    '1A': 'HS_NBP_FRAME_ERROR',
-    '1B': 'HS_NBP_OVERRUN_ERROR',
-    '1C': 'HS_NBP_OVERRUN_ERROR',
-    '1D': 'HS_ADAS_ECG_BUFFER_OVERRUN',
-    '1E': 'HS_ADAS_GPA_BUFFER_OVERRUN',
-}
-
-
-def append_events_to_excel(hisi_disconnects, client_shutdowns, hisib_errors, excel_path):
-    # Sheet 1: Hisi Disconnects
-    hd_headers = ["Date", "Time", "Last sample", "First sample"]
-    # Sheet 2: Client Shutdowns
-    cs_headers = ["Date", "Time"]
-    # Sheet 3: Hisib Errors
-    he_headers = ["Error code", "Error Description"]
-
-    if os.path.exists(excel_path):
-        wb = openpyxl.load_workbook(excel_path)
-    else:
-        wb = openpyxl.Workbook()
-        wb.remove(wb.active)  # Remove default sheet
+from hisib_export import export_events, merge_workbook
+from hisib_parser import DISCONNECTS, ERROR_TABLE, ERRORS, SHUTDOWNS, parse_log, read_new_events
 
-    # Hisi Disconnects sheet
-    if "Hisi Disconnects" in wb.sheetnames:
-        ws_hd = wb["Hisi Disconnects"]
-    else:
-        ws_hd = wb.create_sheet("Hisi Disconnects")
-        ws_hd.append(hd_headers)
-    for d in hisi_disconnects:
-        ws_hd.append([
-            d.get("Date", ""),
-            d.get("Time", ""),
-            d.get("Last Sample No. before disconnect", ""),
-            d.get("First Sample No. after reconnect", "")
-        ])
-
-    # Client Shutdowns sheet
-    if "Client Shutdowns" in wb.sheetnames:
-        ws_cs = wb["Client Shutdowns"]
-    else:
-        ws_cs = wb.create_sheet("Client Shutdowns")
-        ws_cs.append(cs_headers)
-    for d in client_shutdowns:
-        date = d.get("Date", "")
-        if date and len(date) == 6 and date.isdigit():
-            date = datetime.strptime(date, "%y%m%d").strftime("%d-%b-%y")
-        ws_cs.append([
-            date,
-            d.get("Time", "")
-        ])
-
-    # Hisib Errors sheet
-    if "Hisib Errors" in wb.sheetnames:
-        ws_he = wb["Hisib Errors"]
-    else:
-        ws_he = wb.create_sheet("Hisib Errors")
-        ws_he.append(he_headers)
-    for d in hisib_errors:
-        ws_he.append([
-            d.get("Error code", ""),
-            d.get("Error name", "")
-        ])
-
-    wb.save(excel_path)
-
-
-def extract_sample_numbers(log_path, excel_path="output.xlsx"):
-    with open(log_path, 'r') as file:
-        lines = file.readlines()
-    hisi_disconnects = []
-    client_shutdowns = []
-    hisib_errors = []
-    occurrence = 0
-    client_shutdown_occurrence = 0
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        if "Detected HISIB Disconnect" in line:
-            occurrence += 1
-            # Improved regex: match [D] or [I] with optional whitespace, date and time
-            match = re.search(r"\[.\]\s*(\d{6}) (\d{2}:\d{2}:\d{2})", line)
-            date = match.group(1) if match else ""
-            time = match.group(2) if match else ""
-            # Format date for consistency
-            if date and len(date) == 6 and date.isdigit():
-                date_fmt = datetime.strptime(date, "%y%m%d").strftime("%d-%b-%y")
-            else:
-                date_fmt = date
-            last_sample_no = None
-            first_sample_no = None
-            lookahead = lines[i+1:i+6]
-            for l in lookahead:
-                if "Last SampleNo before disconnect" in l:
-                    parts = l.split('=')
-                    if len(parts) > 1:
-                        last_sample_no = parts[1].strip()
-                if "First SampleNo after reconnect" in l:
-                    parts = l.split('=')
-                    if len(parts) > 1:
-                        first_sample_no = parts[1].strip()
-            hisi_disconnects.append({
-                "Date": date_fmt,
-                "Time": time,
-                "Last Sample No. before disconnect": last_sample_no,
-                "First Sample No. after reconnect": first_sample_no
-            })
-            i += 5
-        elif "Command channel: Client shutdown" in line:
-            match = re.search(r'(\d{6}) (\d{2}:\d{2}:\d{2}) .*Client shutdown', line)
-            if match:
-                client_shutdown_occurrence += 1
-                date = match.group(1)
-                time = match.group(2)
-                client_shutdowns.append({
-                    "Date": date,
-                    "Time": time
-                })
-            i += 1
-        else:
-            # Check for setHisibErrorStatus = 0x400000XX
-            err_match = re.search(r'setHisibErrorStatus\s*=\s*0x[0-9A-Fa-f]{6}([0-9A-Fa-f]{2})', line)
-            if err_match:
-                err_code = err_match.group(1).upper()
-                err_name = ERROR_TABLE.get(err_code, f'Unknown error code {err_code}')
-                hisib_errors.append({
-                    "Error code": err_code,
-                    "Error name": err_name
-                })
-            i += 1
-    output = {
-        "Hisi Disconnects": hisi_disconnects,
-        "Client Shutdowns": client_shutdowns,
-        "Hisib Errors": hisib_errors
-    }
+# Suffix of the file next to the workbook that follow_log keeps its
+# per-log resume offsets in
+FOLLOW_STATE_SUFFIX = ".follow.json"
+
+
+def append_events_to_excel(hisi_disconnects, client_shutdowns, hisib_errors, excel_path, merge=True):
+    # Rows go to the CSV files next to the workbook; with merge the
+    # workbook is rebuilt from them (see hisib_export)
+    output = {DISCONNECTS: hisi_disconnects, SHUTDOWNS: client_shutdowns, ERRORS: hisib_errors}
+    export_events(output, excel_path, merge)
+
+
+def extract_sample_numbers(log_path, excel_path="output.xlsx", workers=1):
+    # workers > 1 parses large logs in parallel chunks (see hisib_parser)
+    output = parse_log(log_path, workers)
     print(json.dumps(output, indent=2))
 
     # Excel output (in table format as per user screenshot)
-    append_events_to_excel(hisi_disconnects, client_shutdowns, hisib_errors, excel_path)
+    append_events_to_excel(output[DISCONNECTS], output[SHUTDOWNS], output[ERRORS], excel_path)
+
+
+def follow_log(log_path, excel_path="output.xlsx", state_path=None, merge=True):
+    """Append only the events written to log_path since the last call.
+
+    The resume offset of each log is kept in state_path (by default next to
+    the workbook), so rows already in the workbook are not appended again.
+    Without merge the rows only go to the workbook's CSV files until a
+    later merge_workbook.
+    """
+    state_path = state_path or excel_path + FOLLOW_STATE_SUFFIX
+    states = {}
+    if os.path.exists(state_path):
+        with open(state_path, "r", encoding="utf-8") as f:
+            states = json.load(f)
+    key = os.path.abspath(log_path)
+    output, state = read_new_events(log_path, states.get(key))
+    print(json.dumps(output, indent=2))
+
+    if any(output.values()):
+        append_events_to_excel(output[DISCONNECTS], output[SHUTDOWNS], output[ERRORS], excel_path, merge)
+    # Saved after the workbook so a failed save re-reads these events next time
+    states[key] = state
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(states, f, indent=2)
+    os.replace(tmp_path, state_path)
+    return output
 
 
 def run_gui():
@@ -194,14 +78,17 @@ def run_gui():
             messagebox.showerror("Error", "Please provide both input log file and output Excel file.")
             return
         try:
-            extract_sample_numbers(log_path, excel_path)
+            if follow_var.get():
+                follow_log(log_path, excel_path)
+            else:
+                extract_sample_numbers(log_path, excel_path, workers=os.cpu_count() or 1)
             messagebox.showinfo("Success", f"Extraction complete!\nOutput saved to:\n{excel_path}")
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred:\n{e}")
 
     root = tk.Tk()
     root.title("Log to Excel Extractor")
-    root.geometry("480x180")
+    root.geometry("480x210")
 
     tk.Label(root, text="Input Log File:").pack(anchor="w", padx=10, pady=(10,0))
     log_frame = tk.Frame(root)
@@ -217,9 +104,38 @@ def run_gui():
     excel_entry.pack(side="left", fill="x", expand=True)
     tk.Button(excel_frame, text="Browse", command=browse_excel).pack(side="left", padx=5)
 
-    tk.Button(root, text="Run", command=run_extraction, height=2, width=10).pack(pady=15)
+    follow_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(root, text="Only add events logged since the last run", variable=follow_var).pack(anchor="w", padx=10, pady=(5,0))
+
+    tk.Button(root, text="Run", command=run_extraction, height=2, width=10).pack(pady=10)
     root.mainloop()
 
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract HISIB events from a SINON log into an Excel workbook. Without arguments the GUI opens.")
+    parser.add_argument("log", nargs="?", help="SINON log file")
+    parser.add_argument("excel", nargs="?", default="output.xlsx", help="workbook to append to (default: output.xlsx)")
+    parser.add_argument("--follow", action="store_true", help="only add events logged since the last --follow run")
+    parser.add_argument("--interval", type=float, help="with --follow, keep checking the log every INTERVAL seconds")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes for parsing large logs")
+    parser.add_argument("--csv-only", action="store_true", help="with --follow, only append to the CSV files next to the workbook")
+    parser.add_argument("--merge", metavar="EXCEL", help="only rebuild EXCEL from its CSV files")
+    args = parser.parse_args(argv)
+    if args.merge:
+        merge_workbook(args.merge)
+    elif not args.log:
+        run_gui()
+    elif not args.follow:
+        extract_sample_numbers(args.log, args.excel, args.workers)
+    else:
+        while True:
+            follow_log(args.log, args.excel, merge=not args.csv_only)
+            if not args.interval:
+                break
+            time.sleep(args.interval)
+
+
 if __name__ == "__main__":
-    run_gui()
+    # The parallel parser's worker processes re-run this script when frozen
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,135 @@
+"""
+Excel export of extracted HISIB events.
+
+Loading the workbook to append a few rows costs time and memory in
+proportion to everything already in it, so events are not appended to the
+workbook itself. Each batch is appended to one CSV file per sheet in a
+folder next to the workbook (``output.xlsx.events/``), which costs only the
+new rows. The workbook is rebuilt from those files on demand with a
+write-only (streaming) openpyxl workbook, which keeps memory flat whatever
+the number of rows.
+
+The CSV files are the record of what has been exported; the workbook is
+regenerated from them, so edits made in Excel to the three event sheets are
+not kept (other sheets are copied over as values). A workbook written
+before the sidecar existed is imported into it on first use.
+"""
+import csv
+import os
+from datetime import datetime
+
+import openpyxl
+
+from hisib_parser import DISCONNECTS, ERRORS, SHUTDOWNS
+
+SIDECAR_SUFFIX = ".events"
+
+
+def _disconnect_row(d):
+    return [
+        d.get("Date", ""),
+        d.get("Time", ""),
+        d.get("Last Sample No. before disconnect", ""),
+        d.get("First Sample No. after reconnect", "")
+    ]
+
+
+def _shutdown_row(d):
+    date = d.get("Date", "")
+    if date and len(date) == 6 and date.isdigit():
+        date = datetime.strptime(date, "%y%m%d").strftime("%d-%b-%y")
+    return [date, d.get("Time", "")]
+
+
+def _error_row(d):
+    return [d.get("Error code", ""), d.get("Error name", "")]
+
+
+# Sheet name -> (header row, event record -> row), in workbook order
+SHEETS = {
+    DISCONNECTS: (["Date", "Time", "Last sample", "First sample"], _disconnect_row),
+    SHUTDOWNS: (["Date", "Time"], _shutdown_row),
+    ERRORS: (["Error code", "Error Description"], _error_row),
+}
+
+
+def sidecar_path(excel_path, sheet):
+    return os.path.join(excel_path + SIDECAR_SUFFIX, f"{sheet}.csv")
+
+
+def _import_workbook(excel_path):
+    """Copy the event sheets of a workbook written without a sidecar into
+    a new sidecar."""
+    folder = excel_path + SIDECAR_SUFFIX
+    os.makedirs(folder)
+    wb = openpyxl.load_workbook(excel_path, read_only=True) if os.path.exists(excel_path) else None
+    try:
+        for sheet, (headers, _) in SHEETS.items():
+            if wb is None or sheet not in wb.sheetnames:
+                continue
+            with open(sidecar_path(excel_path, sheet), "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                rows = wb[sheet].iter_rows(values_only=True)
+                next(rows, None)   # header
+                writer.writerows(rows)
+    finally:
+        if wb is not None:
+            wb.close()
+
+
+def append_events(output, excel_path):
+    """Append the events of a parse_log-style dict to the workbook's
+    sidecar; returns the number of rows written."""
+    if not os.path.isdir(excel_path + SIDECAR_SUFFIX):
+        _import_workbook(excel_path)
+    count = 0
+    for sheet, (_, to_row) in SHEETS.items():
+        records = output.get(sheet) or []
+        with open(sidecar_path(excel_path, sheet), "a", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(to_row(d) for d in records)
+        count += len(records)
+    return count
+
+
+def _cells(row):
+    # Empty CSV fields were empty cells (or None) in the event records
+    return [value if value != "" else None for value in row]
+
+
+def merge_workbook(excel_path):
+    """Rebuild the workbook from its sidecar with a streaming writer."""
+    if not os.path.isdir(excel_path + SIDECAR_SUFFIX):
+        _import_workbook(excel_path)
+    old = None
+    if os.path.exists(excel_path):
+        old = openpyxl.load_workbook(excel_path, read_only=True)
+    wb = openpyxl.Workbook(write_only=True)
+    try:
+        for sheet, (headers, _) in SHEETS.items():
+            ws = wb.create_sheet(sheet)
+            ws.append(headers)
+            path = sidecar_path(excel_path, sheet)
+            if os.path.exists(path):
+                with open(path, "r", newline="", encoding="utf-8") as f:
+                    for row in csv.reader(f):
+                        ws.append(_cells(row))
+        for sheet in (old.sheetnames if old is not None else []):
+            if sheet not in SHEETS:
+                ws = wb.create_sheet(sheet)
+                for row in old[sheet].iter_rows(values_only=True):
+                    ws.append(row)
+    finally:
+        if old is not None:
+            old.close()
+    tmp_path = excel_path + ".tmp"
+    wb.save(tmp_path)
+    os.replace(tmp_path, excel_path)
+
+
+def export_events(output, excel_path, merge=True):
+    """Append a batch of events and, unless merge is False, rebuild the
+    workbook; returns the number of rows written."""
+    count = append_events(output, excel_path)
+    if merge:
+        merge_workbook(excel_path)
+    return count
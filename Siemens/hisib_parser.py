@@ -0,0 +1,411 @@
+"""
+Streaming parser for SINON logs.
+
+The log is read as bytes in large line-aligned blocks, and one precompiled
+regex finds the three events the extractor reports anywhere in a block:
+
+* ``Detected HISIB Disconnect`` - the following LOOKAHEAD lines are searched
+  for the last sample number before the disconnect and the first one after
+  the reconnect. The first LOOKAHEAD - 1 of them are not checked for other
+  events, as before. A block that ends inside this window leaves the lines
+  seen so far in a small ring buffer that the next block completes.
+* ``Command channel: Client shutdown``
+* ``setHisibErrorStatus = 0x400000XX`` (SINON writes ``: 0x400000XX``) -
+  the error code is the status's low byte; a status of HS_NO_ERROR clears
+  the error and is not reported
+
+Lines without an event are never split out or decoded, so the cost is one
+regex scan of the log and memory use does not depend on its size.
+
+For multi-GB logs parse_log can also split the memory-mapped file into
+line-aligned byte ranges and parse them in a process pool. A range does not
+know whether it starts inside a disconnect block of the previous one, so its
+worker backs up to the nearest line that cannot be (see _sync_start) and
+reads the lookahead of its last disconnect past its end; each event is kept
+only by the range its line starts in.
+
+read_new_events parses only what was appended to a log since the previous
+call, for running the extractor repeatedly against a live device log.
+"""
+import hashlib
+import mmap
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import chain
+
+# Error code table from the image
+ERROR_TABLE = {
+    '0': 'HS_NO_ERROR',
+    '1': 'HS_AUDIO_SPI_ERROR',
+    '2': 'HS_AUDIO_THREAD_LOCK_ERROR',
+    '3': 'HS_AUDIO_THREAD_EXIT_ERROR',
+    '4': 'HS_ETCO2_CONFIG_NOT_SET_ERROR',
+    '5': 'HS_ETCO2_INIT_ERROR',
+    '6': 'HS_ETCO2_THREAD_EXIT_ERROR',
+    '7': 'HS_SPO2_INIT_ERROR',
+    '8': 'HS_SPO2_CONN_ERROR',
+    '9': 'HS_SPO2_THREAD_EXIT_ERROR',
+    'A': 'HS_NBP_INIT_ERROR',
+    'B': 'HS_NBP_CONN_ERROR',
+    'C': 'HS_NBP_THREAD_EXIT_ERROR',
+    'D': 'HS_ADAS_SPORT_ERROR',
+    'E': 'HS_ADAS_THREAD_EXIT_ERROR',
+    'F': 'HS_ECG_CORE_ERROR',
+    '10': 'HS_ECG_DISCONNECT_ERROR',
+    '11': 'HS_GPA_DISCONNECT_ERROR',
+    '12': 'HS_WDOG_TIMEOUT_ERROR',
+    '13': 'HS_FW_UPDATE_ERROR',
+    '14': 'HS_FW_WRITE_FAIL',
+    '15': 'HS_TCP_THREAD_EXIT_ERROR',
+    '16': 'HS_GPA_CORE_ERROR',
+    '17': 'HS_SPO2_FRAME_ERROR',
+    '18': 'HS_SPO2_PARITY_ERROR',
+    '19': 'HS_NBP_PARITY_ERROR',
+    '1A': 'HS_NBP_FRAME_ERROR',
+    '1B': 'HS_NBP_OVERRUN_ERROR',
+    '1C': 'HS_NBP_OVERRUN_ERROR',
+    '1D': 'HS_ADAS_ECG_BUFFER_OVERRUN',
+    '1E': 'HS_ADAS_GPA_BUFFER_OVERRUN',
+}
+
+# Event kinds, also the keys of the extractor's output
+DISCONNECTS = "Hisi Disconnects"
+SHUTDOWNS = "Client Shutdowns"
+ERRORS = "Hisib Errors"
+
+# Lines after a disconnect searched for its sample numbers
+LOOKAHEAD = 5
+
+DISCONNECT = b"Detected HISIB Disconnect"
+SHUTDOWN = b"Command channel: Client shutdown"
+LAST_SAMPLE = b"Last SampleNo before disconnect"
+FIRST_SAMPLE = b"First SampleNo after reconnect"
+
+# Block size read from the file at a time
+BLOCK_SIZE = 1 << 20
+
+# parse_log(workers > 1) only splits logs at least this large; smaller ones
+# parse faster than a process pool starts. Each worker gets several ranges
+# so a range full of events does not hold up the others.
+PARALLEL_MIN_BYTES = 32 << 20
+CHUNKS_PER_WORKER = 4
+
+# read_new_events recognizes a log rewritten in place by a checksum of its
+# first bytes
+HEAD_BYTES = 4096
+
+ERROR = b"setHisibErrorStatus"
+
+# One scan for all three events; the matched text selects the handler.
+# (Named groups would be clearer but stop re from using its fast literal
+# search, which makes the scan about five times slower.)
+KINDS = {DISCONNECT: "disconnect", SHUTDOWN: "shutdown", ERROR: "error"}
+EVENT_RE = re.compile(b"|".join(re.escape(k) for k in KINDS))
+ERROR_RE = re.compile(rb"setHisibErrorStatus\s*[=:]\s*0x([0-9A-Fa-f]+)")
+STAMP_RE = re.compile(rb"\[.\]\s*(\d{6}) (\d{2}:\d{2}:\d{2})")
+SHUTDOWN_STAMP_RE = re.compile(rb"(\d{6}) (\d{2}:\d{2}:\d{2}) .*Client shutdown")
+
+
+def _kind(line, match):
+    """Event kind of a matched line, with the original precedence
+    (disconnect, then shutdown, then error) when a line holds several."""
+    kind = KINDS[match.group()]
+    if kind != "disconnect" and DISCONNECT in line:
+        return "disconnect"
+    if kind == "error" and SHUTDOWN in line:
+        return "shutdown"
+    return kind
+
+
+def _take_lines(block, pos, count):
+    """Up to count lines of block from pos, and the position after them."""
+    lines = []
+    while len(lines) < count and pos < len(block):
+        end = block.find(b"\n", pos) + 1 or len(block)
+        lines.append(block[pos:end])
+        pos = end
+    return lines, pos
+
+
+def _disconnect(line):
+    match = STAMP_RE.search(line)
+    date = match.group(1).decode() if match else ""
+    time = match.group(2).decode() if match else ""
+    # Format date for consistency
+    if date and len(date) == 6 and date.isdigit():
+        date = datetime.strptime(date, "%y%m%d").strftime("%d-%b-%y")
+    return {
+        "Date": date,
+        "Time": time,
+        "Last Sample No. before disconnect": None,
+        "First Sample No. after reconnect": None,
+    }
+
+
+def _sample_no(line):
+    parts = line.split(b"=")
+    return parts[1].strip().decode(errors="replace") if len(parts) > 1 else None
+
+
+def _finish_disconnect(record, lookahead):
+    for line in lookahead:
+        if LAST_SAMPLE in line:
+            value = _sample_no(line)
+            if value is not None:
+                record["Last Sample No. before disconnect"] = value
+        if FIRST_SAMPLE in line:
+            value = _sample_no(line)
+            if value is not None:
+                record["First Sample No. after reconnect"] = value
+    return record
+
+
+def iter_blocks(f, block_size=BLOCK_SIZE):
+    """Yield line-aligned blocks of a binary file."""
+    while True:
+        block = f.read(block_size)
+        if not block:
+            return
+        if not block.endswith(b"\n"):
+            block += f.readline()
+        yield block
+
+
+def scan_events(blocks, offset=0):
+    """Yield ``(position, kind, record, line)`` for each event in an
+    iterable of byte blocks, position being the byte offset of the event's
+    line.
+
+    Blocks must end at line boundaries (single lines, such as those of a
+    binary file iterator, are fine) and the first one starts at ``offset``.
+    ``kind`` is DISCONNECTS, SHUTDOWNS or ERRORS; records have the same
+    keys as the extractor's output.
+    """
+    search = EVENT_RE.search
+    pending = None        # disconnect record waiting for its lookahead lines
+    pending_at = pending_line = 0
+    window = deque(maxlen=LOOKAHEAD)
+    for block in blocks:
+        pos = 0
+        if pending is not None:
+            lines, pos = _take_lines(block, 0, LOOKAHEAD - len(window))
+            window.extend(lines)
+            if len(window) < LOOKAHEAD:
+                offset += len(block)
+                continue   # the whole block is inside the disconnect block
+            yield pending_at, DISCONNECTS, _finish_disconnect(pending, window), pending_line
+            pending = None
+            pos -= len(window[-1])   # the last lookahead line is dispatched too
+        while True:
+            match = search(block, pos)
+            if match is None:
+                break
+            start = block.rfind(b"\n", 0, match.start()) + 1
+            pos = block.find(b"\n", match.end()) + 1 or len(block)
+            line = block[start:pos]
+            kind = _kind(line, match)
+            if kind == "disconnect":
+                record = _disconnect(line)
+                lines, pos = _take_lines(block, pos, LOOKAHEAD)
+                if len(lines) < LOOKAHEAD:
+                    pending, pending_at, pending_line = record, offset + start, line
+                    window.clear()
+                    window.extend(lines)
+                    break
+                yield offset + start, DISCONNECTS, _finish_disconnect(record, lines), line
+                pos -= len(lines[-1])
+            elif kind == "shutdown":
+                stamp = SHUTDOWN_STAMP_RE.search(line)
+                if stamp:
+                    yield offset + start, SHUTDOWNS, {"Date": stamp.group(1).decode(), "Time": stamp.group(2).decode()}, line
+            else:
+                error = ERROR_RE.search(line)
+                code = int(error.group(1), 16) & 0xFF if error else 0
+                if code:
+                    code = format(code, "X")
+                    yield offset + start, ERRORS, {"Error code": code, "Error name": ERROR_TABLE.get(code, f'Unknown error code {code}')}, line
+        offset += len(block)
+    if pending is not None:
+        # The log ended inside a disconnect block
+        yield pending_at, DISCONNECTS, _finish_disconnect(pending, window), pending_line
+
+
+def iter_events(blocks):
+    """Yield ``(kind, record)`` for each event in an iterable of byte blocks
+    (see scan_events)."""
+    for _, kind, record, _ in scan_events(blocks):
+        yield kind, record
+
+
+def _mmap_blocks(mm, start, end, block_size=BLOCK_SIZE):
+    """Line-aligned blocks of mm[start:end]; start and end are line starts."""
+    while start < end:
+        stop = min(start + block_size, end)
+        if stop < end:
+            stop = mm.find(b"\n", stop - 1, end) + 1 or end
+        yield mm[start:stop]
+        start = stop
+
+
+def _sync_start(mm, start):
+    """A line start at or before start where parsing can begin without
+    knowing what came before: no disconnect line in the LOOKAHEAD - 1 lines
+    above it, so it is not inside a disconnect block."""
+    pos = start
+    while pos > 0:
+        back = pos
+        for _ in range(LOOKAHEAD - 1):
+            if back == 0:
+                break
+            back = mm.rfind(b"\n", 0, back - 1) + 1
+        if mm.find(DISCONNECT, back, pos) < 0:
+            return pos
+        pos = back
+    return 0
+
+
+def split_ranges(mm, count):
+    """Split mm into at most count byte ranges that start and end on line
+    boundaries."""
+    size = len(mm)
+    bounds = [0]
+    for i in range(1, count):
+        pos = mm.find(b"\n", max(size * i // count, bounds[-1], 1) - 1) + 1
+        if pos <= bounds[-1] or pos >= size:
+            continue
+        bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def parse_range(log_path, start, end):
+    """[(kind, record), ...] for the events whose line starts in
+    [start, end) of a log, parsed as part of the whole file.
+
+    Parsing starts at _sync_start so a disconnect block reaching over
+    start skips the right lines, and a disconnect near end reads its
+    lookahead lines past it.
+    """
+    with open(log_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        sync = _sync_start(mm, start)
+        _, tail = _take_lines(mm, end, LOOKAHEAD)
+        blocks = chain(_mmap_blocks(mm, sync, end), [mm[end:tail]] if tail > end else [])
+        return [(kind, record) for pos, kind, record, _ in scan_events(blocks, sync)
+                if start <= pos < end]
+
+
+def _parse_range(args):
+    return parse_range(*args)
+
+
+def parse_log(log_path, workers=1):
+    """{DISCONNECTS: [...], SHUTDOWNS: [...], ERRORS: [...]} of a log file.
+
+    With workers > 1 and a log of at least PARALLEL_MIN_BYTES, the file is
+    memory-mapped and split into line-aligned ranges that a process pool
+    parses; the results are merged in file (chronological) order and are
+    the same as a streamed single-process parse.
+    """
+    output = {DISCONNECTS: [], SHUTDOWNS: [], ERRORS: []}
+    if workers > 1 and os.path.getsize(log_path) >= PARALLEL_MIN_BYTES:
+        with open(log_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            ranges = split_ranges(mm, workers * CHUNKS_PER_WORKER)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for events in pool.map(_parse_range, [(log_path, start, end) for start, end in ranges]):
+                for kind, record in events:
+                    output[kind].append(record)
+        return output
+    with open(log_path, "rb") as f:
+        for kind, record in iter_events(iter_blocks(f)):
+            output[kind].append(record)
+    return output
+
+
+def _head_digest(f, length):
+    f.seek(0)
+    return hashlib.sha1(f.read(length)).hexdigest()
+
+
+def _scan_tail(f, start, final):
+    """[(position, kind, record, line), ...] from start to the end of an
+    open log, and the offset to resume from.
+
+    Unless final, the log may still be growing: a trailing partial line is
+    left for the next call, and so is a disconnect whose lookahead lines
+    have not all been written yet.
+    """
+    size = os.fstat(f.fileno()).st_size
+    if size <= start:
+        return [], start
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        end = size if final else mm.rfind(b"\n", start, size) + 1
+        if end <= start:
+            return [], start
+        events = list(scan_events(_mmap_blocks(mm, start, end), start))
+        if not final and events and events[-1][1] == DISCONNECTS:
+            at = events[-1][0]
+            if mm[at:end].count(b"\n") <= LOOKAHEAD:
+                events.pop()
+                end = at
+    return events, end
+
+
+def _rotated_file(log_path, inode):
+    """The file next to log_path (such as SINON.log.1) that still has the
+    given inode, if the log was rotated by renaming it."""
+    folder, name = os.path.split(os.path.abspath(log_path))
+    stem = os.path.splitext(name)[0]
+    for entry in os.scandir(folder):
+        if entry.name != name and entry.name.startswith(stem) and entry.is_file():
+            if entry.inode() == inode:
+                return entry.path
+    return None
+
+
+def scan_new_events(log_path, state=None):
+    """Events written to a log since ``state`` as scan_events tuples, and
+    the state for next time.
+
+    ``state`` is None for a log not seen before, else the dict returned by
+    the previous call: the resume offset plus the inode, size and a
+    checksum of the first HEAD_BYTES bytes read so far. If the inode
+    changed the log was rotated: the rest of the old file is read first
+    when it can still be found next to the log, and the new one from its
+    start. A log that shrank or whose head changed (rewritten in place) is
+    also read again from its start.
+    """
+    events = []
+    stat = os.stat(log_path)
+    if state and state["inode"] != stat.st_ino:
+        rotated = _rotated_file(log_path, state["inode"])
+        if rotated:
+            with open(rotated, "rb") as f:
+                events += _scan_tail(f, state["offset"], final=True)[0]
+        state = None
+    with open(log_path, "rb") as f:
+        if state and (stat.st_size < state["size"]
+                      or _head_digest(f, state["head_bytes"]) != state["head"]):
+            state = None
+        new, offset = _scan_tail(f, state["offset"] if state else 0, final=False)
+        events += new
+        head_bytes = min(offset, HEAD_BYTES)
+        head = _head_digest(f, head_bytes)
+    return events, {
+        "inode": stat.st_ino,
+        "size": stat.st_size,
+        "offset": offset,
+        "head_bytes": head_bytes,
+        "head": head,
+    }
+
+
+def read_new_events(log_path, state=None):
+    """Like scan_new_events, with the events as a parse_log-style dict."""
+    output = {DISCONNECTS: [], SHUTDOWNS: [], ERRORS: []}
+    events, state = scan_new_events(log_path, state)
+    for _, kind, record, _ in events:
+        output[kind].append(record)
+    return output, state
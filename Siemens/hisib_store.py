@@ -0,0 +1,275 @@
+"""
+SQLite store of parsed SINON log events, for questions across many logs.
+
+    python hisib_store.py ingest SINON.log old/*.log
+    python hisib_store.py counts --from 2025-02-01 --to 2025-03-01 --by day
+    python hisib_store.py errors --from 2025-02-01
+    python hisib_store.py gaps
+
+Every event is stored once with the timestamp of its log line, its type
+(disconnect, shutdown or error), the error code (keys of ERROR_TABLE, which
+is stored alongside) and, for disconnects, the last and first sample
+numbers. Timestamps are 'YYYY-MM-DD HH:MM:SS' text, which sorts in time
+order, and the events are indexed by timestamp, by type and timestamp and
+by error code and timestamp, each index covering the columns its queries
+read.
+
+Ingest also adds to per-hour counts of each type and error code. Counts and
+error histograms over windows that start and end on whole hours (or days,
+months) are summed from those, so they take the same few milliseconds over
+months of logs as over one; other windows count the events themselves.
+
+Ingesting is incremental: each log's follow state (see
+hisib_parser.scan_new_events) is kept in the database, so running ingest
+again reads only what was appended to the logs since, and rotated or
+rewritten logs are picked up as the follow mode does.
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+from collections import Counter
+from datetime import datetime
+
+from hisib_parser import DISCONNECTS, ERROR_TABLE, ERRORS, SHUTDOWNS, scan_new_events
+
+DB_PATH = "hisib_events.sqlite"
+
+TYPES = {DISCONNECTS: "disconnect", SHUTDOWNS: "shutdown", ERRORS: "error"}
+
+# Period label lengths of a timestamp for counts(by=...)
+PERIODS = {"month": 7, "day": 10, "hour": 13}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    path TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS error_codes (
+    code TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    log TEXT NOT NULL,
+    ts TEXT,
+    type TEXT NOT NULL,
+    error_code TEXT,
+    last_sample INTEGER,
+    first_sample INTEGER
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts, type);
+CREATE INDEX IF NOT EXISTS events_type_ts ON events (type, ts, last_sample, first_sample);
+CREATE INDEX IF NOT EXISTS events_error_ts ON events (error_code, ts) WHERE error_code IS NOT NULL;
+CREATE TABLE IF NOT EXISTS hourly_counts (
+    hour TEXT NOT NULL,
+    type TEXT NOT NULL,
+    error_code TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (hour, type, error_code)
+) WITHOUT ROWID;
+"""
+
+LINE_STAMP_RE = re.compile(rb"(\d{6}) (\d{2}:\d{2}:\d{2})")
+# Window bounds hourly_counts can answer: a prefix of 'YYYY-MM-DD HH', or a
+# whole hour written out with minutes (and seconds)
+HOUR_BOUND_RE = re.compile(r"[\d -]{0,13}|(\d{4}-\d{2}-\d{2} \d{2}):00(?::00)?")
+
+
+def connect(db_path=DB_PATH):
+    """Open (creating if needed) an event store."""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    with conn:
+        conn.executescript(SCHEMA)
+        conn.executemany("INSERT OR REPLACE INTO error_codes (code, name) VALUES (?, ?)", ERROR_TABLE.items())
+    return conn
+
+
+def _timestamp(line):
+    match = LINE_STAMP_RE.search(line)
+    if not match:
+        return None
+    try:
+        return datetime.strptime((match.group(1) + b" " + match.group(2)).decode(), "%y%m%d %H:%M:%S").isoformat(" ")
+    except ValueError:
+        return None
+
+
+def _sample(value):
+    return int(value) if value and value.isdigit() else None
+
+
+def _row(log, kind, record, line):
+    return (
+        log,
+        _timestamp(line),
+        TYPES[kind],
+        record.get("Error code"),
+        _sample(record.get("Last Sample No. before disconnect")),
+        _sample(record.get("First Sample No. after reconnect")),
+    )
+
+
+def ingest(conn, log_path):
+    """Add the events written to a log since its last ingest; returns how
+    many were added."""
+    log = os.path.abspath(log_path)
+    row = conn.execute("SELECT state FROM logs WHERE path = ?", (log,)).fetchone()
+    events, state = scan_new_events(log_path, json.loads(row["state"]) if row else None)
+    rows = [_row(log, kind, record, line) for _, kind, record, line in events]
+    # Events without a timestamp are counted under hour ''
+    hourly = Counter(((ts or "")[:13], kind, code or "") for _, ts, kind, code, _, _ in rows)
+    with conn:
+        conn.executemany(
+            "INSERT INTO events (log, ts, type, error_code, last_sample, first_sample) VALUES (?, ?, ?, ?, ?, ?)",
+            rows)
+        conn.executemany(
+            "INSERT INTO hourly_counts (hour, type, error_code, count) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (hour, type, error_code) DO UPDATE SET count = count + excluded.count",
+            ((hour, kind, code, n) for (hour, kind, code), n in hourly.items()))
+        conn.execute("INSERT OR REPLACE INTO logs (path, state) VALUES (?, ?)", (log, json.dumps(state)))
+    return len(events)
+
+
+def _window(start, end, column="ts"):
+    """WHERE clause (and its parameters) for start <= column < end; either
+    may be None, and both are 'YYYY-MM-DD[ HH:MM[:SS]]' strings."""
+    clauses, params = [], []
+    if start:
+        clauses.append(f"{column} >= ?")
+        params.append(start)
+    if end:
+        clauses.append(f"{column} < ?")
+        params.append(end)
+    return (" AND ".join(clauses) or "1"), params
+
+
+def _hourly_window(start, end):
+    """WHERE clause and parameters selecting the hourly_counts rows of
+    [start, end), or None if either bound falls inside an hour.
+
+    Comparing 'YYYY-MM-DD HH' with a bound no longer than that gives the
+    same answer as comparing the full timestamp with it.
+    """
+    bounds = []
+    for bound in (start, end):
+        match = HOUR_BOUND_RE.fullmatch(bound or "")
+        if match is None:
+            return None
+        bounds.append(match.group(1) or bound)
+    where, params = _window(*bounds, column="hour")
+    if start or end:
+        where += " AND hour != ''"   # like a NULL ts, outside any window
+    return where, params
+
+
+def counts(conn, start=None, end=None, by=None):
+    """Event counts per type in [start, end), per month, day or hour if by
+    is given: [{"period", "type", "count"}, ...]."""
+    hourly = _hourly_window(start, end)
+    if hourly is not None:
+        where, params = hourly
+        period = f"nullif(substr(hour, 1, {PERIODS[by]}), '')" if by else "NULL"
+        sql = (f"SELECT {period} AS period, type, sum(count) AS count FROM hourly_counts "
+               f"WHERE {where} GROUP BY period, type ORDER BY period, type")
+    else:
+        where, params = _window(start, end)
+        period = f"substr(ts, 1, {PERIODS[by]})" if by else "NULL"
+        sql = (f"SELECT {period} AS period, type, count(*) AS count FROM events "
+               f"WHERE {where} GROUP BY period, type ORDER BY period, type")
+    return [dict(r) for r in conn.execute(sql, params)]
+
+
+def error_histogram(conn, start=None, end=None):
+    """Error counts per code in [start, end), most frequent first:
+    [{"code", "name", "count"}, ...]."""
+    hourly = _hourly_window(start, end)
+    if hourly is not None:
+        where, params = hourly
+        source = (f"SELECT error_code, sum(count) AS count FROM hourly_counts "
+                  f"WHERE type = 'error' AND {where} GROUP BY error_code")
+    else:
+        where, params = _window(start, end)
+        source = (f"SELECT error_code, count(*) AS count FROM events "
+                  f"WHERE error_code IS NOT NULL AND {where} GROUP BY error_code")
+    rows = conn.execute(
+        "SELECT e.error_code AS code, coalesce(c.name, 'Unknown error code ' || e.error_code) AS name, "
+        f"e.count AS count FROM ({source}) e LEFT JOIN error_codes c ON c.code = e.error_code "
+        "ORDER BY count DESC, code", params)
+    return [dict(r) for r in rows]
+
+
+def gaps(conn, start=None, end=None):
+    """Disconnects in [start, end) with their sample gap (first sample after
+    the reconnect - last sample before the disconnect) where both are
+    known: [{"ts", "log", "last_sample", "first_sample", "gap"}, ...]."""
+    where, params = _window(start, end)
+    rows = conn.execute(
+        "SELECT ts, log, last_sample, first_sample, first_sample - last_sample AS gap FROM events "
+        f"WHERE type = 'disconnect' AND last_sample IS NOT NULL AND first_sample IS NOT NULL AND {where} "
+        "ORDER BY ts", params)
+    return [dict(r) for r in rows]
+
+
+def gap_summary(conn, start=None, end=None):
+    """Count, min, max and mean of the sample gaps in [start, end)."""
+    where, params = _window(start, end)
+    row = conn.execute(
+        "SELECT count(*) AS count, min(first_sample - last_sample) AS min, max(first_sample - last_sample) AS max, "
+        "avg(first_sample - last_sample) AS mean FROM events "
+        f"WHERE type = 'disconnect' AND last_sample IS NOT NULL AND first_sample IS NOT NULL AND {where}",
+        params).fetchone()
+    return dict(row)
+
+
+def _print_rows(rows, columns):
+    print("\t".join(columns))
+    for row in rows:
+        print("\t".join("" if row[c] is None else str(row[c]) for c in columns))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Store SINON log events in SQLite and query them.")
+    parser.add_argument("--db", default=DB_PATH, help=f"database file (default: {DB_PATH})")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest_cmd = commands.add_parser("ingest", help="add the new events of one or more logs")
+    ingest_cmd.add_argument("logs", nargs="+")
+    for name, help_text in (("counts", "event counts per type"), ("errors", "error code histogram"),
+                            ("gaps", "sample gaps of disconnects")):
+        cmd = commands.add_parser(name, help=help_text)
+        cmd.add_argument("--from", dest="start", help="start of the window, YYYY-MM-DD[ HH:MM[:SS]]")
+        cmd.add_argument("--to", dest="end", help="end of the window (exclusive)")
+        if name == "counts":
+            cmd.add_argument("--by", choices=PERIODS, help="count per month, day or hour")
+        if name == "gaps":
+            cmd.add_argument("--summary", action="store_true", help="only count, min, max and mean")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    if args.command == "ingest":
+        result = {log: ingest(conn, log) for log in args.logs}
+        columns = None
+    elif args.command == "counts":
+        result, columns = counts(conn, args.start, args.end, args.by), ["period", "type", "count"]
+    elif args.command == "errors":
+        result, columns = error_histogram(conn, args.start, args.end), ["code", "name", "count"]
+    elif args.summary:
+        result, columns = [gap_summary(conn, args.start, args.end)], ["count", "min", "max", "mean"]
+    else:
+        result, columns = gaps(conn, args.start, args.end), ["ts", "last_sample", "first_sample", "gap", "log"]
+    conn.close()
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    elif columns is None:
+        for log, added in result.items():
+            print(f"{log}: {added} new events")
+    else:
+        _print_rows(result, columns)
+
+
+if __name__ == "__main__":
+    main()
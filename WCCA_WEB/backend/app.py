@@ -1,18 +1,30 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import os
 import sys
-import csv
 import json
+import hashlib
 import logging
 from pathlib import Path
 import threading
+import asyncio
+import uuid
+from collections import OrderedDict
 
 # Add parent directory to path to import modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from digikey import digikey_search
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from digikey import write_parts_json
+from bom_reader import BomLine, expand_refs, read_bom, search_bom_async
+from part_cache import get_part_cache
+from netlist_index import NetlistIndex
+from rules_engine import RuleChecker, load_rules
+from wcca_engine import DEFAULT_SAMPLES, analysis_from_spec, bom_refs
 from gen_ai import genAi
+from progress_channels import create_channel, get_channel, latest_channel
+from job_queue import JobQueue, JobCancelled, QueueFull
+from parts_store import PartsStore, StaleCursor
 
 app = Flask(__name__)
 CORS(app)
@@ -37,71 +49,100 @@ logging.basicConfig(
     format="%(asctime)s %(levelname)s:%(message)s"
 )
 
-# Global state for progress tracking
-progress_state = {
-    'total': 0,
-    'done': 0,
-    'status': 'idle'  # idle, processing, completed, error
-}
+# Job queue: a fixed pool of search workers shared fairly across users
+JOBS_DB = os.getenv('WCCA_JOBS_DB') or os.path.join(UPLOAD_FOLDER, 'wcca_jobs.sqlite3')
+SEARCH_WORKERS = int(os.getenv('WCCA_SEARCH_WORKERS', '2'))
+MAX_QUEUED_JOBS = int(os.getenv('WCCA_MAX_QUEUED_JOBS', '50'))
+MAX_JOBS_PER_USER = int(os.getenv('WCCA_MAX_JOBS_PER_USER', '10'))
+ADMIN_TOKEN = os.getenv('WCCA_ADMIN_TOKEN', '')
+
+# Parsed netlist indexes, keyed by file hash so re-uploads of a design skip parsing
+NETLIST_CACHE = os.getenv('WCCA_NETLIST_CACHE') or os.path.join(UPLOAD_FOLDER, 'netlist_cache')
+
+# Rule checks kept for incremental re-checks (most recent MAX_RULE_CHECKS)
+MAX_RULE_CHECKS = 16
+rule_checks = OrderedDict()
+rule_checks_lock = threading.Lock()
+
+# Upper bound on Monte Carlo samples per analysis request (8 bytes per sample per node)
+WCCA_MAX_SAMPLES = int(os.getenv('WCCA_MAX_SAMPLES', '2000000'))
+
+# parts.json is kept as a persistence sink; /api/parts serves the latest
+# search results from memory and only falls back to the file after a restart.
+# Either way the records are indexed once per version, not per request.
+PARTS_PATH = Path(__file__).parent.parent / "parts.json"
+latest_parts = None
+parts_store = PartsStore(PARTS_PATH)
 
 def allowed_file(filename, file_type):
     """Check if file extension is allowed for the given type"""
     ext = os.path.splitext(filename)[1].lower()
     return ext in ALLOWED_EXTENSIONS.get(file_type, [])
 
-def extract_part_numbers_from_csv(filepath):
-    """Extract part numbers and IC chips from CSV file"""
-    part_numbers = []
-    ref_designators = []
+def run_search_job(job, cancel_event):
+    """Job queue worker body: parse and search one BOM, streaming its progress
+
+    Lookups start while the BOM is still being read, so the channel's total
+    grows with the unique part numbers found so far.
+    """
+    global latest_parts
+    channel = create_channel(0, job_id=job['job_id'])
+    channel.set_status('processing')
     
+    def on_result(result):
+        # Raising here aborts the search
+        if cancel_event.is_set():
+            raise JobCancelled('Search cancelled')
+        channel.part_result(result)
+    
+    bom_path = os.path.join(app.config['UPLOAD_FOLDER'], job['filename'])
     try:
-        with open(filepath, "r", encoding="utf-8", errors="ignore", newline="") as f:
-            sample = f.read(2048)
-            f.seek(0)
-            
-            # Detect delimiter
-            try:
-                dialect = csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
-            except csv.Error:
-                dialect = csv.get_dialect("excel")
-            
-            # Detect header
-            has_header = False
-            try:
-                has_header = csv.Sniffer().has_header(sample)
-            except Exception:
-                has_header = False
-            
-            reader = csv.reader(f, dialect)
-            for idx, row in enumerate(reader):
-                if not row:
-                    continue
-                if has_header and idx == 0:
-                    continue
-                
-                if len(row) >= 2:
-                    part_number = row[0].strip()
-                    ref_designator = row[1].strip()
-                    if part_number:
-                        part_numbers.append(part_number)
-                        ref_designators.append(ref_designator)
-        
-        # Extract IC chips (components with 'U' in reference designator)
-        chip_indices = [
-            i for i, ref in enumerate(ref_designators)
-            if "u" in ref.lower()
-        ]
-        chips = [part_numbers[i] for i in chip_indices]
-        
-        # De-duplicate while preserving order
-        seen = set()
-        unique_parts = [x for x in part_numbers if not (x in seen or seen.add(x))]
-        
-        return unique_parts, chips
-        
+        lines, results = asyncio.run(search_bom_async(
+            bom_path, on_result=on_result, on_progress=lambda done, seen: channel.set_total(seen),
+            cache=get_part_cache()
+        ))
+    except JobCancelled:
+        channel.finish('cancelled')
+        raise
     except Exception as e:
-        logging.error(f"Error extracting part numbers from CSV: {e}", exc_info=True)
+        logging.error(f"DigiKey search error: {e}", exc_info=True)
+        channel.finish('error', error=str(e))
         raise
+    
+    # IC chips (U designators) for the circuit name
+    chips = list(dict.fromkeys(line.part_number for line in lines if line.is_ic))
+    write_parts_json(results.records, PARTS_PATH)
+    latest_parts = results.records
+    channel.finish('completed', results.records, chips=chips)
+    return dict(channel.snapshot(), chips=chips)
+
+job_queue = JobQueue(
+    run_search_job, JOBS_DB,
+    workers=SEARCH_WORKERS, max_queued=MAX_QUEUED_JOBS, max_per_user=MAX_JOBS_PER_USER
+)
+_queue_started = False
+_queue_start_lock = threading.Lock()
+
+@app.before_request
+def start_job_queue():
+    """Start the workers (and re-queue unfinished jobs) on the first request.
+    
+    Done lazily rather than at import so the Flask reloader's parent
+    process never runs jobs.
+    """
+    global _queue_started
+    if _queue_started:
+        return
+    with _queue_start_lock:
+        if not _queue_started:
+            resumed = job_queue.start()
+            if resumed:
+                logging.warning(f"Re-queued {resumed} unfinished search job(s)")
+            _queue_started = True
+
+def current_user():
+    """Identity used for fair scheduling (X-User header, else client address)"""
+    return request.headers.get('X-User') or request.remote_addr or 'anonymous'
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -154,32 +195,30 @@ def upload_file(file_type):
             'preview': preview
         }
         
-        # If CSV, extract part numbers and trigger DigiKey search
+        # If XML, index the netlist; a file that is not a netlist still uploads
+        if file_type == 'xml':
+            try:
+                response['netlist'] = NetlistIndex.load(filepath, cache_dir=NETLIST_CACHE).stats()
+            except ValueError as e:
+                response['netlist_error'] = str(e)
+        
+        # If YAML, compile the constraints so a bad file is reported at upload
+        if file_type == 'yaml':
+            try:
+                plan = load_rules(filepath)
+                response['rules'] = {'count': len(plan), 'names': plan.names}
+            except ValueError as e:
+                response['rules_error'] = str(e)
+        
+        # If CSV, queue the DigiKey search; the job reads the BOM itself and
+        # streams parts (and the IC chips, on completion) to its channel
         if file_type == 'csv':
-            part_numbers, chips = extract_part_numbers_from_csv(filepath)
-            response['part_numbers'] = part_numbers
-            response['chips'] = chips
-            response['total_parts'] = len(part_numbers)
-            
-            # Start DigiKey search in background
-            def search_task():
-                global progress_state
-                progress_state['total'] = len(part_numbers)
-                progress_state['done'] = 0
-                progress_state['status'] = 'processing'
-                
-                def on_progress(done, total):
-                    progress_state['done'] = done
-                    progress_state['total'] = total
-                
-                try:
-                    digikey_search(part_numbers, on_progress=on_progress)
-                    progress_state['status'] = 'completed'
-                except Exception as e:
-                    logging.error(f"DigiKey search error: {e}", exc_info=True)
-                    progress_state['status'] = 'error'
-            
-            threading.Thread(target=search_task, daemon=True).start()
+            try:
+                job_id = job_queue.submit(current_user(), filename)
+            except QueueFull as e:
+                return jsonify({'error': str(e)}), 429
+            create_channel(0, job_id=job_id, status='queued')
+            response['job_id'] = job_id
         
         return jsonify(response), 200
         
@@ -189,36 +228,165 @@ def upload_file(file_type):
 
 @app.route('/api/progress', methods=['GET'])
 def get_progress():
-    """Get DigiKey search progress"""
-    return jsonify(progress_state)
+    """Get DigiKey search progress of the most recent job (legacy polling)"""
+    channel = latest_channel()
+    if channel is None:
+        return jsonify({'total': 0, 'done': 0, 'status': 'idle'})
+    return jsonify(channel.snapshot())
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """List the current user's search jobs, newest first"""
+    return jsonify({'jobs': job_queue.list(user=current_user())})
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Persistent record of one search job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a queued or running search job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    cancelled_in = job_queue.cancel(job_id)
+    if cancelled_in is None:
+        return jsonify({'error': f"Job already {job['status']}"}), 409
+    
+    # A running job closes its own channel when the search stops
+    channel = get_channel(job_id)
+    if channel is not None and cancelled_in == 'queued':
+        channel.finish('cancelled')
+    return jsonify({'job_id': job_id, 'cancelled': True})
+
+@app.route('/api/jobs/<job_id>/progress', methods=['GET'])
+def get_job_progress(job_id):
+    """Get DigiKey search progress of one job"""
+    channel = get_channel(job_id)
+    if channel is None:
+        job = job_queue.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(dict({'total': 0, **(job['summary'] or {})}, job_id=job_id, status=job['status']))
+    return jsonify(channel.snapshot())
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """Server-sent events: one 'part' event per searched part, then 'complete'"""
+    channel = get_channel(job_id)
+    if channel is None:
+        # Not in memory (e.g. after a restart): fall back to the job record
+        job = job_queue.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        if job['status'] in ('queued', 'running'):
+            channel = create_channel(0, job_id=job_id, status=job['status'])
+        else:
+            summary = dict({'total': 0, **(job['summary'] or {})}, job_id=job_id, status=job['status'],
+                           error=job['error'])
+            return Response(f"event: complete\ndata: {json.dumps(summary)}\n\n", mimetype='text/event-stream')
+    
+    last_event_id = request.headers.get('Last-Event-ID', '0')
+    last_event_id = int(last_event_id) if last_event_id.isdigit() else 0
+    return Response(
+        stream_with_context(channel.stream(last_event_id)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def parts_index(job_id=None):
+    """(PartsIndex, None) of a job's results, the latest search or parts.json; (None, error) if missing"""
+    if job_id:
+        channel = get_channel(job_id)
+        if channel is None or channel.records is None:
+            return None, 'Parts data not available for this job'
+        return parts_store.memory_index(job_id, channel.records), None
+    if latest_parts is not None:
+        return parts_store.memory_index('latest', latest_parts), None
+    index = parts_store.file_index()
+    if index is None:
+        return None, 'Parts data not available yet'
+    return index, None
 
 @app.route('/api/parts', methods=['GET'])
 def get_parts():
-    """Get parts data from parts.json"""
+    """Get parts data of a job (?job_id=), or of the latest search / parts.json
+    
+    Without paging parameters the full {capacitors, resistors, others, total}
+    payload is returned. With any of category, limit, cursor, fields,
+    filter[<attribute>] or min/max[<parameter>] a single page is returned instead:
+    {items, total, next_cursor, category, counts}.
+    Responses carry an ETag; a matching If-None-Match gets 304.
+    """
     try:
-        parts_path = Path(__file__).parent.parent / "parts.json"
-        if not parts_path.exists():
-            return jsonify({'error': 'Parts data not available yet'}), 404
+        index, error = parts_index(request.args.get('job_id'))
+        if index is None:
+            return jsonify({'error': error}), 404
+        
+        filters = {}
+        ranges = {}
+        for key, value in request.args.items():
+            if key.startswith('filter[') and key.endswith(']'):
+                filters[key[7:-1]] = value
+            elif key.startswith(('min[', 'max[')) and key.endswith(']'):
+                low, high = ranges.get(key[4:-1], (None, None))
+                try:
+                    bound = float(value)
+                except ValueError:
+                    return jsonify({'error': f"'{key}' must be a number"}), 400
+                ranges[key[4:-1]] = (bound, high) if key.startswith('min[') else (low, bound)
+        paged = filters or ranges or any(k in request.args for k in ('category', 'limit', 'cursor', 'fields'))
         
-        with open(parts_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if not paged:
+            etag = index.etag
+        else:
+            # Same data + same query -> same page
+            query = request.query_string.decode('utf-8', 'replace')
+            etag = f"{index.etag}-{hashlib.sha1(query.encode()).hexdigest()[:8]}"
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
         
-        # Categorize parts
-        caps = [d for d in data if "Capacitance" in d]
-        ress = [d for d in data if "Resistance" in d]
-        others = [d for d in data if "Capacitance" not in d and "Resistance" not in d]
+        if not paged:
+            response = Response(index.legacy_body(), mimetype='application/json')
+        else:
+            category = request.args.get('category') or None
+            fields = [f for f in request.args.get('fields', '').split(',') if f.strip()]
+            try:
+                page = index.query(
+                    category=category,
+                    filters=filters,
+                    ranges=ranges,
+                    fields=[f.strip() for f in fields] or None,
+                    cursor=request.args.get('cursor'),
+                    limit=request.args.get('limit', type=int)
+                )
+            except StaleCursor as e:
+                return jsonify({'error': str(e)}), 409
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            response = jsonify(dict(page, category=category, counts=index.counts()))
         
-        return jsonify({
-            'capacitors': caps,
-            'resistors': ress,
-            'others': others,
-            'total': len(data)
-        })
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
         
     except Exception as e:
         logging.error(f"Error reading parts: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/admin/queue', methods=['GET'])
+def admin_queue():
+    """Queue depth and worker usage (requires X-Admin-Token when WCCA_ADMIN_TOKEN is set)"""
+    if ADMIN_TOKEN and request.headers.get('X-Admin-Token') != ADMIN_TOKEN:
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify(job_queue.stats())
+
 @app.route('/api/circuit-name', methods=['POST'])
 def get_circuit_name():
     """Generate circuit name using GenAI"""
@@ -236,6 +404,174 @@ def get_circuit_name():
         logging.error(f"GenAI error: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/wcca/analyze', methods=['POST'])
+def run_wcca_analysis():
+    """Worst-case analysis (nominal, EVA, RSS, Monte Carlo) of user-defined circuit nodes
+    
+    Body: the wcca_engine spec ({nodes, variables, temperature, distribution})
+    plus optional job_id (parts and BOM of that search job), bom (an uploaded
+    CSV, when there is no job), samples and seed. Names used in node
+    expressions that are not declared variables are bound to BOM reference
+    designators.
+    """
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'The analysis spec must be a JSON object'}), 400
+    job_id = data.get('job_id')
+    samples = data.get('samples', DEFAULT_SAMPLES)
+    if not isinstance(samples, int) or not 0 <= samples <= WCCA_MAX_SAMPLES:
+        return jsonify({'error': f'samples must be an integer from 0 to {WCCA_MAX_SAMPLES}'}), 400
+    
+    index, error = parts_index(job_id)
+    if index is None:
+        return jsonify({'error': error}), 404
+    parts = {row['part_number'].upper(): row for row in index.params().to_records()}
+    
+    bom_name = data.get('bom')
+    if job_id:
+        job = job_queue.get(job_id)
+        bom_name = job['filename'] if job else None
+    refs = None
+    if bom_name:
+        bom_path = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(bom_name))
+        if not os.path.exists(bom_path):
+            return jsonify({'error': f'BOM {bom_name} not found'}), 404
+        refs = bom_refs(bom_path)
+    
+    try:
+        analysis = analysis_from_spec(data, parts, refs)
+        return jsonify(analysis.run(samples, data.get('seed')))
+    except (ValueError, KeyError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logging.error(f"WCCA analysis error: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+def uploaded_path(name):
+    """Path of an uploaded file, or None if it does not exist"""
+    path = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(name))
+    return path if os.path.exists(path) else None
+
+@app.route('/api/rules/check', methods=['POST'])
+def check_rules():
+    """Check a BOM (and optionally its netlist) against an uploaded constraints file
+    
+    Body: constraints (uploaded .yaml), job_id (BOM and parts of a search job)
+    or bom (an uploaded CSV), optional netlist (an uploaded .xml). The response
+    is the violations report plus a check_id for /api/rules/check/<check_id>/line.
+    """
+    data = request.get_json(silent=True) or {}
+    job_id = data.get('job_id')
+    constraints = uploaded_path(data.get('constraints') or '')
+    if constraints is None:
+        return jsonify({'error': 'constraints file not found'}), 404
+    
+    bom_name = data.get('bom')
+    if job_id:
+        job = job_queue.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        bom_name = job['filename']
+    bom_path = uploaded_path(bom_name or '')
+    if bom_path is None:
+        return jsonify({'error': f'BOM {bom_name} not found'}), 404
+    
+    # Parameters come from the job's (or latest) search; manufacturer and
+    # alternate rules still work from the BOM alone
+    index, error = parts_index(job_id)
+    if index is None and job_id:
+        return jsonify({'error': error}), 404
+    parts = {row['part_number'].upper(): row for row in index.params().to_records()} if index else {}
+    
+    try:
+        netlist = None
+        if data.get('netlist'):
+            netlist_path = uploaded_path(data['netlist'])
+            if netlist_path is None:
+                return jsonify({'error': f"Netlist {data['netlist']} not found"}), 404
+            netlist = NetlistIndex.load(netlist_path, cache_dir=NETLIST_CACHE)
+        checker = RuleChecker(load_rules(constraints), read_bom(bom_path), parts, netlist)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logging.error(f"Rule check error: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+    
+    check_id = uuid.uuid4().hex
+    with rule_checks_lock:
+        rule_checks[check_id] = checker
+        while len(rule_checks) > MAX_RULE_CHECKS:
+            rule_checks.popitem(last=False)
+        report = checker.report()
+    report['check_id'] = check_id
+    return jsonify(report)
+
+@app.route('/api/rules/check/<check_id>/line', methods=['POST'])
+def recheck_line(check_id):
+    """Change one BOM line of a rule check and re-check only that line
+    
+    Body: line_no plus part_number and optional manufacturer, alternates and
+    refs (the line's current designators are kept when refs is omitted).
+    """
+    data = request.get_json(silent=True) or {}
+    with rule_checks_lock:
+        checker = rule_checks.get(check_id)
+        if checker is None:
+            return jsonify({'error': 'Rule check not found; run /api/rules/check again'}), 404
+        rule_checks.move_to_end(check_id)
+        line = checker.lines.get(data.get('line_no'))
+        if line is None or not data.get('part_number'):
+            return jsonify({'error': 'line_no of an existing BOM line and part_number are required'}), 400
+        refs = data.get('refs', line.ref_designators)
+        refs = expand_refs(refs) if isinstance(refs, str) else [str(r) for r in refs]
+        rechecked = checker.update_line(BomLine(
+            line.line_no, str(data['part_number']).strip(), data.get('manufacturer'),
+            [str(p) for p in data.get('alternates', [])], refs, line.quantity,
+        ))
+        report = checker.report()
+    report['check_id'] = check_id
+    report['rechecked_rows'] = rechecked
+    return jsonify(report)
+
+@app.route('/api/netlist/<filename>', methods=['GET'])
+def get_netlist(filename):
+    """Connectivity of an uploaded netlist
+    
+    Without arguments returns the index stats. ?ref=<refdes> returns that
+    component with its pin -> net map, ?net=<name> the pins on that net.
+    ?bom=<uploaded csv> links components to BOM lines and lists the refs
+    missing from either side.
+    """
+    filepath = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(filename))
+    if not os.path.exists(filepath):
+        return jsonify({'error': 'File not found'}), 404
+    try:
+        index = NetlistIndex.load(filepath, cache_dir=NETLIST_CACHE)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    response = index.stats()
+    bom_name = request.args.get('bom')
+    if bom_name:
+        bom_path = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(bom_name))
+        if not os.path.exists(bom_path):
+            return jsonify({'error': f'BOM {bom_name} not found'}), 404
+        not_in_bom, not_in_netlist = index.link_bom(read_bom(bom_path))
+        response['not_in_bom'] = not_in_bom
+        response['not_in_netlist'] = not_in_netlist
+    
+    ref = request.args.get('ref')
+    if ref:
+        if not index.has_ref(ref):
+            return jsonify({'error': f'Unknown reference designator {ref}'}), 404
+        response['component'] = index.component(ref)
+    net = request.args.get('net')
+    if net:
+        if not index.has_net(net):
+            return jsonify({'error': f'Unknown net {net}'}), 404
+        response['net'] = {'name': net, 'pins': [{'ref': r, 'pin': p} for r, p in index.pins_of(net)]}
+    return jsonify(response)
+
 @app.route('/api/files/<filename>', methods=['GET'])
 def get_file(filename):
     """Serve uploaded files"""
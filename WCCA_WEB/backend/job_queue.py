@@ -0,0 +1,200 @@
+"""Bounded, fair job queue for BOM searches.
+
+Uploads are queued per user and a fixed pool of worker threads takes jobs
+round-robin across users, so one large burst cannot starve everyone else
+or open unbounded connections to Digi-Key. Job records live in a small
+SQLite file; on restart, jobs that were queued or running are queued again.
+"""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+ACTIVE = ('queued', 'running')
+
+
+class QueueFull(Exception):
+    """Raised when the queue (or the user's share of it) is at capacity."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once it has been cancelled."""
+
+
+class JobQueue:
+    """Per-user FIFO queues served round-robin by ``workers`` threads.
+
+    ``run_job(job, cancel_event)`` does the work and returns a JSON-able
+    summary; it should check ``cancel_event`` (or let :class:`JobCancelled`
+    propagate) to stop early.
+    """
+
+    def __init__(self, run_job, db_path, workers=2, max_queued=50, max_per_user=10):
+        self.run_job = run_job
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_per_user = max_per_user
+        self._cond = threading.Condition()
+        self._queues = OrderedDict()   # user -> deque of job ids, in round-robin order
+        self._running = {}             # job id -> cancel event
+        self._threads = []
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY,"
+            " user TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " filename TEXT NOT NULL,"
+            " summary TEXT,"
+            " error TEXT,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+        self._conn.commit()
+
+    # -- records -------------------------------------------------------------
+
+    def _update(self, job_id, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._db_lock:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE job_id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def _row_to_job(self, row):
+        keys = ('job_id', 'user', 'status', 'filename', 'summary', 'error',
+                'created_at', 'started_at', 'finished_at')
+        job = dict(zip(keys, row))
+        job['summary'] = json.loads(job['summary']) if job['summary'] else None
+        return job
+
+    def get(self, job_id):
+        with self._db_lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list(self, user=None, limit=50):
+        query, args = "SELECT * FROM jobs", ()
+        if user is not None:
+            query, args = query + " WHERE user = ?", (user,)
+        with self._db_lock:
+            rows = self._conn.execute(query + " ORDER BY created_at DESC LIMIT ?", (*args, limit)).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    # -- scheduling ----------------------------------------------------------
+
+    def start(self):
+        """Re-queue unfinished jobs from a previous run and start the workers."""
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT job_id, user FROM jobs WHERE status IN (?, ?) ORDER BY created_at", ACTIVE
+            ).fetchall()
+            self._conn.execute("UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'")
+            self._conn.commit()
+        with self._cond:
+            for job_id, user in rows:
+                self._queues.setdefault(user, deque()).append(job_id)
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"wcca-job-worker-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return len(rows)
+
+    def submit(self, user, filename):
+        """Queue a job for an uploaded file and return its id.
+
+        The job reads the file itself when a worker takes it. Raises
+        :class:`QueueFull` when at capacity.
+        """
+        job_id = uuid.uuid4().hex[:12]
+        with self._cond:
+            queued = sum(len(q) for q in self._queues.values())
+            if queued >= self.max_queued:
+                raise QueueFull(f"Job queue is full ({self.max_queued} jobs waiting)")
+            if len(self._queues.get(user, ())) >= self.max_per_user:
+                raise QueueFull(f"Too many queued jobs for this user (max {self.max_per_user})")
+            with self._db_lock:
+                self._conn.execute(
+                    "INSERT INTO jobs (job_id, user, status, filename, created_at)"
+                    " VALUES (?, ?, 'queued', ?, ?)",
+                    (job_id, user, filename, time.time())
+                )
+                self._conn.commit()
+            self._queues.setdefault(user, deque()).append(job_id)
+            self._cond.notify()
+        return job_id
+
+    def cancel(self, job_id):
+        """Cancel a job.
+
+        Returns the state it was cancelled in: 'queued' (removed from the
+        queue) or 'running' (asked to stop), or None if it already finished.
+        """
+        with self._cond:
+            for user, queue in self._queues.items():
+                if job_id in queue:
+                    queue.remove(job_id)
+                    if not queue:
+                        del self._queues[user]
+                    self._update(job_id, status='cancelled', finished_at=time.time())
+                    return 'queued'
+            cancel_event = self._running.get(job_id)
+            if cancel_event is None:
+                return None
+            cancel_event.set()
+            return 'running'
+
+    def _next_job(self):
+        """Pop the next job id, rotating the serving order across users. Lock held."""
+        user, queue = next(iter(self._queues.items()))
+        job_id = queue.popleft()
+        del self._queues[user]
+        if queue:
+            # Move the user to the back so the others get a turn first
+            self._queues[user] = queue
+        return job_id
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queues:
+                    self._cond.wait()
+                job_id = self._next_job()
+                cancel_event = threading.Event()
+                self._running[job_id] = cancel_event
+            try:
+                self._update(job_id, status='running', started_at=time.time())
+                summary = self.run_job(self.get(job_id), cancel_event)
+                status = 'cancelled' if cancel_event.is_set() else 'completed'
+                self._update(job_id, status=status, summary=json.dumps(summary), finished_at=time.time())
+            except JobCancelled:
+                self._update(job_id, status='cancelled', finished_at=time.time())
+            except Exception as e:
+                self._update(job_id, status='error', error=str(e), finished_at=time.time())
+            finally:
+                with self._cond:
+                    self._running.pop(job_id, None)
+
+    def stats(self):
+        """Queue depth and worker usage for the admin endpoint."""
+        with self._cond:
+            per_user = {user: len(queue) for user, queue in self._queues.items()}
+            running = list(self._running)
+        with self._db_lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {
+            'workers': self.workers,
+            'busy_workers': len(running),
+            'idle_workers': self.workers - len(running),
+            'queue_depth': sum(per_user.values()),
+            'max_queued': self.max_queued,
+            'max_per_user': self.max_per_user,
+            'queued_per_user': per_user,
+            'running_jobs': running,
+            'jobs_by_status': counts,
+        }
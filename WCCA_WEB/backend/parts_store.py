@@ -0,0 +1,205 @@
+"""Indexed, in-memory views of Digi-Key part records for /api/parts.
+
+A :class:`PartsIndex` is built once per set of records: the three UI
+categories, a lazily built value index per filtered attribute, an ETag and
+the pre-serialized legacy response. :class:`PartsStore` keeps the index of
+``parts.json`` (rebuilt only when the file's mtime or size changes) and of
+in-memory search results (rebuilt only when a job's record list changes).
+"""
+import base64
+import bisect
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from part_params import COLUMNS, ParamTable
+
+CATEGORIES = ('capacitors', 'resistors', 'others')
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+MAX_MEMORY_INDEXES = 32
+
+
+class StaleCursor(Exception):
+    """Raised when a cursor was issued for a different version of the data."""
+
+
+def _normalize(value):
+    return str(value).strip().casefold()
+
+
+class PartsIndex:
+    """Immutable snapshot of part records with category and attribute indexes."""
+
+    def __init__(self, records, etag):
+        self.records = records
+        self.etag = etag
+        # Same membership rules as the old linear scans: a record with both
+        # attributes is listed under capacitors and resistors
+        self.categories = {name: [] for name in CATEGORIES}
+        for row, record in enumerate(records):
+            if 'Capacitance' in record:
+                self.categories['capacitors'].append(row)
+            if 'Resistance' in record:
+                self.categories['resistors'].append(row)
+            if 'Capacitance' not in record and 'Resistance' not in record:
+                self.categories['others'].append(row)
+        self._category_sets = {name: set(rows) for name, rows in self.categories.items()}
+        self._values = {}
+        self._lock = threading.Lock()
+        self._legacy_body = None
+        self._params = None
+
+    @classmethod
+    def from_records(cls, records):
+        body = json.dumps(records, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return cls(list(records), hashlib.sha1(body).hexdigest()[:16])
+
+    def counts(self):
+        return {name: len(rows) for name, rows in self.categories.items()}
+
+    def legacy_body(self):
+        """The original {capacitors, resistors, others, total} payload, serialized once."""
+        if self._legacy_body is None:
+            payload = {name: [self.records[row] for row in rows] for name, rows in self.categories.items()}
+            payload['total'] = len(self.records)
+            self._legacy_body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        return self._legacy_body
+
+    def _value_index(self, field):
+        """Normalized value -> row ids for one attribute, built on first use."""
+        with self._lock:
+            index = self._values.get(field)
+            if index is None:
+                index = {}
+                for row, record in enumerate(self.records):
+                    if field in record:
+                        index.setdefault(_normalize(record[field]), []).append(row)
+                self._values[field] = index
+            return index
+
+    def params(self):
+        """Normalized :class:`part_params.ParamTable` of the records, built on first use."""
+        with self._lock:
+            if self._params is None:
+                self._params = ParamTable.from_records(self.records)
+            return self._params
+
+    def _range_rows(self, ranges):
+        """Row ids whose normalized columns fall inside every (low, high) range."""
+        for name in ranges:
+            if name not in COLUMNS or COLUMNS[name] is np.str_:
+                raise ValueError(f"Unknown numeric parameter '{name}'")
+        table = self.params()
+        return table['row'][table.mask(**ranges)].tolist()
+
+    def encode_cursor(self, row):
+        return base64.urlsafe_b64encode(f"{self.etag}:{row}".encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            etag, row = base64.urlsafe_b64decode(padded.encode()).decode().rsplit(':', 1)
+            row = int(row)
+        except (ValueError, UnicodeDecodeError):
+            raise ValueError('Malformed cursor')
+        if etag != self.etag:
+            raise StaleCursor('Parts data changed since this cursor was issued')
+        return row
+
+    def query(self, category=None, filters=None, ranges=None, fields=None, cursor=None, limit=None):
+        """One page of records.
+
+        Args:
+            category: 'capacitors', 'resistors', 'others' or None for all
+            filters: {attribute: value}; case-insensitive exact matches, ANDed
+            ranges: {normalized parameter: (low, high)} in SI units, either bound
+                may be None; parts with an unknown value never match
+            fields: attributes to return per record (None for all)
+            cursor: ``next_cursor`` of the previous page
+            limit: page size (default DEFAULT_LIMIT, at most MAX_LIMIT)
+
+        Returns:
+            dict with 'items', 'total' (matching records), 'next_cursor'
+        """
+        if category is not None and category not in self.categories:
+            raise ValueError(f"Unknown category '{category}' (expected one of {', '.join(CATEGORIES)})")
+        limit = min(max(limit or DEFAULT_LIMIT, 1), MAX_LIMIT)
+        # Row id lists are in record order; walk the shortest and probe the others
+        candidates = [self._value_index(field).get(_normalize(value), []) for field, value in (filters or {}).items()]
+        if ranges:
+            candidates.append(self._range_rows(ranges))
+        if category:
+            candidates.append(self.categories[category])
+        if not candidates:
+            rows = range(len(self.records))
+        else:
+            candidates.sort(key=len)
+            rows = candidates[0]
+            for other in candidates[1:]:
+                members = self._category_sets[category] if other is self.categories.get(category) else set(other)
+                rows = [row for row in rows if row in members]
+
+        start = 0
+        if cursor:
+            start = bisect.bisect_right(rows, self.decode_cursor(cursor))
+        page = rows[start:start + limit]
+        more = start + limit < len(rows)
+
+        if fields:
+            items = [{f: self.records[row][f] for f in fields if f in self.records[row]} for row in page]
+        else:
+            items = [self.records[row] for row in page]
+        return {
+            'items': items,
+            'total': len(rows),
+            'next_cursor': self.encode_cursor(page[-1]) if more and page else None,
+        }
+
+
+class PartsStore:
+    """Index cache for parts.json and for in-memory search results."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file_signature = None
+        self._file_index = None
+        self._memory = OrderedDict()   # key -> (records list, PartsIndex), least recently used first
+
+    def file_index(self):
+        """Index of parts.json, or None if it does not exist.
+
+        Only a stat() per call; the file is re-read when its mtime or size changes.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if signature != self._file_signature:
+                with open(self.path, 'rb') as f:
+                    raw = f.read()
+                self._file_index = PartsIndex(json.loads(raw), hashlib.sha1(raw).hexdigest()[:16])
+                self._file_signature = signature
+            return self._file_index
+
+    def memory_index(self, key, records):
+        """Index of an in-memory record list, rebuilt only when ``records`` is a new list."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] is records:
+                self._memory.move_to_end(key)
+                return entry[1]
+        index = PartsIndex.from_records(records)
+        with self._lock:
+            self._memory[key] = (records, index)
+            self._memory.move_to_end(key)
+            while len(self._memory) > MAX_MEMORY_INDEXES:
+                self._memory.popitem(last=False)
+        return index
@@ -0,0 +1,140 @@
+"""Per-job progress channels streamed to the browser as server-sent events.
+
+Every BOM search gets its own :class:`ProgressChannel`. The search thread
+publishes one event per part as results arrive; any number of SSE clients
+follow the channel, each from its own position in the event log, so a
+reconnecting ``EventSource`` (which sends ``Last-Event-ID``) resumes without
+losing or repeating events.
+"""
+import json
+import threading
+import time
+import uuid
+
+# Finished channels are kept this long for late subscribers and /api/parts
+FINISHED_TTL = 3600
+HEARTBEAT_INTERVAL = 15
+
+
+class ProgressChannel:
+    """Progress counters plus an append-only event log for one job."""
+
+    def __init__(self, job_id, total, status='processing'):
+        self.job_id = job_id
+        self.total = total
+        self.done = 0
+        self.found = 0
+        self.missed = 0
+        self.errors = 0
+        self.status = status
+        self.records = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._events = []
+        self._cond = threading.Condition()
+
+    def _publish(self, event, data):
+        """Append an event and wake every subscriber. Caller holds the lock."""
+        self._events.append((len(self._events) + 1, event, data))
+        self._cond.notify_all()
+
+    def part_result(self, result):
+        """Record one :class:`digikey.PartResult`."""
+        with self._cond:
+            self.done += 1
+            if result.status == 'found':
+                self.found += 1
+            elif result.status == 'miss':
+                self.missed += 1
+            else:
+                self.errors += 1
+            self._publish('part', {
+                'part_number': result.part_number,
+                'status': result.status,
+                'source': result.source,
+                'latency_ms': round(result.latency * 1000, 1),
+                'error': result.error,
+                'done': self.done,
+                'total': self.total,
+            })
+
+    def set_total(self, total):
+        """Raise the part count as the BOM parse finds more unique parts."""
+        with self._cond:
+            self.total = max(self.total, total)
+
+    def set_status(self, status):
+        with self._cond:
+            self.status = status
+            self._publish('status', self.snapshot())
+
+    def finish(self, status, records=None, error=None, **extra):
+        """Close the channel; ``extra`` (e.g. the BOM's chips) rides on 'complete'."""
+        with self._cond:
+            self.status = status
+            self.records = records
+            self.finished_at = time.time()
+            self._publish('complete', dict(self.snapshot(), error=error, **extra))
+
+    def snapshot(self):
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'total': self.total,
+            'done': self.done,
+            'found': self.found,
+            'missed': self.missed,
+            'errors': self.errors,
+        }
+
+    def stream(self, last_event_id=0):
+        """Yield SSE frames from ``last_event_id`` on until the job completes."""
+        position = last_event_id
+        yield f"retry: 2000\nevent: snapshot\ndata: {json.dumps(self.snapshot())}\n\n"
+        while True:
+            with self._cond:
+                if position >= len(self._events):
+                    self._cond.wait(HEARTBEAT_INTERVAL)
+                pending = self._events[position:]
+            if not pending:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                continue
+            for event_id, event, data in pending:
+                yield f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+                if event == 'complete':
+                    return
+            position = pending[-1][0]
+
+
+_channels = {}
+_channels_lock = threading.Lock()
+
+
+def create_channel(total, job_id=None, status='processing'):
+    """Return the channel for ``job_id`` (new id if None), creating it if needed.
+
+    Long-finished channels are dropped on the way.
+    """
+    now = time.time()
+    with _channels_lock:
+        for old_id, channel in list(_channels.items()):
+            if channel.finished_at and now - channel.finished_at > FINISHED_TTL:
+                del _channels[old_id]
+        job_id = job_id or uuid.uuid4().hex[:12]
+        if job_id not in _channels:
+            _channels[job_id] = ProgressChannel(job_id, total, status)
+        return _channels[job_id]
+
+
+def get_channel(job_id):
+    with _channels_lock:
+        return _channels.get(job_id)
+
+
+def latest_channel():
+    """Most recently created channel, or None."""
+    with _channels_lock:
+        if not _channels:
+            return None
+        return max(_channels.values(), key=lambda c: c.created_at)
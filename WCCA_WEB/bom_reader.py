@@ -0,0 +1,255 @@
+"""
+Streaming BOM reader shared by the Tk app and the Flask backend.
+
+``read_bom`` yields one normalized :class:`BomLine` per CSV row as the file
+is read: the primary part number, alternate manufacturer part numbers
+(``Manf2_partno`` ... columns), the expanded reference designators
+(``"R4,R5"``, ``"R1-R4"``) and the quantity. Both layouts in use are
+understood:
+
+* headerless ``part,refdes`` rows (``LDO BOM.csv``)
+* header rows with ``Manf1``/``Manf1_partno`` ... ``ManfN_partno`` columns
+  (``Constraints.yaml``), or ``Part Number`` / ``Ref`` / ``Qty`` style headers
+
+``search_bom`` starts Digi-Key lookups for each chunk of new part numbers
+while the rest of the file is still being parsed.
+"""
+import asyncio
+import csv
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from digikey import (
+    DEFAULT_CONCURRENCY, DEFAULT_TIMEOUT, PartResult, SearchResults,
+    _run_sync, digikey_search_async, open_session,
+)
+from part_cache import cache_key, get_part_cache
+
+SNIFF_BYTES = 16 * 1024
+
+PART_HEADERS = {"part", "partno", "part number", "part_number", "partnumber", "mpn",
+                "manufacturer part number", "mfr part number", "mfr part #", "manf1_partno"}
+REF_HEADERS = {"ref", "refdes", "ref des", "reference", "references", "designator",
+               "designators", "ref designator", "reference designator", "reference designators"}
+QTY_HEADERS = {"qty", "quantity", "count"}
+MFR_HEADERS = {"manufacturer", "mfr", "manf1"}
+
+_MANF_PARTNO = re.compile(r"^manf(\d+)_partno$")
+_REF_SPLIT = re.compile(r"[,;\s]+")
+_REF_RANGE = re.compile(r"^([A-Za-z_]+)(\d+)-(?:\1)?(\d+)$")
+_QTY = re.compile(r"\d+(?:\.0*)?")
+
+
+@dataclass
+class BomLine:
+    """One normalized BOM row."""
+    line_no: int
+    part_number: str
+    manufacturer: Optional[str] = None
+    alternates: List[str] = field(default_factory=list)
+    ref_designators: List[str] = field(default_factory=list)
+    quantity: int = 1
+
+    @property
+    def is_ic(self):
+        """True when any designator is a U (integrated circuit) reference."""
+        return any(ref[:1].upper() == "U" for ref in self.ref_designators)
+
+
+def expand_refs(cell):
+    """Split a designator cell and expand ranges: ``"R4,R5"``, ``"R1-R3"``, ``"C1-4"``."""
+    refs = []
+    for token in _REF_SPLIT.split(cell.strip()):
+        if not token:
+            continue
+        match = _REF_RANGE.match(token)
+        if match and int(match.group(3)) >= int(match.group(2)):
+            prefix, start, end = match.group(1), int(match.group(2)), int(match.group(3))
+            refs.extend(f"{prefix}{n}" for n in range(start, end + 1))
+        else:
+            refs.append(token)
+    return refs
+
+
+def _normalize(cell):
+    return " ".join(cell.split())
+
+
+class _Columns:
+    """Column layout resolved from the header row (or the headerless default)."""
+
+    def __init__(self, header=None):
+        self.part, self.ref, self.qty, self.mfr = 0, 1, None, None
+        self.alternates = []   # (manufacturer column or None, part number column)
+        if header is None:
+            return
+        names = [_normalize(h).lower() for h in header]
+        manf = {}
+        for i, name in enumerate(names):
+            match = _MANF_PARTNO.match(name)
+            if match:
+                manf[int(match.group(1))] = i
+        self.part = next((i for i, n in enumerate(names) if n in PART_HEADERS), None)
+        self.ref = next((i for i, n in enumerate(names) if n in REF_HEADERS), None)
+        self.qty = next((i for i, n in enumerate(names) if n in QTY_HEADERS), None)
+        self.mfr = next((i for i, n in enumerate(names) if n in MFR_HEADERS), None)
+        if manf:
+            first = min(manf)
+            if self.part is None or self.part == manf[first]:
+                self.part = manf[first]
+            for n in sorted(manf):
+                if manf[n] == self.part:
+                    continue
+                mfr_name = f"manf{n}"
+                self.alternates.append((names.index(mfr_name) if mfr_name in names else None, manf[n]))
+        if self.part is None:
+            self.part = 0
+
+    @staticmethod
+    def is_header(row):
+        names = {_normalize(c).lower() for c in row}
+        known = PART_HEADERS | REF_HEADERS | QTY_HEADERS | MFR_HEADERS
+        return bool(names & known) or any(_MANF_PARTNO.match(n) for n in names)
+
+
+def _cell(row, index):
+    return row[index].strip() if index is not None and index < len(row) else ""
+
+
+def read_bom(path, encoding="utf-8"):
+    """Yield a :class:`BomLine` for every row with a part number, in file order.
+
+    The delimiter is sniffed from the first 16 KB; the file is otherwise read
+    one row at a time, so memory use does not grow with the BOM size.
+    """
+    with open(path, "r", encoding=encoding, errors="ignore", newline="") as f:
+        sample = f.read(SNIFF_BYTES)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
+        except csv.Error:
+            dialect = csv.get_dialect("excel")
+
+        columns = None
+        for line_no, row in enumerate(csv.reader(f, dialect), start=1):
+            if not "".join(row).strip():
+                continue
+            if columns is None:
+                if _Columns.is_header(row):
+                    columns = _Columns(row)
+                    continue
+                columns = _Columns()
+
+            part = _cell(row, columns.part)
+            if not part:
+                continue
+            alternates = []
+            for _, alt_col in columns.alternates:
+                alt = _cell(row, alt_col)
+                if alt and alt != part and alt not in alternates:
+                    alternates.append(alt)
+            refs = expand_refs(_cell(row, columns.ref)) if columns.ref is not None else []
+            qty = _cell(row, columns.qty)
+            quantity = int(float(qty)) if qty and _QTY.fullmatch(qty) else (len(refs) or 1)
+            manufacturer = _cell(row, columns.mfr) or None
+
+            yield BomLine(line_no, part, manufacturer, alternates, refs, quantity)
+
+
+def bom_part_numbers(path, include_alternates=False):
+    """Return ``(unique part numbers, IC part numbers)`` in one pass over the BOM."""
+    seen = {}
+    chips = {}
+    for line in read_bom(path):
+        numbers = [line.part_number] + (line.alternates if include_alternates else [])
+        for number in numbers:
+            seen.setdefault(number, None)
+        if line.is_ic:
+            chips.setdefault(line.part_number, None)
+    return list(seen), list(chips)
+
+
+async def search_bom_async(path, on_line=None, on_result=None, on_progress=None, chunk_size=500,
+                           max_inflight=4, include_alternates=False, concurrency=DEFAULT_CONCURRENCY,
+                           timeout=DEFAULT_TIMEOUT, cache=None, **options):
+    """Parse a BOM and look up its part numbers, overlapping the two.
+
+    The file is parsed in a worker thread, so the event loop keeps serving
+    lookups meanwhile. Every ``chunk_size`` new unique part numbers are handed
+    to :func:`digikey.digikey_search_async`; at most ``max_inflight`` chunks
+    run at once on one shared connection pool. ``on_line(line)`` is called
+    from the parsing thread for each :class:`BomLine`; ``on_progress(done,
+    total)`` counts against the parts found so far.
+
+    Returns ``(lines, results)``: every BomLine, and a :class:`SearchResults`
+    with one entry per unique part number in first-seen order.
+    """
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(max_inflight)
+    tasks = []
+    seen = 0
+    done = 0
+
+    def record(result):
+        nonlocal done
+        done += 1
+        # Progress first, so on_result sees an up-to-date total
+        if on_progress is not None:
+            on_progress(done, seen)
+        if on_result is not None:
+            on_result(result)
+
+    async def run_chunk(chunk):
+        async with slots:
+            return await digikey_search_async(
+                chunk, concurrency=concurrency, session=session, cache=cache,
+                on_result=record, **options
+            )
+
+    def start_chunk(chunk, total_seen):
+        nonlocal seen
+        seen = total_seen
+        tasks.append(asyncio.ensure_future(run_chunk(chunk)))
+
+    def parse():
+        lines = []
+        keys = set()
+        pending = []
+        for line in read_bom(path):
+            lines.append(line)
+            if on_line is not None:
+                on_line(line)
+            numbers = [line.part_number] + (line.alternates if include_alternates else [])
+            for number in numbers:
+                key = cache_key(number)
+                if key not in keys:
+                    keys.add(key)
+                    pending.append(number)
+            if len(pending) >= chunk_size:
+                loop.call_soon_threadsafe(start_chunk, pending, len(keys))
+                pending = []
+        if pending:
+            loop.call_soon_threadsafe(start_chunk, pending, len(keys))
+        return lines
+
+    results = SearchResults()
+    async with open_session(concurrency, timeout) as session:
+        lines = await asyncio.to_thread(parse)
+        # Let the last call_soon_threadsafe callbacks run before collecting
+        await asyncio.sleep(0)
+        for chunk_results in await asyncio.gather(*tasks):
+            results.extend(chunk_results)
+    return lines, results
+
+
+def search_bom(path, use_cache=True, **options):
+    """Blocking wrapper around :func:`search_bom_async` (reads through the part cache)."""
+    if use_cache:
+        options.setdefault("cache", get_part_cache())
+    try:
+        return _run_sync(search_bom_async(path, **options))
+    except Exception as e:
+        print("Error:", e)
+        parts, _ = bom_part_numbers(path)
+        return list(read_bom(path)), SearchResults(PartResult(p, "error", error=str(e)) for p in parts)
@@ -23,38 +23,61 @@ function App() {
   
   const [chips, setChips] = useState([]);
   const [partsData, setPartsData] = useState(null);
+  const [jobId, setJobId] = useState(null);
   const [progress, setProgress] = useState({ done: 0, total: 0, status: 'idle' });
+  const [lastPart, setLastPart] = useState(null);
   const [showCircuitDialog, setShowCircuitDialog] = useState(false);
   const [circuitName, setCircuitName] = useState('');
   const [loading, setLoading] = useState(false);
 
-  // Poll for progress updates
+  // Follow the job's progress stream (server-sent events)
   useEffect(() => {
-    let interval;
-    if (progress.status === 'processing') {
-      interval = setInterval(async () => {
-        try {
-          const response = await axios.get(`${API_BASE_URL}/progress`);
-          setProgress(response.data);
-          
-          // If completed, fetch parts data
-          if (response.data.status === 'completed') {
-            fetchPartsData();
-          }
-        } catch (error) {
-          console.error('Error fetching progress:', error);
-        }
-      }, 1000);
-    }
-    
-    return () => {
-      if (interval) clearInterval(interval);
+    if (!jobId) return undefined;
+
+    const source = new EventSource(`${API_BASE_URL}/jobs/${jobId}/events`);
+
+    source.addEventListener('snapshot', (event) => {
+      setProgress(JSON.parse(event.data));
+    });
+
+    source.addEventListener('status', (event) => {
+      setProgress(JSON.parse(event.data));
+    });
+
+    source.addEventListener('part', (event) => {
+      const part = JSON.parse(event.data);
+      setLastPart(part);
+      setProgress(prev => ({
+        ...prev,
+        done: part.done,
+        total: part.total,
+        found: (prev.found || 0) + (part.status === 'found' ? 1 : 0),
+        missed: (prev.missed || 0) + (part.status === 'miss' ? 1 : 0),
+        errors: (prev.errors || 0) + (part.status === 'error' ? 1 : 0)
+      }));
+    });
+
+    source.addEventListener('complete', (event) => {
+      const summary = JSON.parse(event.data);
+      setProgress(summary);
+      source.close();
+      if (summary.status === 'completed') {
+        setChips(summary.chips || []);
+        fetchPartsData(jobId);
+      }
+    });
+
+    source.onerror = () => {
+      // EventSource reconnects on its own and resumes from Last-Event-ID
+      console.error('Progress stream interrupted, reconnecting...');
     };
-  }, [progress.status]);
 
-  const fetchPartsData = async () => {
+    return () => source.close();
+  }, [jobId]);
+
+  const fetchPartsData = async (id) => {
     try {
-      const response = await axios.get(`${API_BASE_URL}/parts`);
+      const response = await axios.get(`${API_BASE_URL}/parts`, { params: { job_id: id } });
       setPartsData(response.data);
     } catch (error) {
       console.error('Error fetching parts data:', error);
@@ -75,9 +98,12 @@ function App() {
       setFiles(prev => ({ ...prev, [fileType]: response.data.filename }));
       setPreviews(prev => ({ ...prev, [fileType]: response.data.preview }));
 
-      if (fileType === 'csv' && response.data.chips) {
-        setChips(response.data.chips);
-        setProgress({ done: 0, total: response.data.total_parts, status: 'processing' });
+      if (fileType === 'csv' && response.data.job_id) {
+        // The job reads the BOM; parts, totals and chips arrive on its stream
+        setChips([]);
+        setLastPart(null);
+        setProgress({ done: 0, total: 0, status: 'queued' });
+        setJobId(response.data.job_id);
       }
 
       return response.data;
@@ -87,6 +113,14 @@ function App() {
     }
   };
 
+  const handleCancelSearch = async () => {
+    try {
+      await axios.post(`${API_BASE_URL}/jobs/${jobId}/cancel`);
+    } catch (error) {
+      console.error('Error cancelling search:', error);
+    }
+  };
+
   const handleShowCircuitName = () => {
     setShowCircuitDialog(true);
   };
@@ -141,8 +175,17 @@ function App() {
           />
         </div>
 
-        {progress.status === 'processing' && (
-          <ProgressIndicator done={progress.done} total={progress.total} />
+        {(progress.status === 'processing' || progress.status === 'queued') && (
+          <ProgressIndicator
+            queued={progress.status === 'queued'}
+            onCancel={handleCancelSearch}
+            done={progress.done}
+            total={progress.total}
+            found={progress.found}
+            missed={progress.missed}
+            errors={progress.errors}
+            lastPart={lastPart}
+          />
         )}
 
         {partsData && (
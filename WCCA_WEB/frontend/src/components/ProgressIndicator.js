@@ -1,7 +1,7 @@
 import React from 'react';
 import './ProgressIndicator.css';
 
-function ProgressIndicator({ done, total }) {
+function ProgressIndicator({ done, total, found = 0, missed = 0, errors = 0, lastPart = null, queued = false, onCancel }) {
   const percentage = total > 0 ? Math.round((done / total) * 100) : 0;
 
   return (
@@ -32,7 +32,22 @@ function ProgressIndicator({ done, total }) {
         </svg>
         <div className="progress-text">{percentage}%</div>
       </div>
-      <p className="progress-label">Processing parts ({done} / {total})</p>
+      <p className="progress-label">
+        {queued ? `Waiting in queue (${total} parts)` : `Processing parts (${done} / ${total})`}
+      </p>
+      <p className="progress-counts">
+        {found} found · {missed} not found · {errors} errors
+      </p>
+      {lastPart && (
+        <p className={`progress-last progress-last-${lastPart.status}`}>
+          {lastPart.part_number}: {lastPart.status} ({lastPart.source || 'n/a'}, {lastPart.latency_ms} ms)
+        </p>
+      )}
+      {onCancel && (
+        <button className="progress-cancel" onClick={onCancel}>
+          Cancel
+        </button>
+      )}
     </div>
   );
 }
@@ -1,6 +1,186 @@
 # json_table.py
+import functools
+import json
+import os
+import re
+from pathlib import Path
 from tkinter import ttk
 
+# Column autosize: pixels per character, padding and cap
+CHAR_WIDTH = 8
+WIDTH_PADDING = 24
+MAX_COLUMN_WIDTH = 360
+# Rows moved per mouse-wheel notch
+WHEEL_ROWS = 3
+
+
+class VirtualTable:
+    """A Treeview over a list of dict rows that only materializes the visible rows.
+
+    The tree holds one item per visible line ("slot"); scrolling rewrites
+    the slots' values from ``rows[offset:offset + visible]`` and a separate
+    scrollbar stands for the whole list, so the row count does not affect
+    render time. ``append`` adds rows as they arrive, and the longest text
+    per column is kept up to date so autosizing a column is O(1).
+    """
+
+    def __init__(self, container, columns, tree_style="", vscroll_style="", hscroll_style="", height_rows=12):
+        self.columns = list(columns)
+        self.rows = []
+        self.offset = 0
+        self.visible = height_rows
+        self.selected = None  # index into rows
+        self._longest = {c: len(c) for c in self.columns}
+        self._slots = []
+
+        self.tree = ttk.Treeview(container, columns=self.columns, show="headings", style=tree_style,
+                                 height=height_rows, selectmode="browse")
+        for c in self.columns:
+            self.tree.heading(c, text=c, command=lambda cid=c: self.autosize(cid))
+            self.tree.column(c, width=160, anchor="w")
+
+        self.vsb = ttk.Scrollbar(container, orient="vertical", command=self._on_scrollbar, style=vscroll_style)
+        self.hsb = ttk.Scrollbar(container, orient="horizontal", command=self.tree.xview, style=hscroll_style)
+        self.tree.configure(xscrollcommand=self.hsb.set)
+
+        container.grid_columnconfigure(0, weight=1)
+        container.grid_rowconfigure(0, weight=1)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.vsb.grid(row=0, column=1, sticky="ns")
+        self.hsb.grid(row=1, column=0, sticky="ew")
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(WHEEL_ROWS))
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        for key, step in (("<Up>", -1), ("<Down>", 1)):
+            self.tree.bind(key, lambda e, s=step: self._move_selection(s))
+        for key, where in (("<Prior>", "up"), ("<Next>", "down"), ("<Home>", "home"), ("<End>", "end")):
+            self.tree.bind(key, lambda e, w=where: self._page(w))
+
+    # -- data ----------------------------------------------------------------
+
+    def set_rows(self, rows, columns=None):
+        """Replace all rows, and the columns if ``columns`` differs from the current ones."""
+        if columns is not None and list(columns) != self.columns:
+            self.columns = list(columns)
+            self.tree.configure(columns=self.columns)
+            for c in self.columns:
+                self.tree.heading(c, text=c, command=lambda cid=c: self.autosize(cid))
+                self.tree.column(c, width=160, anchor="w")
+        self.rows = list(rows)
+        self._longest = {c: len(c) for c in self.columns}
+        self._measure(self.rows)
+        self.selected = None
+        self._render()
+
+    def append(self, rows):
+        """Add rows at the end; only re-renders if they land in view."""
+        start = len(self.rows)
+        self.rows.extend(rows)
+        self._measure(rows)
+        if start < self.offset + self.visible:
+            self._render()
+        else:
+            self._update_scrollbar()
+
+    def _measure(self, rows):
+        longest = self._longest
+        for row in rows:
+            for c in self.columns:
+                n = len(str(row.get(c, "")))
+                if n > longest[c]:
+                    longest[c] = n
+
+    def autosize(self, col_id):
+        self.tree.column(col_id, width=min(self._longest[col_id] * CHAR_WIDTH + WIDTH_PADDING, MAX_COLUMN_WIDTH))
+
+    # -- rendering -----------------------------------------------------------
+
+    def _render(self):
+        self.offset = max(0, min(self.offset, len(self.rows) - self.visible))
+        needed = min(self.visible, len(self.rows) - self.offset)
+        while len(self._slots) < needed:
+            self._slots.append(self.tree.insert("", "end"))
+        while len(self._slots) > needed:
+            self.tree.delete(self._slots.pop())
+        for slot, row in zip(self._slots, self.rows[self.offset:self.offset + needed]):
+            self.tree.item(slot, values=[row.get(c, "") for c in self.columns])
+        if self.selected is not None and self.offset <= self.selected < self.offset + needed:
+            slot = self._slots[self.selected - self.offset]
+            if self.tree.selection() != (slot,):
+                self.tree.selection_set(slot)
+            self.tree.focus(slot)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = len(self.rows)
+        if total <= self.visible:
+            self.vsb.set(0, 1)
+        else:
+            self.vsb.set(self.offset / total, (self.offset + self.visible) / total)
+
+    # -- scrolling -----------------------------------------------------------
+
+    def scroll(self, rows):
+        offset = max(0, min(self.offset + rows, len(self.rows) - self.visible))
+        if offset != self.offset:
+            self.offset = offset
+            self._render()
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.offset = int(float(amount) * len(self.rows))
+            self._render()
+        elif action == "scroll":
+            self.scroll(int(amount) * (self.visible if unit == "pages" else 1))
+
+    def _on_wheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS small deltas
+        notches = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll(-notches * WHEEL_ROWS)
+
+    def _on_configure(self, event):
+        bbox = self.tree.bbox(self._slots[0]) if self._slots else ""
+        if not bbox:
+            return
+        _, header, _, row_height = bbox
+        visible = max(1, (event.height - header) // row_height)
+        if visible != self.visible:
+            self.visible = visible
+            self._render()
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        if selection and selection[0] in self._slots:
+            self.selected = self.offset + self._slots.index(selection[0])
+
+    def _move_selection(self, step):
+        if not self.rows:
+            return "break"
+        current = self.offset if self.selected is None else self.selected + step
+        self.selected = max(0, min(current, len(self.rows) - 1))
+        if self.selected < self.offset:
+            self.offset = self.selected
+        elif self.selected >= self.offset + self.visible:
+            self.offset = self.selected - self.visible + 1
+        self._render()
+        return "break"
+
+    def _page(self, where):
+        if where == "home":
+            self.offset = 0
+        elif where == "end":
+            self.offset = len(self.rows)
+        else:
+            return self.scroll(self.visible if where == "down" else -self.visible)
+        self._render()
+        return "break"
+
 
 def show_json_table(
     container,
@@ -10,7 +190,7 @@ def show_json_table(
     vscroll_style="",
     hscroll_style="",
     columns=None,
-    max_rows=500,
+    max_rows=None,
     height_rows=12,
 ):
     # Clear previous widgets
@@ -29,41 +209,197 @@ def show_json_table(
                     cols.append(k)
                     seen.add(k)
 
-    tree = ttk.Treeview(container, columns=cols, show="headings", style=tree_style, height=height_rows)
+    table = VirtualTable(container, cols, tree_style=tree_style, vscroll_style=vscroll_style,
+                         hscroll_style=hscroll_style, height_rows=height_rows)
+    table.set_rows(data[:max_rows] if max_rows else data)
+    return table
+
+
+# Part types and their key parameters (shared with IntelliDraft); the first
+# key parameter identifies a type when a record has no Digi-Key category
+PART_TYPES_PATH = Path(os.getenv("WCCA_PART_TYPES") or
+                       Path(__file__).parent.parent / "intellidraft" / "Library" / "parameters.json")
+FALLBACK_PART_TYPES = {
+    "resistor": ["resistance", "tolerance", "temperature_coefficient", "operating_temperature"],
+    "capacitor": ["capacitance", "tolerance", "temperature_coefficient", "operating_temperature"],
+}
+# Tab order: these types first, then other categories alphabetically, then "Others"
+TYPE_ORDER = ("capacitor", "resistor", "inductor", "diode", "transistor")
+BASE_COLUMNS = ["Part Number", "Mfr"]
+OTHERS = "Others"
+# Columns shown for categories without key parameters: the most common attributes
+MAX_GENERIC_COLUMNS = 8
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def _snake(name):
+    return _NON_WORD.sub("_", name.lower()).strip("_")
+
+
+@functools.lru_cache(maxsize=1)
+def load_part_types(path=PART_TYPES_PATH):
+    """{type: [key parameter, ...]} from parameters.json, or the resistor/capacitor fallback."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        return {name: [_snake(p) for p in spec.get("key_parameters", [])] for name, spec in config.items()}
+    except (OSError, ValueError, AttributeError):
+        return FALLBACK_PART_TYPES
+
+
+class CategoryIndex:
+    """Category -> rows index of Digi-Key records, built in a single pass.
+
+    A record's category is its part type when its Digi-Key ``Category``
+    names one ("Ceramic Capacitors") or, without a category, when it has
+    the type's first key parameter ("Capacitance"); otherwise the Digi-Key
+    category itself, or "Others". Attribute counts per category are kept
+    in the same pass so each category's columns can be derived once.
+    """
+
+    def __init__(self, part_types=None):
+        self.part_types = part_types or load_part_types()
+        self.rows = {}
+        self._key_counts = {}
+        self._labels = {}  # Digi-Key category -> category
+        self._snake = {}  # record key -> snake_case (records share a few dozen keys)
+
+    def label(self, part_type):
+        return part_type.replace("_", " ").title() + "s"
+
+    def _categorize(self, row):
+        category = row.get("Category")
+        if category:
+            if category not in self._labels:
+                lowered = category.lower()
+                match = next((t for t in self.part_types if t.replace("_", " ") in lowered), None)
+                self._labels[category] = self.label(match) if match else category
+            return self._labels[category]
+        keys = set()
+        for k in row:
+            if k not in self._snake:
+                self._snake[k] = _snake(k)
+            keys.add(self._snake[k])
+        for part_type, params in self.part_types.items():
+            if params and params[0] in keys:
+                return self.label(part_type)
+        return OTHERS
+
+    def add(self, rows):
+        """Index rows; returns {category: rows added} for this batch."""
+        added = {}
+        for row in rows:
+            category = self._categorize(row)
+            added.setdefault(category, []).append(row)
+            counts = self._key_counts.setdefault(category, {})
+            for k in row:
+                counts[k] = counts.get(k, 0) + 1
+        for category, new in added.items():
+            self.rows.setdefault(category, []).extend(new)
+        return added
+
+    def clear(self):
+        self.rows = {}
+        self._key_counts = {}
+
+    def columns(self, category):
+        """Part Number, Mfr and the category's key parameters (or most common attributes)."""
+        counts = self._key_counts.get(category, {})
+        present = {self._snake.setdefault(k, _snake(k)): k for k in counts if k not in BASE_COLUMNS}
+        part_type = next((t for t in self.part_types if self.label(t) == category), None)
+        if part_type:
+            columns = []
+            for param in self.part_types[part_type]:
+                # "tolerance" also satisfies "capacitance_tolerance"
+                key = present.get(param) or next(
+                    (k for snake, k in present.items() if param.endswith("_" + snake)), None)
+                if key and key not in columns:
+                    columns.append(key)
+        else:
+            skip = set(BASE_COLUMNS) | {"Category", "Part Status"}
+            common = sorted((k for k in counts if k not in skip), key=lambda k: -counts[k])
+            columns = common[:MAX_GENERIC_COLUMNS]
+        return BASE_COLUMNS + columns
+
+    def sort_key(self, category):
+        labels = [self.label(t) for t in TYPE_ORDER]
+        if category in labels:
+            return (0, labels.index(category), "")
+        return (2 if category == OTHERS else 1, 0, category)
+
+
+class CategorizedTables:
+    """One notebook tab per part category, each a lazily built virtual table.
+
+    Tabs appear when their category's first row arrives; a tab's table (and
+    its columns) is only built the first time the tab is shown, and streamed
+    rows for unbuilt tabs just go into the index.
+    """
 
-    for c in cols:
-        tree.heading(c, text=c)
-        tree.column(c, width=160, anchor="w")
+    def __init__(self, container, tree_style="", heading_style="", vscroll_style="", hscroll_style="", height_rows=12):
+        self.container = container
+        self.styles = dict(tree_style=tree_style, vscroll_style=vscroll_style, hscroll_style=hscroll_style,
+                           height_rows=height_rows)
+        self.index = CategoryIndex()
+        self.frames = {}
+        self.tables = {}
 
-    # Rows
-    for row in data[:max_rows]:
-        values = [row.get(c, "") for c in cols]
-        tree.insert("", "end", values=values)
+        # Use a tabbed notebook to reduce whitespace and switch between categories
+        self.nb = ttk.Notebook(container)
+        self.nb.bind("<<NotebookTabChanged>>", lambda e: self._build_current())
+        container.grid_columnconfigure(0, weight=1)
+        container.grid_rowconfigure(0, weight=1)
+        self.empty = ttk.Label(container, text="No parts found.")
+        self.empty.grid(row=0, column=0, sticky="w", padx=4, pady=4)
 
-    # Scrollbars
-    vsb = ttk.Scrollbar(container, orient="vertical", command=tree.yview, style=vscroll_style)
-    hsb = ttk.Scrollbar(container, orient="horizontal", command=tree.xview, style=hscroll_style)
-    tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+    def exists(self):
+        return bool(self.nb.winfo_exists())
 
-    # Layout
-    container.grid_columnconfigure(0, weight=1)
-    container.grid_rowconfigure(0, weight=1)
-    tree.grid(row=0, column=0, sticky="nsew")
-    vsb.grid(row=0, column=1, sticky="ns")
-    hsb.grid(row=1, column=0, sticky="ew")
+    def _add_tab(self, category):
+        if not self.frames:
+            self.empty.grid_remove()
+            self.nb.grid(row=0, column=0, sticky="nsew")
+        frame = ttk.Frame(self.nb)
+        self.frames[category] = frame
+        order = sorted(self.frames, key=self.index.sort_key)
+        index = order.index(category)
+        self.nb.insert(index if index < len(self.nb.tabs()) else "end", frame,
+                       text=f"{category} ({len(self.index.rows[category])})")
 
-    # Optional: enable basic column-resize on double-click header
-    def autosize_col(col_id):
-        maxw = max([len(str(tree.set(iid, col_id))) for iid in tree.get_children("")] + [len(col_id)])
-        tree.column(col_id, width=min(maxw * 8 + 24, 360))
+    def _build_current(self):
+        current = self.nb.select()
+        category = next((c for c, f in self.frames.items() if str(f) == current), None)
+        if category is not None and category not in self.tables:
+            table = VirtualTable(self.frames[category], self.index.columns(category), **self.styles)
+            table.set_rows(self.index.rows[category])
+            self.tables[category] = table
 
-    def on_heading_click(col_id):
-        autosize_col(col_id)
+    def _update(self, added, replace=False):
+        for category in sorted(added, key=self.index.sort_key):
+            if category not in self.frames:
+                self._add_tab(category)
+            else:
+                self.nb.tab(self.frames[category], text=f"{category} ({len(self.index.rows[category])})")
+            table = self.tables.get(category)
+            if table is not None:
+                if replace:
+                    # Later batches may have brought attributes the first flush lacked
+                    table.set_rows(self.index.rows[category], self.index.columns(category))
+                else:
+                    table.append(added[category])
+        self._build_current()
 
-    for c in cols:
-        tree.heading(c, text=c, command=lambda cid=c: on_heading_click(cid))
+    def append(self, data):
+        self._update(self.index.add(data))
 
-    return tree
+    def set_rows(self, data):
+        self.index.clear()
+        added = self.index.add(data)
+        for category in self.frames:
+            added.setdefault(category, [])
+            self.index.rows.setdefault(category, [])
+        self._update(added, replace=True)
 
 
 def show_categorized_tables(
@@ -79,64 +415,7 @@ def show_categorized_tables(
     for child in container.winfo_children():
         child.destroy()
 
-    # Split into CAP and RES
-    caps = [d for d in data if "Capacitance" in d]
-    ress = [d for d in data if "Resistance" in d]
-
-    # Table specs
-    cap_cols = [
-        "Part Number",
-        "Mfr",
-        "Capacitance",
-        "Tolerance",
-        "Temperature Coefficient",
-        "Operating Temperature",
-    ]
-    res_cols = [
-        "Part Number",
-        "Mfr",
-        "Resistance",
-        "Tolerance",
-        "Temperature Coefficient",
-        "Operating Temperature",
-    ]
-
-    # Use a tabbed notebook to reduce whitespace and switch between categories
-    nb = ttk.Notebook(container)
-    container.grid_columnconfigure(0, weight=1)
-    container.grid_rowconfigure(0, weight=1)
-    nb.grid(row=0, column=0, sticky="nsew")
-
-    added = False
-    if caps:
-        cap_frame = ttk.Frame(nb)
-        nb.add(cap_frame, text="CAP")
-        show_json_table(
-            cap_frame, caps,
-            tree_style=tree_style,
-            heading_style=heading_style,
-            vscroll_style=vscroll_style,
-            hscroll_style=hscroll_style,
-            columns=cap_cols,
-            height_rows=height_rows,
-        )
-        added = True
-
-    if ress:
-        res_frame = ttk.Frame(nb)
-        nb.add(res_frame, text="RES")
-        show_json_table(
-            res_frame, ress,
-            tree_style=tree_style,
-            heading_style=heading_style,
-            vscroll_style=vscroll_style,
-            hscroll_style=hscroll_style,
-            columns=res_cols,
-            height_rows=height_rows,
-        )
-        added = True
-
-    if not added:
-        # nothing matched; show an empty state
-        msg = ttk.Label(container, text="No Capacitors or Resistors found in JSON.")
-        msg.grid(row=0, column=0, sticky="w", padx=4, pady=4)
\ No newline at end of file
+    tables = CategorizedTables(container, tree_style=tree_style, heading_style=heading_style,
+                               vscroll_style=vscroll_style, hscroll_style=hscroll_style, height_rows=height_rows)
+    tables.set_rows(data)
+    return tables
@@ -2,18 +2,19 @@
 
 import os
 import shutil
-import csv
 import logging
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import requests
 import pandas as pd
 from requests.auth import HTTPBasicAuth
-import json
-from digikey import digikey_search
+from bom_reader import search_bom
+from netlist_index import NetlistIndex
+from rules_engine import RuleChecker, load_rules
+from wcca_engine import parts_by_number
 import threading
 from tkinter import ttk
-from json_table import show_json_table, show_categorized_tables
+from json_table import show_categorized_tables
 from gen_ai import genAi
 
 # Configuration (self-contained; no external modules needed)
@@ -135,6 +136,9 @@ class FileUploaderApp(tk.Tk):
         self.preview_containers = {}
         self.pending_preview = {}
         self.part_numbers = []  # holds first-column part numbers extracted from BOM CSV
+        self.parts_tables = None  # CategorizedTables in the CSV preview, fed as results arrive
+        self._streamed = []  # found records waiting for the next table flush
+        self._stream_lock = threading.Lock()
         self.chip_list = []  # stores IC chips for genAi processing
         self.circuit_name = None  # stores the circuit name internally
         self.circuit_label = None
@@ -549,29 +553,24 @@ class FileUploaderApp(tk.Tk):
         y = (input_popup.winfo_screenheight() // 2) - (input_popup.winfo_height() // 2)
         input_popup.geometry(f"+{x}+{y}")
 
-    def _render_json_table_preview(self):
+    def _render_json_table_preview(self, data):
         try:
-            json_path = os.path.join(os.path.dirname(__file__), "parts.json")
-            with open(json_path, "r", encoding="utf-8") as jf:
-                data = json.load(jf)
+            if data is None:
+                # The search failed; a parts.json left by an earlier run is not this BOM's
+                raise ValueError("the Digi-Key search did not complete")
             if not isinstance(data, list):
-                raise ValueError("parts.json content is not a list")
+                raise ValueError("search results are not a list")
             container = self.preview_containers.get("csv")
             if container is None:
                 return
-            # Clear any previous widgets (e.g., Text fallback)
-            for child in container.winfo_children():
-                child.destroy()
-            # Render categorized CAP/RES tables
-            show_categorized_tables(
-                container,
-                data,
-                tree_style="Dark.Treeview",
-                heading_style="Dark.Treeview.Heading",
-                vscroll_style="Dark.Vertical.TScrollbar",
-                hscroll_style="Dark.Horizontal.TScrollbar",
-                height_rows=8
-            )
+            if self.parts_tables is not None and self.parts_tables.exists():
+                # Tables were streamed during the search: drop unflushed records
+                # and put all rows in input order
+                with self._stream_lock:
+                    self._streamed = []
+                self.parts_tables.set_rows(data)
+            else:
+                self._start_parts_tables(data)
             # Mark CSV preview as ready and try to show controls if all are ready
             self.preview_ready["csv"] = True
             self._maybe_show_circuit_controls()
@@ -581,20 +580,65 @@ class FileUploaderApp(tk.Tk):
             if container is not None:
                 for child in container.winfo_children():
                     child.destroy()
-                lbl = tk.Label(container, text=f"Error loading JSON preview: {e}", bg=self.preview_bg, fg=self.text_color)
+                lbl = tk.Label(container, text=f"No parts to show: {e}", bg=self.preview_bg, fg=self.text_color)
                 lbl.grid(row=0, column=0, sticky="w", padx=8, pady=8)
 
-    def run_digikey_search(self, parts):
-        self.show_progress(len(parts))
+    def _start_parts_tables(self, data=()):
+        """Renders (empty) categorized CAP/RES tables into the CSV preview."""
+        container = self.preview_containers.get("csv")
+        # Clear any previous widgets (e.g., Text fallback)
+        for child in container.winfo_children():
+            child.destroy()
+        self.parts_tables = show_categorized_tables(
+            container,
+            list(data),
+            tree_style="Dark.Treeview",
+            heading_style="Dark.Treeview.Heading",
+            vscroll_style="Dark.Vertical.TScrollbar",
+            hscroll_style="Dark.Horizontal.TScrollbar",
+            height_rows=8
+        )
+
+    def _stream_result(self, result):
+        """on_result callback (worker thread): queue found records and schedule one flush."""
+        if result.record is None:
+            return
+        with self._stream_lock:
+            self._streamed.append(result.record)
+            first = len(self._streamed) == 1
+        if first:
+            self.after(100, self._flush_streamed)
+
+    def _flush_streamed(self):
+        with self._stream_lock:
+            records, self._streamed = self._streamed, []
+        if records and self.parts_tables is not None and self.parts_tables.exists():
+            self.parts_tables.append(records)
+
+    def run_bom_search(self, filepath):
+        """Parses the BOM and searches Digi-Key in the background, starting lookups
+        while the file is parsed. The part numbers and IC chips are taken from the
+        parsed lines once the search is done."""
+        self.show_progress(0)
+        self._start_parts_tables()
 
         def runner():
-            def cb(done, total):
-                self.after(0, lambda: self.update_progress(done, total))
+            def cb(done, found_so_far):
+                self.after(0, lambda: self.update_progress(done, found_so_far))
+            records = None
             try:
-                digikey_search(parts, on_progress=cb)
+                lines, results = search_bom(filepath, on_progress=cb, on_result=self._stream_result)
+                records = results.records
+                part_numbers = [result.part_number for result in results]
+                chips = list(dict.fromkeys(line.part_number for line in lines if line.is_ic))
+                self.after(0, lambda: self._set_bom_parts(part_numbers, chips))
+                self._check_constraints(lines, records)
+            except Exception as e:
+                logging.error(f"Error searching BOM {filepath}: {e}", exc_info=True)
+                self.after(0, lambda: messagebox.showwarning("CSV Parse", f"Couldn't parse part numbers:\n{e}"))
             finally:
                 self.after(0, self.close_progress)
-                self.after(0, self._render_json_table_preview)
+                self.after(0, lambda: self._render_json_table_preview(records))
 
         threading.Thread(target=runner, daemon=True).start()
 
@@ -660,84 +704,64 @@ class FileUploaderApp(tk.Tk):
             self.previews[ftype].insert("1.0", preview_text)
             self.previews[ftype].config(state="disabled")
 
-        # If CSV selected, extract part numbers from first column
+        # If CSV selected, search its part numbers; the BOM is parsed by the search
         if ftype == "csv":
-            try:
-                self.part_numbers = self._extract_part_numbers_from_csv(filepath, col=0)
-            except Exception as e:
-                logging.error(str(e), exc_info=True)
-                self.part_numbers = []
-                messagebox.showwarning("CSV Parse", f"Couldn't parse part numbers:\n{e}")
+            self._set_bom_parts([], [])
+            self.run_bom_search(filepath)
 
             # Do not append part numbers to preview; we'll render JSON table instead
         else:
+            if ftype == "xml":
+                self._index_netlist(filepath)
             # Mark XML/YAML preview as ready and try to show controls
             self.preview_ready[ftype] = True
             self._maybe_show_circuit_controls()
 
-    def _extract_part_numbers_from_csv(self, filepath, col=0):
-        """Reads the CSV and returns a de-duplicated list of values from column col (default: first column).
-        Automatically sniffs delimiter and whether there is a header row."""
-        part_numbers = []
-        ref_designators = []
-        
+    def _index_netlist(self, filepath):
+        """Builds (or loads the cached) netlist index in the background and
+        appends a summary line to the XML preview."""
+        def runner():
+            try:
+                stats = NetlistIndex.load(filepath).stats()
+                summary = f"{stats['components']} components, {stats['nets']} nets, {stats['pins']} pins"
+            except (OSError, ValueError) as e:
+                logging.error(f"Error indexing netlist {filepath}: {e}", exc_info=True)
+                summary = f"Not indexed: {e}"
+            self.after(0, lambda: self._append_preview("xml", f"\n\n[Netlist] {summary}"))
+
+        threading.Thread(target=runner, daemon=True).start()
+
+    def _check_constraints(self, lines, records):
+        """Checks the BOM against the selected constraints file (and netlist, if any)
+        and appends the violation summary to the YAML preview. Runs on a worker thread."""
+        constraints = self.selected_files.get("yaml")
+        if not constraints:
+            return
         try:
-            with open(filepath, "r", encoding="utf-8", errors="ignore", newline="") as f:
-                sample = f.read(2048)
-                f.seek(0)
-
-                # Detect delimiter
-                try:
-                    dialect = csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
-                except csv.Error:
-                    dialect = csv.get_dialect("excel")
-
-                # Detect header
-                has_header = False
-                try:
-                    has_header = csv.Sniffer().has_header(sample)
-                except Exception:
-                    # Some Python versions may raise ValueError("bad delimiter value").
-                    # Fall back to assuming there is no header.
-                    has_header = False
-
-                reader = csv.reader(f, dialect)
-                for idx, row in enumerate(reader):
-                    if not row:
-                        continue
-                    if has_header and idx == 0:
-                        # skip header row
-                        continue
-
-                    # Bounds checking to prevent index errors
-                    if col < len(row) and (col + 1) < len(row):
-                        part_number = row[col].strip()
-                        ref_designator = row[col + 1].strip()
-                        if part_number:
-                            part_numbers.append(part_number)
-                            ref_designators.append(ref_designator)
-
-            # Extract IC chips (components with 'U' in reference designator)
-            chip_indices = [
-                i for i, ref in enumerate(ref_designators)
-                if "u" in ref.lower()
-            ]
-            chips = [part_numbers[i] for i in chip_indices]
-            
-            # Store chip list for later genAi processing when button is clicked
-            self.chip_list = chips
-            
-            # De-duplicate while preserving order
-            seen = set()
-            unique_parts = [x for x in part_numbers if not (x in seen or seen.add(x))]
-            
-            # Run DigiKey search in background
-            self.run_digikey_search(unique_parts)
-            return unique_parts
-            
-        except Exception as e:
-            logging.error(f"Error extracting part numbers from CSV: {e}", exc_info=True)
-            raise
+            netlist = NetlistIndex.load(self.selected_files["xml"]) if self.selected_files.get("xml") else None
+        except (OSError, ValueError):
+            netlist = None
+        try:
+            report = RuleChecker(load_rules(constraints), lines, parts_by_number(records or []), netlist).report()
+            summary = report["summary"]
+            text = f"{summary['errors']} errors, {summary['warnings']} warnings"
+            text += "".join(f"\n  L{v.get('line_no', '-')} {v.get('ref') or v.get('net', '')}: {v['message']}"
+                            for v in report["violations"][:20])
+        except (OSError, ValueError) as e:
+            logging.error(f"Error checking constraints {constraints}: {e}", exc_info=True)
+            text = f"Not checked: {e}"
+        self.after(0, lambda: self._append_preview("yaml", f"\n\n[Constraints] {text}"))
+
+    def _append_preview(self, ftype, text):
+        self.previews[ftype].config(state="normal")
+        self.previews[ftype].insert(tk.END, text)
+        self.previews[ftype].config(state="disabled")
+
+    def _set_bom_parts(self, part_numbers, chips):
+        """Stores the BOM's de-duplicated part numbers and its IC chips (kept for
+        genAi processing when the button is clicked)."""
+        self.part_numbers = part_numbers
+        self.chip_list = chips
     
     def get_part_numbers(self):
         """Return the current list of extracted part numbers."""
@@ -0,0 +1,251 @@
+"""
+Streaming netlist loader and connectivity index.
+
+Reads a KiCad-style XML netlist (``<export>`` with ``<components>/<comp>``
+and ``<nets>/<net>/<node ref= pin=>``) with ``iterparse``, dropping every
+element as soon as it has been read, and builds a compact index:
+
+* net -> pins (ref, pin) and ref -> nets, as CSR-style NumPy arrays
+* ref -> value / footprint / manufacturer part number
+* ref -> BOM line, linked from a BOM CSV with :func:`NetlistIndex.link_bom`
+
+Indexes are cached on disk as ``.npz`` files named after the SHA-256 of the
+netlist, so opening the same design again skips parsing entirely.
+"""
+import hashlib
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+from array import array
+from pathlib import Path
+
+import numpy as np
+
+CACHE_DIR = Path(os.getenv("WCCA_NETLIST_CACHE") or Path(__file__).parent / "netlist_cache")
+# Bump when the cached layout changes so stale files are ignored
+CACHE_VERSION = 1
+
+# <field name=...> values recognised as the manufacturer part number (lowercase)
+MPN_FIELDS = ("mpn", "manufacturer_part_number", "manufacturer part number", "mfr part number",
+              "partnumber", "part number", "part_number", "mfr_pn")
+
+
+def file_hash(path, block_size=1 << 20):
+    """SHA-256 hex digest of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _local(tag):
+    """Tag without an XML namespace."""
+    return tag.rsplit("}", 1)[-1]
+
+
+class NetlistIndex:
+    """Connectivity of one netlist, stored as flat NumPy arrays.
+
+    Pins are grouped by net: the pins of net ``n`` are
+    ``pin_comp[net_offsets[n]:net_offsets[n + 1]]`` (component ids) and the
+    matching ``pin_names``. ``comp_pins`` lists pin ids grouped by component
+    the same way through ``comp_offsets``.
+    """
+
+    def __init__(self, arrays, source_hash="", cached=False):
+        self.comp_refs = arrays["comp_refs"]
+        self.comp_values = arrays["comp_values"]
+        self.comp_footprints = arrays["comp_footprints"]
+        self.comp_mpns = arrays["comp_mpns"]
+        self.net_names = arrays["net_names"]
+        self.net_offsets = arrays["net_offsets"]
+        self.pin_comp = arrays["pin_comp"]
+        self.pin_names = arrays["pin_names"]
+        self.comp_pins = arrays["comp_pins"]
+        self.comp_offsets = arrays["comp_offsets"]
+        self.pin_net = np.repeat(np.arange(len(self.net_names), dtype=np.int32), np.diff(self.net_offsets))
+        self.source_hash = source_hash
+        self.cached = cached
+        self._ref_ids = {ref: i for i, ref in enumerate(self.comp_refs.tolist())}
+        self._net_ids = {name: i for i, name in enumerate(self.net_names.tolist())}
+        self.bom_lines = {}
+
+    # -- building ------------------------------------------------------------
+
+    @classmethod
+    def parse(cls, path):
+        """Stream-parse a netlist file into an index (no cache).
+
+        Raises:
+            ValueError: if the file is not well-formed XML
+        """
+        comp_ids = {}
+        comp_refs, comp_values, comp_footprints, comp_mpns = [], [], [], []
+        net_names = []
+        net_offsets = array("q", [0])
+        pin_comp = array("i")
+        pin_name_ids = array("i")
+        pin_name_table = {}
+
+        def comp_id(ref):
+            if ref not in comp_ids:
+                comp_ids[ref] = len(comp_refs)
+                comp_refs.append(ref)
+                comp_values.append("")
+                comp_footprints.append("")
+                comp_mpns.append("")
+            return comp_ids[ref]
+
+        parents = []
+        try:
+            for event, elem in ET.iterparse(path, events=("start", "end")):
+                if event == "start":
+                    parents.append(elem)
+                    continue
+                parents.pop()
+                tag = _local(elem.tag)
+                if tag == "comp":
+                    i = comp_id(elem.get("ref", ""))
+                    for child in elem:
+                        name = _local(child.tag)
+                        if name == "value":
+                            comp_values[i] = (child.text or "").strip()
+                        elif name == "footprint":
+                            comp_footprints[i] = (child.text or "").strip()
+                        elif name == "fields":
+                            for field in child:
+                                if (field.get("name") or "").strip().lower() in MPN_FIELDS and field.text:
+                                    comp_mpns[i] = field.text.strip()
+                elif tag == "net":
+                    net_names.append(elem.get("name") or f"Net-{elem.get('code', len(net_names) + 1)}")
+                    for node in elem:
+                        if _local(node.tag) != "node":
+                            continue
+                        pin_comp.append(comp_id(node.get("ref", "")))
+                        pin = node.get("pin", "")
+                        pin_name_ids.append(pin_name_table.setdefault(pin, len(pin_name_table)))
+                    net_offsets.append(len(pin_comp))
+                elif tag not in ("components", "nets", "libparts", "libraries"):
+                    continue
+                # Drop the finished element and detach it from its parent, so no
+                # empty shells pile up under <components> and <nets>
+                elem.clear()
+                if parents:
+                    parents[-1].remove(elem)
+        except ET.ParseError as e:
+            raise ValueError(f"Invalid netlist XML: {e}")
+
+        pin_comp = np.frombuffer(pin_comp, dtype=np.int32).copy() if len(pin_comp) else np.zeros(0, np.int32)
+        names = np.array(list(pin_name_table), dtype=np.str_) if pin_name_table else np.zeros(0, np.str_)
+        pin_ids = np.frombuffer(pin_name_ids, dtype=np.int32) if len(pin_name_ids) else np.zeros(0, np.int32)
+        comp_pins = np.argsort(pin_comp, kind="stable").astype(np.int32)
+        comp_offsets = np.zeros(len(comp_refs) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pin_comp, minlength=len(comp_refs)), out=comp_offsets[1:])
+        return cls({
+            "comp_refs": np.array(comp_refs, dtype=np.str_),
+            "comp_values": np.array(comp_values, dtype=np.str_),
+            "comp_footprints": np.array(comp_footprints, dtype=np.str_),
+            "comp_mpns": np.array(comp_mpns, dtype=np.str_),
+            "net_names": np.array(net_names, dtype=np.str_),
+            "net_offsets": np.frombuffer(net_offsets, dtype=np.int64).copy(),
+            "pin_comp": pin_comp,
+            "pin_names": names[pin_ids] if len(pin_ids) else np.zeros(0, np.str_),
+            "comp_pins": comp_pins,
+            "comp_offsets": comp_offsets,
+        })
+
+    @classmethod
+    def load(cls, path, cache_dir=CACHE_DIR, use_cache=True):
+        """Index of a netlist file, from the on-disk cache when the file is unchanged."""
+        digest = file_hash(path)
+        cache_path = Path(cache_dir) / f"{digest}.v{CACHE_VERSION}.npz"
+        if use_cache and cache_path.exists():
+            try:
+                with np.load(cache_path, allow_pickle=False) as data:
+                    return cls({name: data[name] for name in data.files}, digest, cached=True)
+            except (OSError, ValueError, KeyError):
+                pass   # Corrupt or partial cache file: rebuild it
+        index = cls.parse(path)
+        index.source_hash = digest
+        if use_cache:
+            index.save(cache_path)
+        return index
+
+    def save(self, cache_path):
+        """Write the index atomically (temp file + rename)."""
+        cache_path = Path(cache_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cache_path.parent, suffix=".npz.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f, comp_refs=self.comp_refs, comp_values=self.comp_values,
+                    comp_footprints=self.comp_footprints, comp_mpns=self.comp_mpns,
+                    net_names=self.net_names, net_offsets=self.net_offsets, pin_comp=self.pin_comp,
+                    pin_names=self.pin_names, comp_pins=self.comp_pins, comp_offsets=self.comp_offsets,
+                )
+            os.replace(tmp, cache_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    # -- queries -------------------------------------------------------------
+
+    def has_ref(self, ref):
+        return ref in self._ref_ids
+
+    def has_net(self, net):
+        return net in self._net_ids
+
+    def pins_of(self, net):
+        """[(ref, pin)] on a net."""
+        n = self._net_ids[net]
+        start, end = self.net_offsets[n], self.net_offsets[n + 1]
+        return list(zip(self.comp_refs[self.pin_comp[start:end]].tolist(), self.pin_names[start:end].tolist()))
+
+    def nets_of(self, ref):
+        """{pin: net name} of a component."""
+        c = self._ref_ids[ref]
+        pins = self.comp_pins[self.comp_offsets[c]:self.comp_offsets[c + 1]]
+        return dict(zip(self.pin_names[pins].tolist(), self.net_names[self.pin_net[pins]].tolist()))
+
+    def components_on(self, net):
+        """Refs connected to a net, without duplicates, in pin order."""
+        return list(dict.fromkeys(ref for ref, _ in self.pins_of(net)))
+
+    def component(self, ref):
+        c = self._ref_ids[ref]
+        return {
+            "ref": ref,
+            "value": str(self.comp_values[c]),
+            "footprint": str(self.comp_footprints[c]),
+            "mpn": str(self.comp_mpns[c]),
+            "bom_line": self.bom_lines.get(ref),
+            "nets": self.nets_of(ref),
+        }
+
+    def link_bom(self, lines):
+        """Attach BOM lines (:class:`bom_reader.BomLine`) to components by reference designator.
+
+        Returns:
+            (refs in the netlist but not the BOM, refs in the BOM but not the netlist)
+        """
+        self.bom_lines = {}
+        in_bom = set()
+        for line in lines:
+            for ref in line.ref_designators:
+                in_bom.add(ref)
+                if ref in self._ref_ids:
+                    self.bom_lines[ref] = line.line_no
+        return sorted(set(self._ref_ids) - in_bom), sorted(in_bom - set(self._ref_ids))
+
+    def stats(self):
+        return {
+            "components": len(self.comp_refs),
+            "nets": len(self.net_names),
+            "pins": len(self.pin_comp),
+            "hash": self.source_hash,
+            "cached": self.cached,
+        }
@@ -0,0 +1,285 @@
+"""
+Parameter normalization and a columnar parts table.
+
+Digi-Key records carry display strings ("0.1 µF", "±10%", "-55°C ~ 125°C",
+"0.1W, 1/10W", "X7R"). The ``parse_*`` functions turn them into SI floats,
+ranges and relative tolerances once; :class:`ParamTable` stores the result
+as one NumPy array per column so filters and sorts over thousands of parts
+are array operations:
+
+    table = ParamTable.from_records(records)
+    caps = table.split_by_category()["capacitors"]
+    x7r_16v = caps.filter(voltage_rated=(16, None), dielectric="X7R").sort("capacitance")
+"""
+import json
+import math
+import re
+
+import numpy as np
+
+SI_PREFIXES = {
+    "f": 1e-15, "p": 1e-12, "n": 1e-9, "u": 1e-6, "µ": 1e-6, "μ": 1e-6,
+    "m": 1e-3, "": 1.0, "k": 1e3, "K": 1e3, "M": 1e6, "G": 1e9,
+}
+
+# EIA class II/III dielectrics: (min °C, max °C, -ΔC, +ΔC) over the range
+DIELECTRICS = {
+    "X5R": (-55, 85, 0.15, 0.15),
+    "X6S": (-55, 105, 0.22, 0.22),
+    "X7R": (-55, 125, 0.15, 0.15),
+    "X7S": (-55, 125, 0.22, 0.22),
+    "X7T": (-55, 125, 0.33, 0.22),
+    "X8R": (-55, 150, 0.15, 0.15),
+    "Y5V": (-30, 85, 0.82, 0.22),
+    "Z5U": (10, 85, 0.56, 0.22),
+}
+# Class I dielectrics: tempco in ppm/°C
+CLASS1_DIELECTRICS = {"C0G": 30.0, "NP0": 30.0, "U2J": 750.0}
+
+_NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+_QUANTITY = re.compile(rf"({_NUMBER})(?:\s*/\s*(\d+))?\s*([fpnuµμmkKMG]?)(?=[A-Za-zΩ°%]|\s|$)")
+_TOLERANCE = re.compile(rf"([±+-])\s*({_NUMBER})\s*(%|ppm|[fpnuµμmkKMG]?[FHΩ]|[fpnuµμmkKMG]?Ohms?)?")
+_TEMPCO = re.compile(rf"±?\s*({_NUMBER})\s*ppm")
+_RANGE = re.compile(rf"({_NUMBER})\s*°?\s*[CK]?\s*(?:~|to|\.\.)\s*({_NUMBER})")
+_DIELECTRIC = re.compile(r"\b(" + "|".join(list(DIELECTRICS) + list(CLASS1_DIELECTRICS)) + r")\b")
+
+
+def _blank(text):
+    return text is None or not str(text).strip() or str(text).strip() == "-"
+
+
+def parse_quantity(text):
+    """SI float of the first value in a display string, or None.
+
+    "0.1 µF" -> 1e-07, "10 kOhms" -> 10000.0, "0.1W, 1/10W" -> 0.1,
+    "1/16W" -> 0.0625, "50V" -> 50.0
+    """
+    if _blank(text):
+        return None
+    match = _QUANTITY.search(str(text).replace(",", " , "))
+    if not match:
+        return None
+    value = float(match.group(1))
+    if match.group(2):
+        value /= float(match.group(2))
+    return value * SI_PREFIXES[match.group(3)]
+
+
+def parse_range(text):
+    """(low, high) of a range such as "-55°C ~ 125°C", or (None, None)."""
+    if _blank(text):
+        return None, None
+    match = _RANGE.search(str(text))
+    if not match:
+        value = parse_quantity(text)
+        return value, value
+    low, high = float(match.group(1)), float(match.group(2))
+    return min(low, high), max(low, high)
+
+
+def parse_tolerance(text, nominal=None):
+    """Relative (minus, plus) tolerance as fractions, or (None, None).
+
+    "±10%" -> (0.1, 0.1), "+80%, -20%" -> (0.2, 0.8), "±50ppm" -> (5e-05, 5e-05).
+    Absolute tolerances ("±0.25pF") need the ``nominal`` value in SI units.
+    """
+    if _blank(text):
+        return None, None
+    minus = plus = None
+    for sign, number, unit in _TOLERANCE.findall(str(text)):
+        value = float(number)
+        unit = unit or "%"
+        if unit == "%":
+            value /= 100.0
+        elif unit == "ppm":
+            value /= 1e6
+        elif nominal:
+            # Absolute tolerance: "pF" -> prefix "p", "Ohms"/"F" -> no prefix
+            prefix = unit[0] if len(unit) > 1 and unit[0] in SI_PREFIXES and not unit.startswith("Ohm") else ""
+            value = value * SI_PREFIXES[prefix] / nominal
+        else:
+            continue
+        if sign in "±-":
+            minus = value
+        if sign in "±+":
+            plus = value
+    if minus is None and plus is None:
+        return None, None
+    return (minus if minus is not None else plus), (plus if plus is not None else minus)
+
+
+def parse_tempco(text):
+    """(ppm/°C magnitude, dielectric code) of a temperature coefficient string.
+
+    "±50ppm/°C" -> (50.0, ""), "C0G, NP0" -> (30.0, "C0G"), "X7R" -> (nan, "X7R")
+    """
+    if _blank(text):
+        return math.nan, ""
+    text = str(text)
+    dielectric = _DIELECTRIC.search(text.upper())
+    code = dielectric.group(1) if dielectric else ""
+    match = _TEMPCO.search(text)
+    if match:
+        return abs(float(match.group(1))), code
+    if code in CLASS1_DIELECTRICS:
+        return CLASS1_DIELECTRICS[code], code
+    return math.nan, code
+
+
+def part_category(record):
+    """'capacitors', 'resistors' or 'others', as the UI groups parts."""
+    if "Capacitance" in record:
+        return "capacitors"
+    if "Resistance" in record:
+        return "resistors"
+    return "others"
+
+
+def normalize_record(record):
+    """Typed parameters of one Digi-Key record (missing numbers are NaN).
+
+    Tolerances and temperature drift are relative fractions; temperatures
+    are °C; everything else is in SI base units.
+    """
+    capacitance = parse_quantity(record.get("Capacitance"))
+    resistance = parse_quantity(record.get("Resistance"))
+    nominal = capacitance or resistance
+    tol_minus, tol_plus = parse_tolerance(record.get("Tolerance"), nominal)
+    temp_min, temp_max = parse_range(record.get("Operating Temperature"))
+    tempco, dielectric = parse_tempco(record.get("Temperature Coefficient"))
+    # Class II dielectrics specify the capacitance drift over their range directly
+    drift_minus = drift_plus = None
+    if dielectric in DIELECTRICS:
+        _, _, drift_minus, drift_plus = DIELECTRICS[dielectric]
+
+    def num(value):
+        return math.nan if value is None else float(value)
+
+    return {
+        "part_number": record.get("Part Number", ""),
+        "mfr": record.get("Mfr", ""),
+        "category": part_category(record),
+        "capacitance": num(capacitance),
+        "resistance": num(resistance),
+        "voltage_rated": num(parse_quantity(record.get("Voltage - Rated"))),
+        "power": num(parse_quantity(record.get("Power (Watts)"))),
+        "tolerance_minus": num(tol_minus),
+        "tolerance_plus": num(tol_plus),
+        "tempco_ppm": tempco,
+        "dielectric": dielectric,
+        "drift_minus": num(drift_minus),
+        "drift_plus": num(drift_plus),
+        "temp_min": num(temp_min),
+        "temp_max": num(temp_max),
+    }
+
+
+# Column name -> NumPy dtype; text columns are fixed-width unicode arrays
+COLUMNS = {
+    "part_number": np.str_,
+    "mfr": np.str_,
+    "category": np.str_,
+    "capacitance": np.float64,
+    "resistance": np.float64,
+    "voltage_rated": np.float64,
+    "power": np.float64,
+    "tolerance_minus": np.float64,
+    "tolerance_plus": np.float64,
+    "tempco_ppm": np.float64,
+    "dielectric": np.str_,
+    "drift_minus": np.float64,
+    "drift_plus": np.float64,
+    "temp_min": np.float64,
+    "temp_max": np.float64,
+}
+
+
+class ParamTable:
+    """Normalized parameters of many parts, one NumPy array per column.
+
+    ``row`` holds each part's position in the record list the table was
+    built from, so results can be mapped back to the original records.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    @classmethod
+    def from_records(cls, records):
+        rows = [normalize_record(r) for r in records]
+        columns = {name: np.array([row[name] for row in rows], dtype=dtype) for name, dtype in COLUMNS.items()}
+        columns["row"] = np.arange(len(rows))
+        return cls(columns)
+
+    @classmethod
+    def load(cls, path):
+        """Build a table from a parts.json file."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_records(json.load(f))
+
+    def __len__(self):
+        return len(self.columns["row"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def select(self, mask):
+        """Sub-table of the rows where ``mask`` (bool array or index array) selects."""
+        return ParamTable({name: values[mask] for name, values in self.columns.items()})
+
+    def mask(self, **conditions):
+        """Boolean mask for ``filter``'s conditions."""
+        mask = np.ones(len(self), dtype=bool)
+        for name, condition in conditions.items():
+            values = self.columns[name]
+            if isinstance(condition, tuple):
+                low, high = condition
+                # NaN (unknown) never satisfies a bound
+                if low is not None:
+                    mask &= values >= low
+                if high is not None:
+                    mask &= values <= high
+            elif isinstance(condition, (list, set, frozenset)):
+                mask &= np.isin(values, list(condition))
+            else:
+                mask &= values == condition
+        return mask
+
+    def filter(self, **conditions):
+        """Rows matching every condition.
+
+        A condition is an exact value (``dielectric="X7R"``), a collection
+        of allowed values, or an inclusive ``(low, high)`` range where either
+        bound may be None (``voltage_rated=(16, None)``).
+        """
+        return self.select(self.mask(**conditions))
+
+    def sort(self, by, descending=False):
+        """Rows ordered by a column (stable; NaN last)."""
+        order = np.argsort(self.columns[by], kind="stable")
+        if descending:
+            values = self.columns[by]
+            order = order[::-1]
+            if values.dtype.kind == "f":
+                # Keep NaN last after reversing
+                order = np.concatenate([order[~np.isnan(values[order])], order[np.isnan(values[order])]])
+        return self.select(order)
+
+    def split_by_category(self):
+        """{category: ParamTable} for 'capacitors', 'resistors' and 'others'."""
+        return {
+            category: self.select(self.columns["category"] == category)
+            for category in ("capacitors", "resistors", "others")
+        }
+
+    def to_records(self):
+        """Rows as dicts of plain Python values (NaN becomes None)."""
+        names = list(self.columns)
+        out = []
+        for i in range(len(self)):
+            row = {}
+            for name in names:
+                value = self.columns[name][i].item()
+                row[name] = None if isinstance(value, float) and math.isnan(value) else value
+            out.append(row)
+        return out
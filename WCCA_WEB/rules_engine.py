@@ -0,0 +1,508 @@
+"""
+Design-rule checks of a BOM (and optionally its netlist) against a
+constraints file.
+
+The constraints file is compiled once into a :class:`RulePlan`: a list of
+rules that each evaluate a whole column table at once (NumPy masks over
+one row per reference designator) and only format messages for the rows
+that fail. Two formats are accepted:
+
+* a YAML mapping::
+
+      derating:                      # applied stress <= factor * rating
+        capacitors: {voltage: 0.5}
+        resistors: {power: 0.5}
+      operating_temperature: [-40, 85]
+      allowed_manufacturers: [Murata, Yageo, Texas Instruments]
+      manufacturer_aliases: {TI: Texas Instruments}
+      approved_alternates:           # interchangeable part numbers
+        - [UCC3946D, UCC2946DTR]
+      approved_only: false           # flag parts outside approved_alternates
+      nets: {/VIN: 12, GND: 0}       # net voltages, for derating stress
+      floating_nets: true            # flag nets with a single pin
+
+* an approved-vendor CSV (``S.NO,Manf1,Manf1_partno,...,ManfN_partno``, as
+  in ``Constraints.yaml``): each row is one group of approved alternates,
+  with the manufacturer expected for each part number.
+
+:class:`RuleChecker` holds the rows and their violations. Large tables are
+split across a process pool; ``update_line`` and ``update_part`` re-check
+only the rows of the BOM line or part number that changed.
+"""
+import csv
+import functools
+import io
+import math
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import yaml
+
+from part_params import ParamTable, normalize_record
+
+# Worker processes for full checks (0: one per CPU); BOMs below
+# PARALLEL_MIN_LINES are checked in-process, where a pool costs more than it saves
+RULE_WORKERS = int(os.getenv("WCCA_RULE_WORKERS", "0")) or os.cpu_count() or 1
+PARALLEL_MIN_LINES = 20_000
+
+# derating parameter -> (applied stress column, rated value column)
+DERATING_PARAMETERS = {
+    "voltage": ("v_stress", "voltage_rated"),
+    "power": ("p_stress", "power"),
+}
+CATEGORIES = ("capacitors", "resistors", "others")
+
+_AVL_HEADER = re.compile(r"manf\d+_partno", re.IGNORECASE)
+_MFR_SUFFIXES = {"inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited",
+                 "llc", "gmbh", "ag", "sa", "plc", "electronics", "semiconductor", "semiconductors"}
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+@functools.lru_cache(maxsize=4096)
+def manufacturer_key(name):
+    """Comparable form of a manufacturer name ("Murata Electronics" -> "murata")."""
+    words = _NON_WORD.sub(" ", str(name or "").lower()).split()
+    while len(words) > 1 and words[-1] in _MFR_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def _net_key(name):
+    return str(name).lstrip("/").upper()
+
+
+def _map_unique(values, fn, dtype):
+    """``fn(v)`` for each element of an array, called once per distinct value."""
+    unique, inverse = np.unique(values, return_inverse=True)
+    return np.array([fn(v) for v in unique.tolist()], dtype=dtype)[inverse].reshape(len(values))
+
+
+# -- rules --------------------------------------------------------------------
+
+class DeratingRule:
+    """Applied stress must not exceed ``factor`` times the part's rating."""
+
+    severity = "error"
+
+    def __init__(self, category, parameter, factor):
+        if parameter not in DERATING_PARAMETERS:
+            raise ValueError(f"Unknown derating parameter '{parameter}' "
+                             f"(expected one of {', '.join(DERATING_PARAMETERS)})")
+        if category not in CATEGORIES:
+            raise ValueError(f"Unknown derating category '{category}' (expected one of {', '.join(CATEGORIES)})")
+        self.category, self.parameter, self.factor = category, parameter, float(factor)
+        self.name = f"derating.{category}.{parameter}"
+
+    def evaluate(self, rows):
+        """(row indices, messages) of the rows that fail."""
+        stress_col, rated_col = DERATING_PARAMETERS[self.parameter]
+        stress, rated = rows[stress_col], rows[rated_col]
+        # Unknown stress or rating (NaN) never fails
+        idx = np.flatnonzero((rows["category"] == self.category) & (stress > self.factor * rated))
+        return idx, [f"{self.parameter} stress {s:.4g} exceeds {self.factor:.0%} of rated {r:.4g}"
+                     for s, r in zip(stress[idx].tolist(), rated[idx].tolist())]
+
+
+class TemperatureRule:
+    """The part's operating range must cover the required range."""
+
+    name = "operating_temperature"
+    severity = "error"
+
+    def __init__(self, low, high):
+        self.low, self.high = float(low), float(high)
+
+    def evaluate(self, rows):
+        low, high = rows["temp_min"], rows["temp_max"]
+        idx = np.flatnonzero((low > self.low) | (high < self.high))
+        # Few distinct ranges: format each once
+        messages = {}
+        for pair in set(zip(low[idx].tolist(), high[idx].tolist())):
+            messages[pair] = f"rated {pair[0]:g} to {pair[1]:g} °C, required {self.low:g} to {self.high:g} °C"
+        return idx, [messages[pair] for pair in zip(low[idx].tolist(), high[idx].tolist())]
+
+
+class ManufacturerRule:
+    """The manufacturer must be on the allowed list."""
+
+    name = "allowed_manufacturers"
+    severity = "error"
+
+    def __init__(self, allowed, aliases=None):
+        self.aliases = {manufacturer_key(k): manufacturer_key(v) for k, v in (aliases or {}).items()}
+        self.allowed = {self.canonical(m) for m in allowed}
+
+    def canonical(self, name):
+        key = manufacturer_key(name)
+        return self.aliases.get(key, key)
+
+    def evaluate(self, rows):
+        ok = _map_unique(rows["mfr_key"], lambda k: k == "" or self.canonical(k) in self.allowed, bool)
+        idx = np.flatnonzero(~ok)
+        return idx, [f"manufacturer '{m}' is not on the allowed list" for m in rows["manufacturer"][idx].tolist()]
+
+
+class ApprovedPartsRule:
+    """Alternates must belong to the primary part's approved group, the
+    manufacturer must be the one approved for the part number and, with
+    ``approved_only``, every part must be approved at all."""
+
+    name = "approved_alternates"
+    severity = "error"
+
+    def __init__(self, groups, approved_only=False):
+        # groups: [[(part number, manufacturer or None), ...], ...]
+        self.group_of = {}
+        self.manufacturers = {}
+        for g, group in enumerate(groups):
+            for part, manufacturer in group:
+                key = part.strip().upper()
+                self.group_of.setdefault(key, g)
+                if manufacturer:
+                    self.manufacturers.setdefault(key, set()).add(manufacturer_key(manufacturer))
+        self.approved_only = approved_only
+
+    def evaluate(self, rows):
+        parts = rows["part_number"]
+        group = _map_unique(parts, lambda p: self.group_of.get(p, -1), np.int64)
+        first = rows["first_of_line"]
+
+        def approved_maker(pair):
+            part, key = pair.split("\t")
+            return not key or part not in self.manufacturers or key in self.manufacturers[part]
+
+        pairs = np.char.add(np.char.add(parts, "\t"), rows["mfr_key"])
+        idx = np.flatnonzero(first & ~_map_unique(pairs, approved_maker, bool))
+        found = [idx]
+        messages = [f"manufacturer '{m}' is not approved for {p}"
+                    for m, p in zip(rows["manufacturer"][idx].tolist(), parts[idx].tolist())]
+
+        if self.approved_only:
+            idx = np.flatnonzero(first & (group < 0))
+            found.append(idx)
+            messages += [f"{p} is not on the approved parts list" for p in parts[idx].tolist()]
+
+        # One entry per (line, alternate part number)
+        counts = np.array([len(a) for a in rows["alternates"]], dtype=np.int64) * first
+        if counts.sum():
+            alt_rows = np.repeat(np.arange(len(parts)), counts)
+            alt_parts = np.array([p.upper() for i in np.flatnonzero(counts) for p in rows["alternates"][i]])
+            alt_group = _map_unique(alt_parts, lambda p: self.group_of.get(p, -1), np.int64)
+            bad = np.flatnonzero((alt_group < 0) | (alt_group != group[alt_rows]))
+            found.append(alt_rows[bad])
+            messages += [f"alternate {a} is not an approved alternate of {p}"
+                         for a, p in zip(alt_parts[bad].tolist(), parts[alt_rows[bad]].tolist())]
+        return np.concatenate(found), messages
+
+
+class RulePlan:
+    """Compiled constraints: row rules over BOM rows plus net-level checks."""
+
+    def __init__(self, rules, net_voltages=None, required_nets=(), floating_nets=False):
+        self.rules = list(rules)
+        self.net_voltages = {_net_key(k): float(v) for k, v in (net_voltages or {}).items()}
+        self.required_nets = list(required_nets)
+        self.floating_nets = floating_nets
+
+    def __len__(self):
+        return len(self.rules) + bool(self.required_nets) + bool(self.floating_nets)
+
+    @property
+    def names(self):
+        names = [rule.name for rule in self.rules]
+        if self.required_nets:
+            names.append("nets")
+        if self.floating_nets:
+            names.append("floating_nets")
+        return names
+
+    def evaluate(self, rows):
+        """Violations of every row rule over a row table, by row and then rule order.
+
+        Each rule returns (row indices, messages); the violation dicts are
+        assembled from whole-column lookups rather than element by element.
+        """
+        found, order, messages = [], [], []
+        for n, rule in enumerate(self.rules):
+            idx, rule_messages = rule.evaluate(rows)
+            found.append(np.asarray(idx, dtype=np.int64))
+            order.append(np.full(len(rule_messages), n))
+            messages += rule_messages
+        if not messages:
+            return []
+        idx, order = np.concatenate(found), np.concatenate(order)
+        perm = np.lexsort((order, idx))
+        idx = idx[perm]
+        return [
+            {"rule": self.rules[n].name, "severity": self.rules[n].severity, "line_no": line_no,
+             "ref": ref, "part_number": part, "message": messages[m]}
+            for n, m, line_no, ref, part in zip(
+                order[perm].tolist(), perm.tolist(), rows["line_no"][idx].tolist(),
+                rows["ref"][idx].tolist(), rows["part_number"][idx].tolist())
+        ]
+
+    def evaluate_nets(self, netlist):
+        """Violations of the net-level checks against a :class:`netlist_index.NetlistIndex`."""
+        violations = []
+        present = {_net_key(n) for n in netlist.net_names.tolist()}
+        for net in self.required_nets:
+            if _net_key(net) not in present:
+                violations.append({"rule": "nets", "severity": "error", "net": net,
+                                   "message": f"net {net} has a voltage constraint but is not in the netlist"})
+        if self.floating_nets:
+            for n in np.flatnonzero(np.diff(netlist.net_offsets) == 1):
+                violations.append({"rule": "floating_nets", "severity": "warning", "net": str(netlist.net_names[n]),
+                                   "message": "net has a single pin"})
+        return violations
+
+
+def _groups_from_avl(text):
+    """Approved groups of an approved-vendor CSV ([(part number, manufacturer)] per row)."""
+    groups = []
+    for row in csv.DictReader(io.StringIO(text)):
+        row = {(k or "").strip().lower(): (v or "").strip() for k, v in row.items()}
+        group = []
+        for column in sorted(k for k in row if _AVL_HEADER.fullmatch(k)):
+            if row[column]:
+                group.append((row[column], row.get(column[:-len("_partno")]) or None))
+        if group:
+            groups.append(group)
+    return groups
+
+
+def compile_rules(text):
+    """Compile constraints text (YAML rules or an approved-vendor CSV) into a :class:`RulePlan`.
+
+    Raises:
+        ValueError: for unparsable files and unknown or malformed rules
+    """
+    first_line = next((line for line in text.splitlines() if line.strip()), "")
+    if _AVL_HEADER.search(first_line):
+        return RulePlan([ApprovedPartsRule(_groups_from_avl(text))])
+
+    try:
+        spec = yaml.safe_load(text) or {}
+    except yaml.YAMLError as e:
+        raise ValueError(f"Invalid constraints YAML: {e}")
+    if not isinstance(spec, dict):
+        raise ValueError("Constraints must be a YAML mapping or an approved-vendor CSV")
+
+    rules = []
+    try:
+        for category, limits in (spec.get("derating") or {}).items():
+            for parameter, factor in limits.items():
+                rules.append(DeratingRule(category, parameter, factor))
+        if spec.get("operating_temperature") is not None:
+            low, high = spec["operating_temperature"]
+            rules.append(TemperatureRule(low, high))
+        if spec.get("allowed_manufacturers"):
+            rules.append(ManufacturerRule(spec["allowed_manufacturers"], spec.get("manufacturer_aliases")))
+        if spec.get("approved_alternates") or spec.get("approved_only"):
+            groups = []
+            for group in spec.get("approved_alternates") or []:
+                groups.append([
+                    (str(p["part"]), p.get("manufacturer")) if isinstance(p, dict) else (str(p), None)
+                    for p in group
+                ])
+            rules.append(ApprovedPartsRule(groups, bool(spec.get("approved_only"))))
+        nets = spec.get("nets") or {}
+        return RulePlan(rules, nets, list(nets), bool(spec.get("floating_nets")))
+    except (AttributeError, TypeError, KeyError) as e:
+        raise ValueError(f"Malformed constraints: {e}")
+
+
+def load_rules(path):
+    """Compile a constraints file."""
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return compile_rules(f.read())
+
+
+# -- rows ---------------------------------------------------------------------
+
+ROW_TEXT = ("ref", "part_number", "manufacturer", "mfr_key", "category")
+# Part parameters copied onto each row, then the stress computed from the netlist
+ROW_PARAMS = ("resistance", "voltage_rated", "power", "temp_min", "temp_max")
+ROW_NUMBERS = ROW_PARAMS + ("v_stress", "p_stress")
+
+
+def _stress(ref, params, netlist, net_voltages):
+    """(voltage across the part, power in it) from the known net voltages; NaN when unknown."""
+    if not netlist.has_ref(ref):
+        return math.nan, math.nan
+    volts = [net_voltages[k] for k in map(_net_key, netlist.nets_of(ref).values()) if k in net_voltages]
+    if len(volts) < 2:
+        return math.nan, math.nan
+    v = max(volts) - min(volts)
+    resistance = params.get("resistance", math.nan)
+    return v, (v * v / resistance if resistance and resistance > 0 else math.nan)
+
+
+def build_rows(lines, parts, netlist=None, net_voltages=None):
+    """One check row per reference designator of each BOM line (one row for a line without any).
+
+    Args:
+        lines: :class:`bom_reader.BomLine` objects
+        parts: {part number (upper case): normalized row} (see :func:`part_params.normalize_record`)
+        netlist: optional :class:`netlist_index.NetlistIndex`, for stress from ``net_voltages``
+    """
+    columns = {name: [] for name in ("line_no", "first_of_line", "alternates") + ROW_TEXT + ROW_NUMBERS}
+    for line in lines:
+        part = line.part_number.strip().upper()
+        params = parts.get(part) or {}
+        manufacturer = line.manufacturer or params.get("mfr") or ""
+        refs = line.ref_designators or [""]
+        n = len(refs)
+        # Everything but the ref and the stress is the same for all refs of a line
+        shared = {
+            "line_no": line.line_no, "alternates": tuple(line.alternates), "part_number": part,
+            "manufacturer": manufacturer, "mfr_key": manufacturer_key(manufacturer),
+            "category": params.get("category", "others"),
+        }
+        for name in ROW_PARAMS:
+            value = params.get(name)
+            shared[name] = math.nan if value is None else value
+        for name, value in shared.items():
+            columns[name].extend([value] * n)
+        columns["ref"].extend(refs)
+        columns["first_of_line"].extend([True] + [False] * (n - 1))
+        if netlist is None or not net_voltages:
+            columns["v_stress"].extend([math.nan] * n)
+            columns["p_stress"].extend([math.nan] * n)
+        else:
+            for ref in refs:
+                v_stress, p_stress = _stress(ref, params, netlist, net_voltages)
+                columns["v_stress"].append(v_stress)
+                columns["p_stress"].append(p_stress)
+
+    table = {name: np.array(columns[name], dtype=np.str_) for name in ROW_TEXT}
+    table.update({name: np.array(columns[name], dtype=np.float64) for name in ROW_NUMBERS})
+    table["line_no"] = np.array(columns["line_no"], dtype=np.int64)
+    table["first_of_line"] = np.array(columns["first_of_line"], dtype=bool)
+    table["alternates"] = np.empty(len(columns["line_no"]), dtype=object)
+    table["alternates"][:] = columns["alternates"]
+    table["row"] = np.arange(len(columns["line_no"]))
+    return ParamTable(table)
+
+
+def _concat(a, b):
+    columns = {name: np.concatenate([a[name], b[name]]) for name in a.columns}
+    columns["row"] = np.arange(len(columns["row"]))
+    return ParamTable(columns)
+
+
+def _check_lines(plan, lines, parts, netlist):
+    rows = build_rows(lines, parts, netlist, plan.net_voltages)
+    return rows, plan.evaluate(rows)
+
+
+def check_lines(plan, lines, parts, netlist=None, workers=None):
+    """Build the rows of some BOM lines and evaluate ``plan`` over them.
+
+    Building rows is per-line Python work, so large BOMs are split into
+    contiguous chunks that are built and checked in a process pool.
+
+    Returns:
+        (rows, violations)
+    """
+    lines = list(lines)
+    workers = workers or RULE_WORKERS
+    if workers <= 1 or len(lines) < PARALLEL_MIN_LINES:
+        return _check_lines(plan, lines, parts, netlist)
+    size = -(-len(lines) // workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_check_lines, plan, lines[start:start + size], parts, netlist)
+                   for start in range(0, len(lines), size)]
+        results = [f.result() for f in futures]
+    rows = results[0][0]
+    for chunk, _ in results[1:]:
+        rows = _concat(rows, chunk)
+    return rows, [v for _, violations in results for v in violations]
+
+
+class RuleChecker:
+    """A BOM checked against a plan, with incremental re-checks.
+
+    Violations are kept per BOM line, so a change to one line or one part
+    number only re-evaluates the rows it touches.
+    """
+
+    def __init__(self, plan, lines, parts, netlist=None, workers=None):
+        self.plan = plan
+        self.lines = {line.line_no: line for line in lines}
+        self.parts = {k.upper(): v for k, v in parts.items()}
+        self.netlist = netlist
+        self.by_line = {}
+        self.rows, violations = check_lines(plan, self.lines.values(), self.parts, netlist, workers)
+        self._store(violations, self.rows["line_no"])
+        self.net_violations = plan.evaluate_nets(netlist) if netlist is not None else []
+
+    def _store(self, violations, line_nos):
+        for line_no in np.unique(line_nos).tolist():
+            self.by_line[line_no] = []
+        for v in violations:
+            self.by_line[v["line_no"]].append(v)
+
+    def _recheck(self, line_nos):
+        """Rebuild and re-evaluate the rows of some BOM lines; returns the row count."""
+        line_nos = sorted(line_nos)
+        new_rows = build_rows([self.lines[n] for n in line_nos], self.parts, self.netlist, self.plan.net_voltages)
+        columns = self.rows.columns
+        old = np.flatnonzero(np.isin(columns["line_no"], line_nos))
+        old = old[np.argsort(columns["line_no"][old], kind="stable")]
+        fits = np.array_equal(columns["line_no"][old], new_rows["line_no"]) and all(
+            new_rows[name].dtype.itemsize <= columns[name].dtype.itemsize for name in ROW_TEXT)
+        if fits:
+            # Same refs per line and the text fits the columns: overwrite in place
+            for name in columns:
+                if name != "row":
+                    columns[name][old] = new_rows[name]
+        else:
+            keep = np.ones(len(self.rows), dtype=bool)
+            keep[old] = False
+            self.rows = _concat(self.rows.select(keep), new_rows)
+        for line_no in line_nos:
+            self.by_line[line_no] = []
+        self._store(self.plan.evaluate(new_rows), new_rows["line_no"])
+        return len(new_rows)
+
+    def update_line(self, line):
+        """Replace one BOM line (new part number, manufacturer, alternates or refs) and re-check it.
+
+        Returns:
+            the number of rows re-checked
+        """
+        self.lines[line.line_no] = line
+        return self._recheck([line.line_no])
+
+    def update_part(self, record):
+        """Replace the parameters of one part (a Digi-Key record) and re-check the lines that use it.
+
+        Returns:
+            the number of rows re-checked
+        """
+        params = normalize_record(record)
+        part = params["part_number"].strip().upper()
+        self.parts[part] = params
+        line_nos = np.unique(self.rows["line_no"][self.rows["part_number"] == part]).tolist()
+        return self._recheck(line_nos) if line_nos else 0
+
+    def report(self):
+        """{violations, summary}; row violations in BOM order, then net violations."""
+        violations = [v for line_no in sorted(self.by_line) for v in self.by_line[line_no]]
+        violations += self.net_violations
+        by_rule = {}
+        for v in violations:
+            by_rule[v["rule"]] = by_rule.get(v["rule"], 0) + 1
+        return {
+            "violations": violations,
+            "summary": {
+                "rules": self.plan.names,
+                "lines": len(self.by_line),
+                "rows": len(self.rows),
+                "errors": sum(v["severity"] == "error" for v in violations),
+                "warnings": sum(v["severity"] == "warning" for v in violations),
+                "by_rule": by_rule,
+            },
+        }
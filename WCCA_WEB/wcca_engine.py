@@ -0,0 +1,484 @@
+"""
+Worst-case circuit analysis over normalized BOM parameters.
+
+An analysis is a set of variables (component values with tolerance,
+temperature coefficient and dielectric drift) and named circuit nodes, each
+an arithmetic expression over variables and earlier nodes:
+
+    {
+      "temperature": [-40, 125],
+      "variables": {"VREF": {"nominal": 1.233, "tolerance": 0.01}},
+      "nodes": {
+        "VOUT": {"expr": "VREF * (1 + R6 / R3)", "min": 4.9, "max": 5.1},
+        "I_DIV": "VOUT / (R6 + R3)"
+      }
+    }
+
+Names that are not declared variables are looked up as reference
+designators in the BOM and bound to that part's normalized parameters
+(see :mod:`part_params`). Three methods are evaluated for every node:
+
+* EVA  - extreme value analysis: every variable at its low/high bound
+  (all corners for up to EVA_CORNER_LIMIT variables, else the corner picked
+  by the sign of each sensitivity)
+* RSS  - root-sum-square of the per-variable deviations, from central
+  finite-difference sensitivities
+* MC   - Monte Carlo, drawn and evaluated in chunks of NumPy arrays
+
+Expressions are parsed with :mod:`ast` and only arithmetic, numbers, names
+and the functions in FUNCTIONS are accepted.
+"""
+import ast
+import json
+import math
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+T_REF = 25.0
+EVA_CORNER_LIMIT = 12
+DEFAULT_SAMPLES = 100_000
+DEFAULT_CHUNK_SIZE = 1 << 18
+DEFAULT_PERCENTILES = (0.135, 2.5, 50.0, 97.5, 99.865)
+DISTRIBUTIONS = ("uniform", "normal")
+
+FUNCTIONS = {
+    "sqrt": np.sqrt, "exp": np.exp, "log": np.log, "log10": np.log10, "abs": np.abs,
+    "sin": np.sin, "cos": np.cos, "tan": np.tan, "atan": np.arctan,
+    "min": np.minimum, "max": np.maximum,
+    # Parallel combination of two impedances
+    "par": lambda a, b: a * b / (a + b),
+}
+CONSTANTS = {"pi": math.pi}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd,
+)
+
+
+def _num(value, default=0.0):
+    """float(value), with None and NaN mapped to ``default``."""
+    if value is None:
+        return default
+    value = float(value)
+    return default if math.isnan(value) else value
+
+
+@dataclass
+class Variable:
+    """One uncertain input.
+
+    Tolerances and drifts are relative fractions; ``tempco_ppm`` is the
+    magnitude of the temperature coefficient in ppm/°C. With ``"normal"``
+    the tolerance is taken as 3 sigma (samples are clipped to it).
+    """
+    name: str
+    nominal: float
+    tol_minus: float = 0.0
+    tol_plus: float = 0.0
+    tempco_ppm: float = 0.0
+    drift_minus: float = 0.0
+    drift_plus: float = 0.0
+    distribution: str = "uniform"
+    part_number: str = ""
+
+    def __post_init__(self):
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Variable {self.name}: distribution must be one of {', '.join(DISTRIBUTIONS)}")
+
+    def deviation(self, temperature):
+        """Worst relative (minus, plus) deviation over the temperature range."""
+        span = max(abs(t - T_REF) for t in temperature)
+        temp = self.tempco_ppm * 1e-6 * span
+        return self.tol_minus + temp + self.drift_minus, self.tol_plus + temp + self.drift_plus
+
+    def bounds(self, temperature):
+        minus, plus = self.deviation(temperature)
+        low, high = self.nominal * (1 - minus), self.nominal * (1 + plus)
+        return min(low, high), max(low, high)
+
+    def sample(self, rng, n, temps):
+        """``n`` values at the sampled operating temperatures ``temps``."""
+        if self.distribution == "normal":
+            z = np.clip(rng.standard_normal(n) / 3.0, -1.0, 1.0)
+            tol = np.where(z < 0, z * self.tol_minus, z * self.tol_plus)
+        else:
+            u = rng.uniform(-1.0, 1.0, n)
+            tol = np.where(u < 0, u * self.tol_minus, u * self.tol_plus)
+        rel = 1.0 + tol
+        if self.tempco_ppm:
+            # The sign and exact value of the coefficient vary part to part
+            rel += rng.uniform(-1.0, 1.0, n) * self.tempco_ppm * 1e-6 * (temps - T_REF)
+        if self.drift_minus or self.drift_plus:
+            rel += rng.uniform(-self.drift_minus, self.drift_plus, n)
+        return self.nominal * rel
+
+    @classmethod
+    def from_spec(cls, name, spec):
+        """Variable from a JSON spec: a number, or a dict with nominal and tolerances."""
+        if not isinstance(spec, dict):
+            return cls(name, float(spec))
+        if "nominal" not in spec:
+            raise ValueError(f"Variable {name} has no 'nominal'")
+        tolerance = spec.get("tolerance", 0.0)
+        return cls(
+            name=name,
+            nominal=float(spec["nominal"]),
+            tol_minus=float(spec.get("tol_minus", tolerance)),
+            tol_plus=float(spec.get("tol_plus", tolerance)),
+            tempco_ppm=float(spec.get("tempco_ppm", 0.0)),
+            drift_minus=float(spec.get("drift_minus", spec.get("drift", 0.0))),
+            drift_plus=float(spec.get("drift_plus", spec.get("drift", 0.0))),
+            distribution=spec.get("distribution", "uniform"),
+            part_number=spec.get("part_number", ""),
+        )
+
+    @classmethod
+    def from_part(cls, name, params, distribution="uniform"):
+        """Variable from a normalized part row (:func:`part_params.normalize_record`)."""
+        nominal = params["resistance"] if params["category"] == "resistors" else params["capacitance"]
+        nominal = _num(nominal, None)
+        if nominal is None:
+            raise ValueError(f"{name} ({params['part_number']}) has no resistance or capacitance value")
+        return cls(
+            name=name,
+            nominal=nominal,
+            tol_minus=_num(params["tolerance_minus"]),
+            tol_plus=_num(params["tolerance_plus"]),
+            tempco_ppm=_num(params["tempco_ppm"]),
+            drift_minus=_num(params["drift_minus"]),
+            drift_plus=_num(params["drift_plus"]),
+            distribution=distribution,
+            part_number=params["part_number"],
+        )
+
+
+def compile_expression(text):
+    """Validate an expression and return ``(code, names it uses)``.
+
+    Raises:
+        ValueError: on syntax errors or anything but arithmetic, numbers,
+            names and calls to FUNCTIONS
+    """
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression '{text}': {e.msg}")
+    names = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax in '{text}': {type(node).__name__}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ValueError(f"Only numeric constants are allowed in '{text}'")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+                raise ValueError(f"Unsupported function call in '{text}'")
+        elif isinstance(node, ast.Name) and node.id not in FUNCTIONS and node.id not in CONSTANTS:
+            names.add(node.id)
+        if isinstance(node, ast.Constant):
+            # Float constants overflow instead of growing huge ints (9**9**9)
+            node.value = float(node.value)
+    return compile(tree, "<wcca>", "eval"), names
+
+
+class Node:
+    """A named circuit expression with optional min/max limits."""
+
+    def __init__(self, name, expr, low=None, high=None):
+        if not isinstance(expr, str):
+            raise ValueError(f"Node {name}: 'expr' must be a string")
+        self.name = name
+        self.expr = expr
+        self.low = None if low is None else float(low)
+        self.high = None if high is None else float(high)
+        self.code, self.names = compile_expression(expr)
+
+    @classmethod
+    def from_spec(cls, name, spec):
+        if isinstance(spec, str):
+            return cls(name, spec)
+        if not isinstance(spec, dict):
+            raise ValueError(f"Node {name} must be an expression or an object with 'expr'")
+        if "expr" not in spec:
+            raise ValueError(f"Node {name} has no 'expr'")
+        return cls(name, spec["expr"], spec.get("min"), spec.get("max"))
+
+
+class Analysis:
+    """Variables and nodes of one worst-case analysis."""
+
+    def __init__(self, variables, nodes, temperature=(T_REF, T_REF)):
+        self.variables = {v.name: v for v in variables}
+        self.temperature = (float(min(temperature)), float(max(temperature)))
+        self.nodes = self._order(nodes)
+
+    def _order(self, nodes):
+        """Nodes in dependency order; unknown names and cycles are errors."""
+        by_name = {n.name: n for n in nodes}
+        ordered, state = [], {}
+
+        def visit(node, path):
+            if state.get(node.name) == "done":
+                return
+            if state.get(node.name) == "visiting":
+                raise ValueError(f"Circular node definitions: {' -> '.join(path + [node.name])}")
+            state[node.name] = "visiting"
+            for name in sorted(node.names):
+                if name in by_name:
+                    visit(by_name[name], path + [node.name])
+                elif name not in self.variables:
+                    raise ValueError(f"Node {node.name} uses undefined name '{name}'")
+            state[node.name] = "done"
+            ordered.append(node)
+
+        for node in nodes:
+            visit(node, [])
+        return ordered
+
+    # -- evaluation ----------------------------------------------------------
+
+    def evaluate(self, values):
+        """Evaluate every node for arrays (or scalars) of variable values.
+
+        Returns:
+            {node name: ndarray} broadcast to the shape of the inputs
+        """
+        env = dict(FUNCTIONS, **CONSTANTS)
+        env.update(values)
+        shape = np.broadcast(*[np.asarray(v) for v in values.values()]).shape if values else ()
+        out = {}
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            for node in self.nodes:
+                try:
+                    result = eval(node.code, {"__builtins__": {}}, env)
+                except (ArithmeticError, TypeError) as e:
+                    raise ValueError(f"Node {node.name} cannot be evaluated: {e}")
+                env[node.name] = out[node.name] = np.broadcast_to(np.asarray(result, dtype=np.float64), shape)
+        return out
+
+    def nominal(self):
+        values = self.evaluate({name: np.float64(v.nominal) for name, v in self.variables.items()})
+        return {name: float(value) for name, value in values.items()}
+
+    def _sensitivities(self):
+        """(nominal outputs, {node: array of d node / d variable}) by central differences."""
+        names = list(self.variables)
+        n = len(names)
+        if n == 0:
+            # Nothing varies: no sensitivities, every corner is the nominal point
+            return self.nominal(), {node.name: np.zeros(0) for node in self.nodes}
+        nominal = np.array([self.variables[name].nominal for name in names])
+        steps = np.where(nominal != 0, np.abs(nominal) * 1e-6, 1e-9)
+        # Row 0 is the nominal point, then +h and -h for each variable
+        points = np.tile(nominal, (2 * n + 1, 1))
+        points[1 + np.arange(n), np.arange(n)] += steps
+        points[1 + n + np.arange(n), np.arange(n)] -= steps
+        out = self.evaluate({name: points[:, i] for i, name in enumerate(names)})
+        grads = {node: (values[1:n + 1] - values[n + 1:]) / (2 * steps) for node, values in out.items()}
+        return {node: float(values[0]) for node, values in out.items()}, grads
+
+    def eva(self):
+        """Extreme value analysis: {node: {'min', 'max', 'method'}}."""
+        names = list(self.variables)
+        bounds = np.array([self.variables[name].bounds(self.temperature) for name in names]).reshape(-1, 2)
+        n = len(names)
+        if n <= EVA_CORNER_LIMIT:
+            corners = np.arange(1 << n)
+            values = {name: np.where((corners >> i) & 1, bounds[i, 1], bounds[i, 0]) for i, name in enumerate(names)}
+            out = self.evaluate(values)
+            return {node: {"min": float(np.nanmin(v)), "max": float(np.nanmax(v)), "method": "corners"}
+                    for node, v in out.items()}
+
+        # Too many corners: per node, push each variable towards the bound
+        # its sensitivity points at (exact for monotonic expressions)
+        _, grads = self._sensitivities()
+        node_names = list(grads)
+        low_high = np.empty((2 * len(node_names), n))
+        for j, node in enumerate(node_names):
+            rising = grads[node] >= 0
+            low_high[2 * j] = np.where(rising, bounds[:, 0], bounds[:, 1])
+            low_high[2 * j + 1] = np.where(rising, bounds[:, 1], bounds[:, 0])
+        out = self.evaluate({name: low_high[:, i] for i, name in enumerate(names)})
+        result = {}
+        for j, node in enumerate(node_names):
+            pair = out[node][2 * j:2 * j + 2]
+            result[node] = {"min": float(np.nanmin(pair)), "max": float(np.nanmax(pair)), "method": "sensitivity"}
+        return result
+
+    def rss(self):
+        """Root-sum-square: {node: {'min', 'max', 'nominal'}}.
+
+        Each variable contributes sensitivity x deviation; upward and downward
+        contributions are summed in quadrature separately.
+        """
+        names = list(self.variables)
+        nominal_out, grads = self._sensitivities()
+        deltas = np.array([
+            [v.bounds(self.temperature)[0] - v.nominal, v.bounds(self.temperature)[1] - v.nominal]
+            for v in (self.variables[name] for name in names)
+        ]).reshape(-1, 2)
+        result = {}
+        for node, grad in grads.items():
+            contributions = grad[:, None] * deltas
+            up = np.sqrt(np.sum(np.clip(contributions.max(axis=1), 0, None) ** 2))
+            down = np.sqrt(np.sum(np.clip(contributions.min(axis=1), None, 0) ** 2))
+            result[node] = {"min": nominal_out[node] - float(down), "max": nominal_out[node] + float(up),
+                            "nominal": nominal_out[node]}
+        return result
+
+    def monte_carlo(self, samples=DEFAULT_SAMPLES, seed=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                    percentiles=DEFAULT_PERCENTILES):
+        """Monte Carlo over ``samples`` draws, ``chunk_size`` at a time.
+
+        Every draw also picks one operating temperature shared by all parts.
+        Memory is one float64 per sample per node plus the working set of a
+        single chunk.
+
+        Returns:
+            {node: {'min', 'max', 'mean', 'std', 'percentiles': {p: value},
+            'yield' (fraction inside the node limits, if any)}}
+        """
+        rng = np.random.default_rng(seed)
+        outputs = {node.name: np.empty(samples) for node in self.nodes}
+        for start in range(0, samples, chunk_size):
+            n = min(chunk_size, samples - start)
+            temps = rng.uniform(self.temperature[0], self.temperature[1], n)
+            values = {name: v.sample(rng, n, temps) for name, v in self.variables.items()}
+            for name, result in self.evaluate(values).items():
+                outputs[name][start:start + n] = result
+
+        limits = {node.name: (node.low, node.high) for node in self.nodes}
+        result = {}
+        for name, values in outputs.items():
+            stats = {
+                "min": float(np.nanmin(values)),
+                "max": float(np.nanmax(values)),
+                "mean": float(np.nanmean(values)),
+                "std": float(np.nanstd(values)),
+                "percentiles": dict(zip((str(p) for p in percentiles),
+                                        np.nanpercentile(values, percentiles).tolist())),
+            }
+            low, high = limits[name]
+            if low is not None or high is not None:
+                inside = np.ones(samples, dtype=bool)
+                if low is not None:
+                    inside &= values >= low
+                if high is not None:
+                    inside &= values <= high
+                stats["yield"] = float(inside.mean())
+            result[name] = stats
+        return result
+
+    def run(self, samples=DEFAULT_SAMPLES, seed=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Nominal, EVA, RSS and Monte Carlo results per node, with limit checks."""
+        nominal = self.nominal()
+        eva = self.eva()
+        rss = self.rss()
+        mc = self.monte_carlo(samples, seed, chunk_size) if samples else {}
+        report = {}
+        for node in self.nodes:
+            entry = {
+                "expr": node.expr,
+                "limits": {"min": node.low, "max": node.high},
+                "nominal": nominal[node.name],
+                "eva": eva[node.name],
+                "rss": rss[node.name],
+            }
+            if mc:
+                entry["monte_carlo"] = mc[node.name]
+            if node.low is not None or node.high is not None:
+                for method in ("eva", "rss"):
+                    low_ok = node.low is None or entry[method]["min"] >= node.low
+                    high_ok = node.high is None or entry[method]["max"] <= node.high
+                    entry[method]["pass"] = bool(low_ok and high_ok)
+            report[node.name] = entry
+        return {
+            "temperature": list(self.temperature),
+            "samples": samples,
+            "variables": {
+                name: {"nominal": v.nominal, "part_number": v.part_number,
+                       "bounds": list(v.bounds(self.temperature))}
+                for name, v in self.variables.items()
+            },
+            "nodes": report,
+        }
+
+
+def analysis_from_spec(spec, parts=None, refs=None):
+    """Build an :class:`Analysis` from a JSON-style spec.
+
+    Args:
+        spec: dict with 'nodes', optional 'variables', 'temperature' and 'distribution'
+        parts: {part number (upper case): normalized part row} for binding
+        refs: {reference designator: part number} from the BOM
+
+    Raises:
+        ValueError: for malformed specs, invalid expressions or names that
+            cannot be bound
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("The analysis spec must be an object")
+    for key in ("nodes", "variables"):
+        if not isinstance(spec.get(key, {}), dict):
+            raise ValueError(f"'{key}' must be an object of name: definition")
+    nodes = [Node.from_spec(name, node) for name, node in spec.get("nodes", {}).items()]
+    if not nodes:
+        raise ValueError("The analysis defines no nodes")
+    variables = [Variable.from_spec(name, v) for name, v in spec.get("variables", {}).items()]
+    declared = {v.name for v in variables} | {n.name for n in nodes}
+    distribution = spec.get("distribution", "uniform")
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"distribution must be one of {', '.join(DISTRIBUTIONS)}")
+    refs = {ref.upper(): part for ref, part in (refs or {}).items()}
+    parts = parts or {}
+    for name in sorted(set().union(*(n.names for n in nodes)) - declared):
+        part_number = refs.get(name.upper())
+        if part_number is None:
+            raise ValueError(f"'{name}' is neither a declared variable nor a BOM reference designator")
+        params = parts.get(part_number.upper())
+        if params is None:
+            raise ValueError(f"No Digi-Key parameters for {name} ({part_number})")
+        variables.append(Variable.from_part(name, params, distribution))
+    return Analysis(variables, nodes, spec.get("temperature", (T_REF, T_REF)))
+
+
+def bom_refs(bom_path):
+    """{reference designator: part number} of a BOM CSV."""
+    from bom_reader import read_bom
+
+    return {ref: line.part_number for line in read_bom(bom_path) for ref in line.ref_designators}
+
+
+def parts_by_number(records):
+    """{part number (upper case): normalized row} of Digi-Key records."""
+    from part_params import normalize_record
+
+    return {str(r.get("Part Number", "")).upper(): normalize_record(r) for r in records}
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a worst-case circuit analysis")
+    parser.add_argument("spec", help="analysis JSON (variables, nodes, temperature)")
+    parser.add_argument("--parts", default="parts.json", help="Digi-Key records (parts.json)")
+    parser.add_argument("--bom", help="BOM CSV mapping reference designators to part numbers")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    with open(args.spec, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    records = []
+    if args.parts:
+        with open(args.parts, "r", encoding="utf-8") as f:
+            records = json.load(f)
+    analysis = analysis_from_spec(spec, parts_by_number(records), bom_refs(args.bom) if args.bom else None)
+    json.dump(analysis.run(args.samples, args.seed), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
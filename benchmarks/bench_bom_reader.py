@@ -0,0 +1,112 @@
+"""
+Benchmark: streaming BOM reader line rate, and parse/search overlap.
+
+    python benchmarks/bench_bom_reader.py --lines 100000 --search-parts 2000
+
+The first table is parse-only throughput of ``bom_reader.read_bom`` on a
+synthetic BOM with a Manf1..Manf3 header, quoted multi-designator cells and
+designator ranges. The second compares "parse the whole file, then search"
+with ``search_bom_async``, which starts Digi-Key lookups per chunk while
+parsing continues, against the local fake API.
+"""
+import argparse
+import csv
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "WCCA_WEB"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bom_reader import bom_part_numbers, read_bom, search_bom_async
+from digikey import _run_sync, digikey_search_async
+from fake_digikey_server import start_fake_server_process
+
+
+def write_bom(path, lines, unique_parts, seed=1):
+    """Write a BOM with ``lines`` rows; new part numbers keep appearing throughout the file."""
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["S.NO", "Manf1", "Manf1_partno", "Manf2", "Manf2_partno", "Manf3", "Manf3_partno", "RefDes"])
+        for i in range(lines):
+            n = i * unique_parts // lines
+            refs = rng.choice([f"R{i}", f"C{i},C{i + 1}", f"R{i}-R{i + 3}", f"U{i}"])
+            writer.writerow([i + 1, "Panasonic", f"ERJ-2RKF{n:05d}X", "Yageo", f"RC0402FR-07{n:05d}L",
+                             "", "", refs])
+
+
+def bench_parse(path, lines):
+    start = time.perf_counter()
+    count = sum(1 for _ in read_bom(path))
+    elapsed = time.perf_counter() - start
+    assert count == lines
+    return elapsed
+
+
+def parse_then_search(path, base_url, concurrency, batch_size):
+    parts, _ = bom_part_numbers(path)
+    results = _run_sync(digikey_search_async(
+        parts, concurrency=concurrency, rate_limit=0, base_url=base_url, batch_size=batch_size
+    ))
+    assert not results.errors
+    return len(results)
+
+
+def streamed_search(path, base_url, concurrency, batch_size, chunk_size):
+    _, results = _run_sync(search_bom_async(
+        path, chunk_size=chunk_size, concurrency=concurrency, rate_limit=0, base_url=base_url,
+        batch_size=batch_size
+    ))
+    assert not results.errors
+    return len(results)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    value = fn(*args)
+    return time.perf_counter() - start, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--search-parts", type=int, default=2000, help="unique parts in the search BOM")
+    parser.add_argument("--search-lines", type=int, default=50000, help="rows in the search BOM")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake API latency per request (s)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[50, 0],
+                        help="Digi-Key batch sizes to compare (0 = one keyword search per part)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'lines':>8} {'parse (s)':>10} {'lines/s':>10}")
+        for lines in args.lines:
+            path = Path(tmp) / f"bom_{lines}.csv"
+            write_bom(path, lines, unique_parts=lines)
+            elapsed = bench_parse(path, lines)
+            print(f"{lines:>8} {elapsed:>10.3f} {lines / elapsed:>10.0f}")
+
+        path = Path(tmp) / "bom_search.csv"
+        write_bom(path, args.search_lines, unique_parts=args.search_parts)
+        server, base_url = start_fake_server_process(latency=args.latency)
+        try:
+            print()
+            print(f"search: {args.search_lines} lines, {args.search_parts} unique parts, "
+                  f"latency={args.latency}s, concurrency={args.concurrency}, chunk={args.chunk_size}")
+            print(f"{'batch size':>10} {'parse then search (s)':>22} {'streamed (s)':>13} {'speedup':>8}")
+            for batch_size in args.batch_sizes:
+                sequential, n1 = timed(parse_then_search, path, base_url, args.concurrency, batch_size)
+                streamed, n2 = timed(streamed_search, path, base_url, args.concurrency, batch_size,
+                                     args.chunk_size)
+                assert n1 == n2
+                print(f"{batch_size:>10} {sequential:>22.2f} {streamed:>13.2f} {sequential / streamed:>7.2f}x")
+        finally:
+            server.terminate()
+
+
+if __name__ == "__main__":
+    main()
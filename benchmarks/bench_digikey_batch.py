@@ -0,0 +1,77 @@
+"""
+Benchmark: requests per BOM for keyword-per-part vs batched lookups.
+
+    python benchmarks/bench_digikey_batch.py --sizes 10 100 1000 --fuzzy 0.05 --miss 0.02
+
+Each synthetic BOM mixes exact part numbers with a share of "fuzzy" parts
+(found only by keyword search) and misses, so the batched mode's fallback
+traffic is included in its request count.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "Library"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from digikey import digikey_search_async, _run_sync
+from fake_digikey_server import start_fake_server_process
+
+
+async def fetch_counts(base_url):
+    async with aiohttp.ClientSession() as session:
+        async with session.get(base_url + "/_counts") as response:
+            return await response.json()
+
+
+def synthetic_bom(n, fuzzy, miss):
+    n_fuzzy, n_miss = int(n * fuzzy), int(n * miss)
+    parts = [f"FUZZY-{i:05d}" for i in range(n_fuzzy)]
+    parts += [f"MISS-{i:05d}" for i in range(n_miss)]
+    parts += [f"ERJ-2RKF{i:05d}X" for i in range(n - n_fuzzy - n_miss)]
+    return parts
+
+
+def measure(parts, base_url, batch_size, concurrency):
+    """Run one search and return (seconds, product requests sent)."""
+    before = _run_sync(fetch_counts(base_url))
+    start = time.perf_counter()
+    results = _run_sync(
+        digikey_search_async(parts, concurrency=concurrency, base_url=base_url, batch_size=batch_size)
+    )
+    elapsed = time.perf_counter() - start
+    after = _run_sync(fetch_counts(base_url))
+    requests = sum(after.values()) - sum(before.values())
+    requests -= after.get("/v1/oauth2/token", 0) - before.get("/v1/oauth2/token", 0)
+    assert len(results) == len(parts) and not results.errors
+    return elapsed, requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake API latency per request (s)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--fuzzy", type=float, default=0.05, help="share of parts needing keyword fallback")
+    parser.add_argument("--miss", type=float, default=0.02, help="share of parts with no product")
+    args = parser.parse_args()
+
+    server, base_url = start_fake_server_process(latency=args.latency)
+    print(f"latency={args.latency}s  concurrency={args.concurrency}  batch size={args.batch_size}")
+    print(f"{'parts':>6} {'keyword reqs':>13} {'batched reqs':>13} {'keyword (s)':>12} {'batched (s)':>12}")
+    try:
+        for n in args.sizes:
+            parts = synthetic_bom(n, args.fuzzy, args.miss)
+            kw_time, kw_reqs = measure(parts, base_url, 0, args.concurrency)
+            b_time, b_reqs = measure(parts, base_url, args.batch_size, args.concurrency)
+            print(f"{n:>6} {kw_reqs:>13} {b_reqs:>13} {kw_time:>12.2f} {b_time:>12.2f}")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark: sequential vs concurrent Digi-Key search against the local fake API.
+
+    python benchmarks/bench_digikey_search.py --latency 0.05 --sizes 10 100 1000
+
+"concurrency=1" reproduces the old one-request-at-a-time loop. The last
+column re-runs the same BOM through a warm part cache.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "Library"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from digikey import digikey_search_async, get_token_manager, _run_sync
+from part_cache import PartCache
+from fake_digikey_server import start_fake_server_process
+
+
+async def fetch_counts(base_url):
+    async with aiohttp.ClientSession() as session:
+        async with session.get(base_url + "/_counts") as response:
+            return await response.json()
+
+
+def run_once(parts, base_url, concurrency, cache=None):
+    start = time.perf_counter()
+    results = _run_sync(
+        digikey_search_async(
+            parts, concurrency=concurrency, rate_limit=0, base_url=base_url, cache=cache, batch_size=0
+        )
+    )
+    elapsed = time.perf_counter() - start
+    assert len(results) == len(parts) and not results.errors
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake API latency per request (s)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    server, base_url = start_fake_server_process(latency=args.latency)
+    print(f"latency={args.latency}s  concurrency={args.concurrency}")
+    print(f"{'parts':>6} {'sequential (s)':>15} {'concurrent (s)':>15} {'speedup':>8} {'cached re-run (s)':>18}")
+    try:
+        for n in args.sizes:
+            parts = [f"ERJ-2RKF{i:04d}X" for i in range(n)]
+            seq = run_once(parts, base_url, concurrency=1)
+            with tempfile.TemporaryDirectory() as tmp:
+                cache = PartCache(Path(tmp) / "cache.sqlite3")
+                conc = run_once(parts, base_url, concurrency=args.concurrency, cache=cache)
+                cached = run_once(parts, base_url, concurrency=args.concurrency, cache=cache)
+                cache.close()
+            print(f"{n:>6} {seq:>15.2f} {conc:>15.2f} {seq / conc:>7.1f}x {cached:>18.3f}")
+        print("token manager:", get_token_manager(base_url).stats())
+        print("requests:", _run_sync(fetch_counts(base_url)))
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
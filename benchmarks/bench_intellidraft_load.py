@@ -0,0 +1,135 @@
+"""
+Load test: IntelliDraft API latency as concurrent clients increase.
+
+    python benchmarks/bench_intellidraft_load.py --concurrency 1 8 32 128
+
+Starts stub OpenRouter and Digi-Key servers, runs the IntelliDraft backend
+under uvicorn pointed at them, then drives /api/classify-component and
+/api/fetch-parameters with N concurrent clients. Every request uses a
+fresh part number, so neither the part cache nor request coalescing hides
+upstream latency. The part numbers start with a single letter that no
+built-in prefix rule matches and that is too short for a learned rule, and
+classify and fetch never share one, so no cached Digi-Key category exists
+either: every classification goes through the tiers to the stub LLM, whose
+request and token budget is lifted so it measures the stub alone. With
+non-blocking upstream calls p99 stays close to the stub latency as
+concurrency grows; a blocking client would serialize the event loop and p99
+would grow linearly with N.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import fake_digikey_server
+import fake_openrouter_server
+
+BACKEND_DIR = Path(__file__).parent.parent / "intellidraft" / "backend"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_backend(openrouter_url, digikey_url, cache_path):
+    port = free_port()
+    env = dict(
+        os.environ,
+        OPENROUTER_API_URL=openrouter_url,
+        OPENROUTER_API_KEY="fake-key",
+        DIGIKEY_API_BASE=digikey_url,
+        DIGIKEY_CACHE_PATH=str(cache_path),
+        CLASSIFIER_CACHE_PATH=str(cache_path.with_name("classifier_cache.sqlite3")),
+        LLM_REQUESTS_PER_MINUTE="1000000",
+        LLM_TOKENS_PER_MINUTE="1000000000",
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return process, base_url
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("IntelliDraft backend did not start")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run_level(base_url, concurrency, requests_per_client, run_id):
+    """Return (classify latencies, fetch latencies, failures) for one level."""
+    latencies = {"classify": [], "fetch": []}
+    failures = 0
+
+    async def client(session, n):
+        nonlocal failures
+        for i in range(requests_per_client):
+            part = f"Q{run_id}{n:03d}{i:03d}"
+            for name, path, body in (
+                ("classify", "/api/classify-component", {"part_number": part + "C"}),
+                ("fetch", "/api/fetch-parameters", {"part_number": part + "F", "component_type": "resistor"}),
+            ):
+                start = time.perf_counter()
+                async with session.post(base_url + path, json=body) as response:
+                    await response.read()
+                    if response.status != 200:
+                        failures += 1
+                latencies[name].append(time.perf_counter() - start)
+
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(client(session, n) for n in range(concurrency)))
+    return latencies["classify"], latencies["fetch"], failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=5, help="requests per client per endpoint")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="stub OpenRouter latency (s)")
+    parser.add_argument("--digikey-latency", type=float, default=0.05, help="stub Digi-Key latency (s)")
+    args = parser.parse_args()
+
+    openrouter, openrouter_url = fake_openrouter_server.start_fake_server_process(args.llm_latency)
+    digikey, digikey_url = fake_digikey_server.start_fake_server_process(args.digikey_latency)
+    with tempfile.TemporaryDirectory() as tmp:
+        backend, base_url = start_backend(openrouter_url, digikey_url, Path(tmp) / "part_cache.sqlite3")
+        try:
+            print(f"stub latency: OpenRouter {args.llm_latency}s, Digi-Key {args.digikey_latency}s")
+            print(f"{'clients':>8} {'classify p50':>13} {'classify p99':>13} {'fetch p50':>10} {'fetch p99':>10} {'req/s':>7} {'fail':>5}")
+            for run_id, concurrency in enumerate(args.concurrency):
+                start = time.perf_counter()
+                classify, fetch, failures = asyncio.run(run_level(base_url, concurrency, args.requests, run_id))
+                rate = (len(classify) + len(fetch)) / (time.perf_counter() - start)
+                print(
+                    f"{concurrency:>8} {percentile(classify, 50) * 1000:>11.0f}ms {percentile(classify, 99) * 1000:>11.0f}ms"
+                    f" {percentile(fetch, 50) * 1000:>8.0f}ms {percentile(fetch, 99) * 1000:>8.0f}ms {rate:>7.0f} {failures:>5}"
+                )
+        finally:
+            backend.terminate()
+            backend.wait()
+            openrouter.terminate()
+            digikey.terminate()
+
+
+if __name__ == "__main__":
+    main()
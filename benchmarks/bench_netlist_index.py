@@ -0,0 +1,90 @@
+"""
+Benchmark: netlist index build time, peak memory and cached reload.
+
+    python benchmarks/bench_netlist_index.py --pins 10000 100000 500000
+
+Writes a synthetic KiCad netlist (two-pin passives and 48-pin ICs, nets of
+2-8 pins) per size. "tree" is ElementTree.parse of the whole document, for
+scale; "index" is NetlistIndex.parse (iterparse, elements dropped as they
+are read); "cached" is NetlistIndex.load from the .npz cache, including the
+file hash. Peak memory is tracemalloc's, so it covers Python objects and
+NumPy arrays but not the interpreter.
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "WCCA_WEB"))
+
+from netlist_index import NetlistIndex
+
+
+def write_netlist(path, pins, seed=1):
+    rng = random.Random(seed)
+    comps = []
+    slots = []
+    while len(slots) < pins:
+        if len(comps) % 20 == 0:
+            ref, count = f"U{len(comps)}", 48
+        else:
+            ref, count = f"R{len(comps)}", 2
+        comps.append(ref)
+        slots.extend((ref, str(p)) for p in range(1, count + 1))
+    rng.shuffle(slots)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<export version="E">\n  <components>\n')
+        for ref in comps:
+            f.write(f'    <comp ref="{ref}">\n      <value>10k</value>\n'
+                    f'      <footprint>Resistor_SMD:R_0603</footprint>\n'
+                    f'      <fields><field name="MPN">RC0603FR-07{ref}L</field></fields>\n    </comp>\n')
+        f.write("  </components>\n  <nets>\n")
+        i = code = 0
+        while i < len(slots):
+            code += 1
+            size = rng.randint(2, 8)
+            f.write(f'    <net code="{code}" name="/N{code}">\n')
+            for ref, pin in slots[i:i + size]:
+                f.write(f'      <node ref="{ref}" pin="{pin}"/>\n')
+            f.write("    </net>\n")
+            i += size
+        f.write("  </nets>\n</export>\n")
+    return len(slots)
+
+
+def measure(fn, *args, **kwargs):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pins", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    args = parser.parse_args()
+
+    print(f"{'pins':>8} {'file MB':>8} {'tree (s)':>9} {'tree MB':>8} {'index (s)':>10} {'index MB':>9} {'cached (s)':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.pins:
+            path = Path(tmp) / f"netlist_{n}.xml"
+            n = write_netlist(path, n)
+            tree_time, tree_peak, _ = measure(ET.parse, path)
+            index_time, index_peak, index = measure(NetlistIndex.parse, path)
+            assert len(index.pin_comp) == n
+            NetlistIndex.load(path, cache_dir=tmp)
+            cached_time, _, cached = measure(NetlistIndex.load, path, cache_dir=tmp)
+            assert cached.cached and cached.stats()["pins"] == n
+            size = path.stat().st_size / 1e6
+            print(f"{n:>8} {size:>8.1f} {tree_time:>9.2f} {tree_peak:>8.1f} {index_time:>10.2f} {index_peak:>9.1f} {cached_time:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
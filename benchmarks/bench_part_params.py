@@ -0,0 +1,88 @@
+"""
+Benchmark: per-dict string matching vs the columnar ParamTable.
+
+    python benchmarks/bench_part_params.py --parts 1000 10000 100000
+
+Query: capacitors rated >= 16 V with an X7R dielectric, sorted by capacitance.
+"loop" parses the display strings of every record on every query, as the
+consumers of parts.json did; "table" builds the NumPy table once (reported
+separately) and answers the query with array operations.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "WCCA_WEB"))
+
+from part_params import ParamTable, parse_quantity
+
+CAPS = ["0.1 µF", "1 µF", "10 µF", "4.7 µF", "22 pF", "100 nF"]
+VOLTS = ["6.3V", "10V", "16V", "25V", "50V", "100V"]
+DIELECTRICS = ["X7R", "X5R", "C0G, NP0", "X7S", "Y5V"]
+
+
+def make_records(n, seed=1):
+    rng = random.Random(seed)
+    records = []
+    for i in range(n):
+        if i % 2:
+            records.append({
+                "Part Number": f"GRM{i:07d}", "Mfr": "Murata Electronics", "Capacitance": rng.choice(CAPS),
+                "Tolerance": "±10%", "Voltage - Rated": rng.choice(VOLTS),
+                "Temperature Coefficient": rng.choice(DIELECTRICS), "Operating Temperature": "-55°C ~ 125°C",
+            })
+        else:
+            records.append({
+                "Part Number": f"ERJ{i:07d}", "Mfr": "Panasonic", "Resistance": f"{rng.randint(1, 999)} kOhms",
+                "Tolerance": "±1%", "Power (Watts)": "0.1W, 1/10W", "Temperature Coefficient": "±100ppm/°C",
+                "Operating Temperature": "-55°C ~ 155°C",
+            })
+    return records
+
+
+def query_loop(records):
+    hits = []
+    for r in records:
+        if "Capacitance" not in r or "X7R" not in r.get("Temperature Coefficient", ""):
+            continue
+        volts = parse_quantity(r.get("Voltage - Rated"))
+        if volts is not None and volts >= 16:
+            hits.append((parse_quantity(r["Capacitance"]), r["Part Number"]))
+    hits.sort()
+    return [p for _, p in hits]
+
+
+def query_table(caps):
+    return caps.filter(voltage_rated=(16, None), dielectric="X7R").sort("capacitance")["part_number"]
+
+
+def best_of(fn, *args, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parts", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'parts':>7} {'build table (s)':>16} {'loop query (ms)':>16} {'table query (ms)':>17} {'speedup':>8}")
+    for n in args.parts:
+        records = make_records(n)
+        start = time.perf_counter()
+        caps = ParamTable.from_records(records).split_by_category()["capacitors"]
+        build = time.perf_counter() - start
+        loop, expected = best_of(query_loop, records)
+        table, got = best_of(query_table, caps)
+        assert sorted(expected) == sorted(got.tolist())
+        print(f"{n:>7} {build:>16.3f} {loop * 1000:>16.2f} {table * 1000:>17.2f} {loop / table:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
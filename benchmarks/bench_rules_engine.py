@@ -0,0 +1,77 @@
+"""
+Benchmark: constraint checks over large synthetic BOMs, full and incremental.
+
+    python benchmarks/bench_rules_engine.py --lines 1000 10000 100000 --workers 1 4
+
+Each BOM line has two reference designators and cycles through the parts of
+parts.json; every seventh line lists an approved alternate. The rules are
+derating, operating temperature, allowed manufacturers and approved
+alternates. "full" builds the rows and evaluates the plan (in a process pool
+when workers > 1 and the BOM is large enough); "line" replaces one BOM line
+and "part" changes the parameters of one part number (touching 1/N of the
+lines), both re-checking only the affected rows.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "WCCA_WEB"))
+
+from bom_reader import BomLine
+from rules_engine import RuleChecker, compile_rules
+from wcca_engine import parts_by_number
+
+PARTS_JSON = Path(__file__).parent.parent / "WCCA_WEB" / "parts.json"
+RULES = """
+derating: {capacitors: {voltage: 0.5}, resistors: {power: 0.5}}
+operating_temperature: [-40, 125]
+allowed_manufacturers: [KOA Speer, Samsung, Murata, Yageo, Texas Instruments]
+approved_alternates: [[UCC3946D, UCC2946DTR]]
+"""
+
+
+def make_lines(n, part_numbers):
+    return [
+        BomLine(i, part_numbers[i % len(part_numbers)], None,
+                ["UCC2946DTR"] if i % 7 == 0 else [], [f"X{i}", f"Y{i}"])
+        for i in range(1, n + 1)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    with open(PARTS_JSON, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    parts = parts_by_number(records)
+    part_numbers = sorted(parts)
+    plan = compile_rules(RULES)
+    changed = dict(next(r for r in records if r.get("Part Number", "").upper() == part_numbers[0]))
+    changed["Operating Temperature"] = "-20°C ~ 100°C"
+
+    print(f"CPUs: {os.cpu_count()}, {len(part_numbers)} distinct parts")
+    print(f"{'lines':>7} {'workers':>8} {'full (s)':>9} {'violations':>11} {'line (ms)':>10} {'part (ms)':>10} {'rows':>7}")
+    for n in args.lines:
+        lines = make_lines(n, part_numbers)
+        for workers in sorted(set(args.workers)):
+            start = time.perf_counter()
+            checker = RuleChecker(plan, lines, parts, workers=workers)
+            full = time.perf_counter() - start
+            violations = len(checker.report()["violations"])
+            start = time.perf_counter()
+            checker.update_line(BomLine(5, "UCC3946D", "Texas Instruments", ["FOO"], ["X5", "Y5"]))
+            line = time.perf_counter() - start
+            start = time.perf_counter()
+            rows = checker.update_part(changed)
+            part = time.perf_counter() - start
+            print(f"{n:>7} {workers:>8} {full:>9.3f} {violations:>11} {line * 1000:>10.2f} {part * 1000:>10.1f} {rows:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark: exporting extracted SINON events to Excel, time and peak RSS.
+
+    python benchmarks/bench_sinon_export.py --events 1000000 --batches 10
+
+The events (disconnects, client shutdowns and errors in equal parts) are
+exported in --batches equal batches, as repeated extractor runs would:
+
+* "load+append": the original append_events_to_excel, which loads the whole
+  workbook with openpyxl.load_workbook, calls ws.append per row and saves
+  it again for every batch;
+* "sidecar": hisib_export.append_events for every batch (CSV files next to
+  the workbook) and one merge_workbook (write-only workbook) at the end;
+* "sidecar+merge": hisib_export.export_events, rebuilding the workbook after
+  every batch.
+
+Each variant runs in its own process so its peak RSS can be reported.
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import openpyxl
+
+SIEMENS = Path(__file__).parent.parent / "Siemens"
+sys.path.insert(0, str(SIEMENS))
+
+from hisib_export import append_events, export_events, merge_workbook
+from hisib_parser import DISCONNECTS, ERROR_TABLE, ERRORS, SHUTDOWNS
+
+VARIANTS = ("load+append", "sidecar", "sidecar+merge")
+
+
+def load_append(output, excel_path):
+    """The export as it was before hisib_export."""
+    if os.path.exists(excel_path):
+        wb = openpyxl.load_workbook(excel_path)
+    else:
+        wb = openpyxl.Workbook()
+        wb.remove(wb.active)
+    headers = {DISCONNECTS: ["Date", "Time", "Last sample", "First sample"],
+               SHUTDOWNS: ["Date", "Time"], ERRORS: ["Error code", "Error Description"]}
+    for sheet, rows in output.items():
+        if sheet in wb.sheetnames:
+            ws = wb[sheet]
+        else:
+            ws = wb.create_sheet(sheet)
+            ws.append(headers[sheet])
+        for d in rows:
+            if sheet == DISCONNECTS:
+                ws.append([d.get("Date", ""), d.get("Time", ""),
+                           d.get("Last Sample No. before disconnect", ""),
+                           d.get("First Sample No. after reconnect", "")])
+            elif sheet == SHUTDOWNS:
+                date = d.get("Date", "")
+                if date and len(date) == 6 and date.isdigit():
+                    date = datetime.strptime(date, "%y%m%d").strftime("%d-%b-%y")
+                ws.append([date, d.get("Time", "")])
+            else:
+                ws.append([d.get("Error code", ""), d.get("Error name", "")])
+    wb.save(excel_path)
+
+
+def make_batch(start, count):
+    codes = list(ERROR_TABLE)
+    output = {DISCONNECTS: [], SHUTDOWNS: [], ERRORS: []}
+    for i in range(start, start + count):
+        clock = f"{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}"
+        if i % 3 == 0:
+            output[DISCONNECTS].append({"Date": "03-Feb-25", "Time": clock,
+                                        "Last Sample No. before disconnect": str(1000000 + i),
+                                        "First Sample No. after reconnect": str(i % 30000)})
+        elif i % 3 == 1:
+            output[SHUTDOWNS].append({"Date": "250203", "Time": clock})
+        else:
+            code = codes[i % len(codes)]
+            output[ERRORS].append({"Error code": code, "Error name": ERROR_TABLE[code]})
+    return output
+
+
+def run_variant(variant, events, batches, excel_path):
+    size = events // batches
+    for b in range(batches):
+        output = make_batch(b * size, size)
+        if variant == "load+append":
+            load_append(output, excel_path)
+        elif variant == "sidecar":
+            append_events(output, excel_path)
+        else:
+            export_events(output, excel_path)
+    if variant == "sidecar":
+        merge_workbook(excel_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--batches", type=int, default=10)
+    parser.add_argument("--variants", nargs="+", choices=VARIANTS, default=list(VARIANTS))
+    parser.add_argument("--run", choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument("--excel", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        # Child process: one variant, then report time and own peak RSS
+        start = time.perf_counter()
+        run_variant(args.run, args.events, args.batches, args.excel)
+        elapsed = time.perf_counter() - start
+        print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+        return
+
+    print(f"{args.events} events in {args.batches} batches")
+    print(f"{'variant':>14} {'time (s)':>9} {'peak RSS (MB)':>14} {'xlsx (MB)':>10}")
+    for variant in args.variants:
+        with tempfile.TemporaryDirectory() as tmp:
+            excel_path = os.path.join(tmp, "events.xlsx")
+            out = subprocess.run(
+                [sys.executable, __file__, "--run", variant, "--excel", excel_path,
+                 "--events", str(args.events), "--batches", str(args.batches)],
+                check=True, capture_output=True, text=True).stdout.split()
+            elapsed, rss_kb = float(out[0]), int(out[1])
+            size = os.path.getsize(excel_path) / 2**20
+            print(f"{variant:>14} {elapsed:>9.1f} {rss_kb / 1024:>14.0f} {size:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
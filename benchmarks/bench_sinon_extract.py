@@ -0,0 +1,145 @@
+"""
+Benchmark: SINON log event extraction throughput and peak memory.
+
+    python benchmarks/bench_sinon_extract.py --mb 10 100 500 --workers 2 4 8
+
+The synthetic logs are Siemens/SINON.log repeated until they reach the given
+size. "readlines" is the original extractor (whole file in memory, up to three
+regex searches per line); "streaming" is hisib_parser.parse_log (1 MB
+line-aligned byte blocks, one combined regex scan per block, a ring buffer for
+disconnect lookaheads that cross blocks). They must report the same
+disconnects and shutdowns; the original does not read SINON's
+``setHisibErrorStatus: 0x...`` lines, so its errors are not compared.
+"parallel xN" is parse_log(workers=N): the memory-mapped log split into
+line-aligned ranges parsed in a process pool (logs under PARALLEL_MIN_BYTES
+are parsed in-process). Peak memory is taken with tracemalloc in a second run,
+so it does not slow down the timed one; it is not reported for the pool, whose
+workers it cannot see.
+"""
+import argparse
+import functools
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+SIEMENS = Path(__file__).parent.parent / "Siemens"
+sys.path.insert(0, str(SIEMENS))
+
+from hisib_parser import ERROR_TABLE, parse_log
+
+SINON_LOG = SIEMENS / "SINON.log"
+
+
+def readlines_extract(log_path):
+    """The extraction loop as it was before hisib_parser, without the output."""
+    with open(log_path, 'r') as file:
+        lines = file.readlines()
+    hisi_disconnects, client_shutdowns, hisib_errors = [], [], []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if "Detected HISIB Disconnect" in line:
+            match = re.search(r"\[.\]\s*(\d{6}) (\d{2}:\d{2}:\d{2})", line)
+            date = match.group(1) if match else ""
+            time_ = match.group(2) if match else ""
+            if date and len(date) == 6 and date.isdigit():
+                date = time.strftime("%d-%b-%y", time.strptime(date, "%y%m%d"))
+            last_sample_no = first_sample_no = None
+            for l in lines[i+1:i+6]:
+                if "Last SampleNo before disconnect" in l:
+                    parts = l.split('=')
+                    if len(parts) > 1:
+                        last_sample_no = parts[1].strip()
+                if "First SampleNo after reconnect" in l:
+                    parts = l.split('=')
+                    if len(parts) > 1:
+                        first_sample_no = parts[1].strip()
+            hisi_disconnects.append({
+                "Date": date,
+                "Time": time_,
+                "Last Sample No. before disconnect": last_sample_no,
+                "First Sample No. after reconnect": first_sample_no
+            })
+            i += 5
+        elif "Command channel: Client shutdown" in line:
+            match = re.search(r'(\d{6}) (\d{2}:\d{2}:\d{2}) .*Client shutdown', line)
+            if match:
+                client_shutdowns.append({"Date": match.group(1), "Time": match.group(2)})
+            i += 1
+        else:
+            err_match = re.search(r'setHisibErrorStatus\s*=\s*0x[0-9A-Fa-f]{6}([0-9A-Fa-f]{2})', line)
+            if err_match:
+                err_code = err_match.group(1).upper()
+                hisib_errors.append({
+                    "Error code": err_code,
+                    "Error name": ERROR_TABLE.get(err_code, f'Unknown error code {err_code}')
+                })
+            i += 1
+    return {
+        "Hisi Disconnects": hisi_disconnects,
+        "Client Shutdowns": client_shutdowns,
+        "Hisib Errors": hisib_errors
+    }
+
+
+def write_log(path, size_mb):
+    """Repeat SINON.log until the file is at least size_mb; returns its size."""
+    block = SINON_LOG.read_bytes()
+    if not block.endswith(b"\n"):
+        block += b"\n"
+    with open(path, "wb") as f:
+        for _ in range(-(-size_mb * 1024 * 1024 // len(block))):
+            f.write(block)
+    return os.path.getsize(path)
+
+
+def measure(fn, path, traced=True):
+    """Result, wall time and peak traced memory (from a second, traced run)."""
+    start = time.perf_counter()
+    result = fn(path)
+    elapsed = time.perf_counter() - start
+    if not traced:
+        return result, elapsed, None
+    tracemalloc.start()
+    fn(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--workers", type=int, nargs="*", default=[os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    extractors = [("readlines", readlines_extract, True), ("streaming", parse_log, True)]
+    extractors += [(f"parallel x{n}", functools.partial(parse_log, workers=n), False)
+                   for n in sorted(set(args.workers)) if n > 1]
+    print(f"CPUs: {os.cpu_count()}")
+    print(f"{'size (MB)':>10} {'extractor':>12} {'time (s)':>9} {'MB/s':>8} {'peak (MB)':>10} {'events':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in args.mb:
+            path = os.path.join(tmp, f"sinon_{size_mb}.log")
+            size = write_log(path, size_mb)
+            results = {}
+            for name, fn, traced in extractors:
+                result, elapsed, peak = measure(fn, path, traced)
+                results[name] = result
+                events = sum(len(v) for v in result.values())
+                peak = f"{peak / 2**20:.1f}" if peak is not None else "-"
+                print(f"{size / 2**20:>10.0f} {name:>12} {elapsed:>9.2f} {size / 2**20 / elapsed:>8.1f} "
+                      f"{peak:>10} {events:>8}")
+            original = results.pop("readlines")
+            assert all(r == results["streaming"] for r in results.values()), "extractors disagree"
+            assert all(results["streaming"][key] == original[key] for key in ("Hisi Disconnects", "Client Shutdowns")), \
+                "extractors disagree with the original"
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: SINON event store ingest and query latency vs re-parsing logs.
+
+    python benchmarks/bench_sinon_store.py --events 10000 100000 --days 180
+
+The synthetic log spreads --events events (disconnect blocks, client
+shutdowns and error-status lines, as in Siemens/SINON.log) evenly over
+--days days, with --noise ordinary log lines after each. "parse" is
+hisib_parser.parse_log over the whole log, what answering any question took
+before the store; "ingest" is the one-off hisib_store.ingest of the same log.
+Each query is timed as the median of 20 runs on a newly opened connection:
+
+* counts: events per type and day over one month (from the hourly counts);
+* counts 1/2h: the same with the window shifted by half an hour, so it is
+  counted from the events themselves;
+* errors: error code histogram over the whole range;
+* gaps: gap summary (first - last sample number) over one month.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "Siemens"))
+
+import hisib_store
+from hisib_parser import parse_log
+
+START = datetime(2025, 1, 1)
+
+
+def write_log(path, events, days, noise):
+    step = timedelta(days=days) / events
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(events):
+            stamp = (START + step * i).strftime("%y%m%d %H:%M:%S")
+            if i % 5 == 0:
+                f.write(f"[D]{stamp} ClientInterface: Detected HISIB Disconnect \n\n"
+                        f"[D]{stamp} Last SampleNo before disconnect = {5_000_000 + i}\n\n"
+                        f"[D]{stamp} First SampleNo after reconnect = {i % 30000}\n\n")
+            elif i % 5 in (1, 2):
+                f.write(f"[I]{stamp} Command channel: Client shutdown\n\n")
+            else:
+                f.write(f"[D]{stamp} DataHandler::setHisibErrorStatus = 0x{0x40000000 + i % 31:08X}\n\n")
+            for _ in range(noise):
+                f.write(f"[D]{stamp} SpO2Handler::processFrame: frame ok, seq={i}\n\n")
+    return os.path.getsize(path)
+
+
+def median_ms(fn, repeat=20):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--noise", type=int, default=20)
+    args = parser.parse_args()
+
+    month = (START + timedelta(days=args.days // 2)).strftime("%Y-%m-%d"), \
+        (START + timedelta(days=args.days // 2 + 30)).strftime("%Y-%m-%d")
+    print(f"{'events':>8} {'log (MB)':>9} {'parse (s)':>10} {'ingest (s)':>11} "
+          f"{'counts (ms)':>12} {'counts 1/2h':>12} {'errors (ms)':>12} {'gaps (ms)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for events in args.events:
+            log_path = os.path.join(tmp, f"sinon_{events}.log")
+            db_path = os.path.join(tmp, f"events_{events}.sqlite")
+            size = write_log(log_path, events, args.days, args.noise)
+
+            start = time.perf_counter()
+            parse_log(log_path)
+            parse = time.perf_counter() - start
+
+            conn = hisib_store.connect(db_path)
+            start = time.perf_counter()
+            hisib_store.ingest(conn, log_path)
+            ingest = time.perf_counter() - start
+            conn.close()
+
+            conn = hisib_store.connect(db_path)
+            counts = median_ms(lambda: hisib_store.counts(conn, *month, by="day"))
+            shifted = median_ms(lambda: hisib_store.counts(conn, *(m + " 00:30" for m in month), by="day"))
+            errors = median_ms(lambda: hisib_store.error_histogram(conn))
+            gaps = median_ms(lambda: hisib_store.gap_summary(conn, *month))
+            conn.close()
+            print(f"{events:>8} {size / 2**20:>9.1f} {parse:>10.2f} {ingest:>11.2f} "
+                  f"{counts:>12.2f} {shifted:>12.2f} {errors:>12.2f} {gaps:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
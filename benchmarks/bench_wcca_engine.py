@@ -0,0 +1,77 @@
+"""
+Benchmark: WCCA engine wall time and peak memory against Monte Carlo sample count.
+
+    python benchmarks/bench_wcca_engine.py --samples 10000 100000 1000000 10000000
+
+The circuit is an LDO feedback divider plus an RC filter and a resistor
+ladder: 13 variables (so EVA uses sensitivity-directed corners) and 4 nodes.
+EVA and RSS are timed once; Monte Carlo is timed per sample count. Peak memory is NumPy's allocations as seen by
+tracemalloc, so it covers the sample arrays but not the interpreter.
+The last table repeats the largest run with different chunk sizes.
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "WCCA_WEB"))
+
+from wcca_engine import Analysis, Node, Variable
+
+
+def make_analysis():
+    variables = [
+        Variable("VREF", 1.233, 0.01, 0.01, tempco_ppm=50),
+        Variable("R1", 33e3, 0.01, 0.01, tempco_ppm=100),
+        Variable("R2", 10e3, 0.01, 0.01, tempco_ppm=100),
+        Variable("R3", 4.7e3, 0.05, 0.05, tempco_ppm=200, distribution="normal"),
+        Variable("C1", 1e-6, 0.1, 0.1, drift_minus=0.15, drift_plus=0.15),
+    ] + [Variable(f"RL{i}", 1e3, 0.01, 0.01, tempco_ppm=50) for i in range(8)]
+    nodes = [
+        Node("VOUT", "VREF * (1 + R1 / R2)", 5.0, 5.4),
+        Node("I_DIV", "VOUT / (R1 + R2)"),
+        Node("F_C", "1 / (2 * pi * par(R3, R2) * C1)"),
+        Node("R_LADDER", " + ".join(f"RL{i}" for i in range(8))),
+    ]
+    return Analysis(variables, nodes, temperature=(-40, 125))
+
+
+def measure(fn, *args, **kwargs):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[1 << 14, 1 << 18, 1 << 20])
+    args = parser.parse_args()
+
+    analysis = make_analysis()
+    eva_time, _ = measure(analysis.eva)
+    rss_time, _ = measure(analysis.rss)
+    method = analysis.eva()["VOUT"]["method"]
+    print(f"EVA ({len(analysis.variables)} variables, {method}): {eva_time * 1000:.1f} ms   RSS: {rss_time * 1000:.2f} ms")
+    print()
+    print(f"{'samples':>10} {'MC time (s)':>12} {'samples/s':>12} {'peak MB':>9}")
+    for n in args.samples:
+        elapsed, peak = measure(analysis.monte_carlo, n, seed=1)
+        print(f"{n:>10} {elapsed:>12.3f} {n / elapsed:>12.3g} {peak:>9.1f}")
+
+    n = max(args.samples)
+    print()
+    print(f"chunk size at {n} samples")
+    print(f"{'chunk':>10} {'MC time (s)':>12} {'peak MB':>9}")
+    for chunk in args.chunk_sizes + [n]:
+        elapsed, peak = measure(analysis.monte_carlo, n, seed=1, chunk_size=chunk)
+        print(f"{chunk:>10} {elapsed:>12.3f} {peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
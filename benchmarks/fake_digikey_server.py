@@ -0,0 +1,159 @@
+"""
+Local stand-in for the Digi-Key API used by the benchmarks.
+
+Serves the OAuth token endpoint, the v4 keyword search and the v3 Batch
+Product Details endpoint with a fixed artificial latency, so search
+strategies can be compared without touching the real API or its quota.
+Part numbers starting with ``MISS`` return no product; ``FUZZY`` parts are
+found by keyword search but are not exact batch matches. Product requests
+without the issued bearer token get a 401. Every request is counted per path in ``server.counts`` (``GET /_counts``).
+
+Run standalone with:  python fake_digikey_server.py --port 8765 --latency 0.05
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_product(part):
+    """Build a v4-shaped product record for a part number."""
+    return {
+        "ManufacturerProductNumber": part,
+        "Manufacturer": {"Id": 1, "Name": "Fake Components Inc."},
+        "ProductStatus": {"Id": 0, "Status": "Active"},
+        "Category": {
+            "CategoryId": 2,
+            "Name": "Resistors",
+            "ChildCategories": [{"CategoryId": 52, "Name": "Chip Resistor - Surface Mount", "ChildCategories": []}],
+        },
+        "Parameters": [
+            {"ParameterId": 2085, "ParameterText": "Resistance", "ValueText": "10 kOhms"},
+            {"ParameterId": 3, "ParameterText": "Tolerance", "ValueText": "±1%"},
+            {"ParameterId": 2, "ParameterText": "Power (Watts)", "ValueText": "0.1W, 1/10W"},
+            {"ParameterId": 17, "ParameterText": "Temperature Coefficient", "ValueText": "±100ppm/°C"},
+            {"ParameterId": 252, "ParameterText": "Operating Temperature", "ValueText": "-55°C ~ 155°C"},
+        ],
+    }
+
+
+def fake_batch_product(part):
+    """Build a Batch Product Details (v3) record for a part number."""
+    product = fake_product(part)
+    return {
+        "ManufacturerPartNumber": part,
+        "DigiKeyPartNumber": f"{part}-ND",
+        "Manufacturer": {"ParameterId": -1, "Value": product["Manufacturer"]["Name"]},
+        "ProductStatus": product["ProductStatus"]["Status"],
+        "Family": {"ParameterId": -1, "Value": "Chip Resistor - Surface Mount"},
+        "Parameters": [
+            {"ParameterId": p["ParameterId"], "Parameter": p["ParameterText"], "Value": p["ValueText"]}
+            for p in product["Parameters"]
+        ],
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/_counts":
+            with self.server.lock:
+                self._send_json(200, dict(self.server.counts))
+        else:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        server = self.server
+        with server.lock:
+            server.counts[self.path] += 1
+        time.sleep(server.latency)
+
+        if self.path == "/v1/oauth2/token":
+            self._send_json(200, {"access_token": "fake-token", "expires_in": server.token_ttl, "token_type": "Bearer"})
+        elif self.headers.get("Authorization") != "Bearer fake-token":
+            self._send_json(401, {"ErrorMessage": "Bearer token invalid"})
+        elif self.path == "/products/v4/search/keyword":
+            part = json.loads(raw or b"{}").get("keywords", "")
+            products = [] if part.upper().startswith("MISS") else [fake_product(part)]
+            self._send_json(200, {"Products": products, "ProductsCount": len(products)})
+        elif self.path == "/BatchSearch/v3/ProductDetails":
+            if not server.batch_enabled:
+                self._send_json(403, {"ErrorMessage": "Batch API not enabled for this application"})
+                return
+            parts = json.loads(raw or b"{}").get("Products", [])
+            found = [p for p in parts if not p.upper().startswith(("MISS", "FUZZY"))]
+            errors = [f"{p} not found" for p in parts if p not in found]
+            self._send_json(200, {"ProductDetails": [fake_batch_product(p) for p in found], "Errors": errors})
+        else:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+
+class _FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # listen() backlog; the default of 5 resets connections under bursts
+    request_queue_size = 1024
+
+
+def start_fake_server(latency=0.05, port=0, token_ttl=599, batch_enabled=True):
+    """Start the fake API in a daemon thread. Returns ``(server, base_url)``."""
+    server = _FakeServer(("127.0.0.1", port), _Handler)
+    server.latency = latency
+    server.token_ttl = token_ttl
+    server.batch_enabled = batch_enabled
+    server.counts = Counter()
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _serve(latency, token_ttl, batch_enabled, port_queue):
+    # Hand the GIL between handler threads quickly, otherwise 32 busy
+    # connections queue behind the default 5 ms switch interval.
+    sys.setswitchinterval(0.0002)
+    server, _ = start_fake_server(latency, token_ttl=token_ttl, batch_enabled=batch_enabled)
+    port_queue.put(server.server_address[1])
+    threading.Event().wait()
+
+
+def start_fake_server_process(latency=0.05, token_ttl=599, batch_enabled=True):
+    """Start the fake API in a child process so it does not share the client's GIL.
+
+    Returns ``(process, base_url)``; request counts are served at ``GET /_counts``.
+    """
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(latency, token_ttl, batch_enabled, port_queue), daemon=True)
+    process.start()
+    return process, f"http://127.0.0.1:{port_queue.get(timeout=10)}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Digi-Key API for local benchmarks")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    args = parser.parse_args()
+    server, url = start_fake_server(args.latency, args.port)
+    print(f"Fake Digi-Key API listening on {url} (latency {args.latency}s)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,114 @@
+"""
+Local stand-in for the OpenRouter chat completions API used by the benchmarks.
+
+Answers every ``POST`` with a chat completion after a fixed artificial
+latency. The reply is the component type guessed from the part number
+prefix (``other`` when nothing matches), or a JSON array of such answers
+for batch prompts, so classification requests get a plausible answer
+without an API key.
+
+Run standalone with:  python fake_openrouter_server.py --port 8766 --latency 0.2
+"""
+import argparse
+import json
+import multiprocessing
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+from fake_digikey_server import _FakeServer
+
+_GUESSES = [
+    (r"^(ERJ|RC|CRCW|RMCF)", "resistor"),
+    (r"^(GRM|CL\d|C\d{4})", "capacitor"),
+    (r"^(LQ|SRR|XAL)", "inductor"),
+    (r"^(1N|BAT|BZX|SS\d)", "diode"),
+    (r"^(2N|BC|MMBT)", "transistor"),
+    (r"^(LM|TPS|NE5|STM32|ATMEGA)", "ic"),
+]
+
+
+def guess_type(text):
+    match = re.search(r"Part Number:\s*(\S+)", text)
+    part = match.group(1).upper() if match else ""
+    for pattern, component_type in _GUESSES:
+        if re.match(pattern, part):
+            return component_type
+    return "other"
+
+
+def answer(prompt):
+    """Reply to a single-part prompt with a type, to a batch prompt with a JSON array."""
+    batch = re.search(r"Part numbers:\s*(\[.*\])", prompt, re.S)
+    if not batch:
+        return guess_type(prompt)
+    return json.dumps([
+        {"part_number": part, "component_type": guess_type(f"Part Number: {part}")}
+        for part in json.loads(batch.group(1))
+    ])
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        with self.server.lock:
+            self.server.count += 1
+        time.sleep(self.server.latency)
+        prompt = request.get("messages", [{}])[-1].get("content", "")
+        body = json.dumps({
+            "id": "fake-completion",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": answer(prompt)}}],
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_fake_server(latency=0.2, port=0):
+    """Start the fake API in a daemon thread. Returns ``(server, url)``."""
+    server = _FakeServer(("127.0.0.1", port), _Handler)
+    server.latency = latency
+    server.count = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/v1/chat/completions"
+
+
+def _serve(latency, port_queue):
+    sys.setswitchinterval(0.0002)
+    server, _ = start_fake_server(latency)
+    port_queue.put(server.server_address[1])
+    threading.Event().wait()
+
+
+def start_fake_server_process(latency=0.2):
+    """Start the fake API in a child process. Returns ``(process, url)``."""
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(latency, port_queue), daemon=True)
+    process.start()
+    return process, f"http://127.0.0.1:{port_queue.get(timeout=10)}/api/v1/chat/completions"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake OpenRouter API for local benchmarks")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds added to every response")
+    args = parser.parse_args()
+    server, url = start_fake_server(args.latency, args.port)
+    print(f"Fake OpenRouter API listening on {url} (latency {args.latency}s)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
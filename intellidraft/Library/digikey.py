@@ -1,98 +1,526 @@
-
 import os
-import shutil
-import csv
-import logging
-import tkinter as tk
-from tkinter import filedialog, messagebox
-import requests
-import pandas as pd
-from requests.auth import HTTPBasicAuth
+import time
 import json
+import asyncio
+import threading
+import concurrent.futures
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
+
+import aiohttp
+import requests
+from requests.auth import HTTPBasicAuth
+
+from part_cache import cache_key, get_part_cache
+
+
+# Digi-Key API configuration (environment overrides the built-in app credentials)
+CLIENT_ID = os.getenv("DIGIKEY_CLIENT_ID") or "0dhv3AZgnR9XJnjvVs8RMwI5c2aWbUNA"
+CLIENT_SECRET = os.getenv("DIGIKEY_CLIENT_SECRET") or "bKXnVOBACsXedDa5"
+API_BASE = os.getenv("DIGIKEY_API_BASE", "https://api.digikey.com")
+AUTH_PATH = "/v1/oauth2/token"
+KEYWORD_SEARCH_PATH = "/products/v4/search/keyword"
+# Batch Product Details: exact part numbers, up to 50 per request (needs the
+# Batch API enabled on the Digi-Key app; otherwise the search falls back to
+# keyword requests)
+BATCH_DETAILS_PATH = os.getenv("DIGIKEY_BATCH_PATH", "/BatchSearch/v3/ProductDetails")
+
+# Search engine tuning
+DEFAULT_CONCURRENCY = int(os.getenv("DIGIKEY_CONCURRENCY", "8"))
+# Requests per second across the whole search; 0 disables the limiter.
+# Digi-Key's default quota is 120 requests/minute, so set 2 for production keys.
+DEFAULT_RATE_LIMIT = float(os.getenv("DIGIKEY_RATE_LIMIT", "0"))
+DEFAULT_TIMEOUT = float(os.getenv("DIGIKEY_TIMEOUT", "15"))
+MAX_RETRIES = 2
+# Parts per batch request; 0 or 1 sends one keyword search per part
+DEFAULT_BATCH_SIZE = int(os.getenv("DIGIKEY_BATCH_SIZE", "50"))
+# Refresh the cached access token this many seconds before it expires
+TOKEN_REFRESH_MARGIN = 60
+
+
+@dataclass
+class PartResult:
+    """Outcome of one part lookup.
+
+    ``status`` is "found", "miss" or "error"; ``source`` is where the answer
+    came from ("cache", "batch" or "keyword"); ``latency`` is in seconds.
+    """
+    part_number: str
+    status: str
+    record: Optional[dict] = None
+    error: Optional[str] = None
+    source: str = ""
+    latency: float = 0.0
+
+
+class SearchResults(list):
+    """Per-part results of a search, in input order."""
+
+    @property
+    def records(self):
+        """Found records, in the format written to parts.json."""
+        return [r.record for r in self if r.status == "found"]
+
+    @property
+    def misses(self):
+        return [r.part_number for r in self if r.status == "miss"]
+
+    @property
+    def errors(self):
+        return [r for r in self if r.status == "error"]
+
+
+class RateLimiter:
+    """Token bucket shared by every request of one search."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def _category_name(product):
+    """Name of the most specific Digi-Key category of a product, if any."""
+    category = product.get("Category")
+    while category and category.get("ChildCategories"):
+        category = category["ChildCategories"][0]
+    return category.get("Name") if category else None
+
+
+def parse_product(part, product):
+    """Flatten a Digi-Key v4 product into the record stored in parts.json."""
+    specs = {"Part Number": cache_key(part)}
+    specs["Mfr"] = product["Manufacturer"]["Name"]
+    specs["Part Status"] = product["ProductStatus"]["Status"]
+    category = _category_name(product)
+    if category:
+        specs["Category"] = category
+    for e in product.get("Parameters", []):
+        specs[e["ParameterText"]] = e["ValueText"]
+    return specs
+
+
+def parse_batch_product(part, product):
+    """Flatten a Batch Product Details (v3) product into the same record shape."""
+    specs = {"Part Number": cache_key(part)}
+    specs["Mfr"] = product["Manufacturer"]["Value"]
+    specs["Part Status"] = product.get("ProductStatus", "")
+    family = (product.get("Family") or {}).get("Value")
+    if family:
+        specs["Category"] = family
+    for e in product.get("Parameters", []):
+        specs[e["Parameter"]] = e["Value"]
+    return specs
+
+
+def open_session(concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT):
+    """Create a pooled ``aiohttp.ClientSession`` sized for ``concurrency`` connections."""
+    return aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        connector=aiohttp.TCPConnector(limit=concurrency),
+    )
+
+
+class TokenManager:
+    """Process-wide cache for the client_credentials access token.
+
+    The token is reused until it expires. Once it is within
+    ``refresh_margin`` seconds of expiry the next caller still gets the
+    cached token while a background thread fetches a new one. When there is
+    no usable token, exactly one caller fetches and every concurrent caller
+    waits for that result instead of starting its own exchange.
+    """
+
+    def __init__(self, base_url=API_BASE, client_id=CLIENT_ID, client_secret=CLIENT_SECRET,
+                 refresh_margin=TOKEN_REFRESH_MARGIN, timeout=DEFAULT_TIMEOUT):
+        self.token_url = base_url + AUTH_PATH
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.refresh_margin = refresh_margin
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._token = None
+        self._expires_at = 0.0
+        self._fetching = False
+        self.counters = {"fetches": 0, "hits": 0, "background_refreshes": 0, "waits": 0, "errors": 0}
+
+    def _fetch(self):
+        """Run the token exchange. Returns (token, lifetime_seconds) or raises."""
+        response = requests.post(
+            self.token_url,
+            data={"grant_type": "client_credentials"},
+            auth=HTTPBasicAuth(self.client_id, self.client_secret),
+            timeout=self.timeout,
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"Token error: {response.text}")
+        payload = response.json()
+        print("Access token received.")
+        return payload["access_token"], float(payload.get("expires_in", 599))
+
+    def _store(self, token=None, lifetime=0.0):
+        with self._cond:
+            if token is not None:
+                self._token = token
+                self._expires_at = time.monotonic() + lifetime
+            self._fetching = False
+            self._cond.notify_all()
+
+    def _refresh(self, background=False):
+        with self._cond:
+            self.counters["fetches"] += 1
+            if background:
+                self.counters["background_refreshes"] += 1
+        try:
+            token, lifetime = self._fetch()
+        except Exception as e:
+            with self._cond:
+                self.counters["errors"] += 1
+            print("Error:", e)
+            self._store()
+            return None
+        self._store(token, lifetime)
+        return token
+
+    def _cached(self):
+        """Return the cached token if still valid, scheduling a refresh when near expiry.
+
+        Must be called with the lock held.
+        """
+        now = time.monotonic()
+        if self._token is None or now >= self._expires_at:
+            return None
+        self.counters["hits"] += 1
+        if now >= self._expires_at - self.refresh_margin and not self._fetching:
+            self._fetching = True
+            threading.Thread(target=self._refresh, kwargs={"background": True}, daemon=True).start()
+        return self._token
+
+    def get_token(self):
+        """Return a valid access token (or None if the exchange failed). Blocking."""
+        with self._cond:
+            token = self._cached()
+            if token is not None:
+                return token
+            if self._fetching:
+                self.counters["waits"] += 1
+                while self._fetching:
+                    self._cond.wait()
+                return self._cached()
+            self._fetching = True
+        return self._refresh()
+
+    async def get_token_async(self):
+        """Async variant: the cached path never leaves the event loop."""
+        with self._cond:
+            token = self._cached()
+        if token is not None:
+            return token
+        return await asyncio.to_thread(self.get_token)
 
+    def invalidate(self, token):
+        """Drop ``token`` (e.g. after a 401) so the next caller fetches a new one."""
+        with self._cond:
+            if self._token == token:
+                self._token = None
+                self._expires_at = 0.0
 
-def digikey_search(uniq, on_progress=None):
+    def stats(self):
+        with self._cond:
+            return dict(self.counters)
+
+
+_token_managers = {}
+_token_managers_lock = threading.Lock()
+
+
+def get_token_manager(base_url=API_BASE):
+    """Return the shared :class:`TokenManager` for a Digi-Key API base URL."""
+    with _token_managers_lock:
+        if base_url not in _token_managers:
+            _token_managers[base_url] = TokenManager(base_url)
+        return _token_managers[base_url]
+
+
+async def _post_json(session, url, limiter=None, token_manager=None, **kwargs):
+    """POST and return ``(status, body)``.
+
+    Throttled (429), 5xx and dropped-connection failures are retried with a
+    short backoff. ``body`` is the decoded JSON for a 200 and the raw text
+    otherwise. With a ``token_manager``, a 401 drops the cached token and the
+    request is repeated once with a fresh one (the shared ``headers`` dict is
+    updated so later requests use it too).
+    """
+    attempt = 0
+    reauthorized = False
+    while True:
+        if limiter is not None:
+            await limiter.acquire()
+        try:
+            async with session.post(url, **kwargs) as response:
+                if response.status == 200:
+                    return response.status, await response.json()
+                status, body = response.status, await response.text()
+                retry_after = response.headers.get("Retry-After", "")
+        except aiohttp.ClientConnectionError:
+            if attempt == MAX_RETRIES:
+                raise
+            attempt += 1
+            await asyncio.sleep(0.5 * 2 ** attempt)
+            continue
+        if status == 401 and token_manager is not None and not reauthorized:
+            reauthorized = True
+            headers = kwargs["headers"]
+            token_manager.invalidate(headers["Authorization"].removeprefix("Bearer "))
+            access_token = await token_manager.get_token_async()
+            if not access_token:
+                return status, body
+            headers["Authorization"] = f"Bearer {access_token}"
+            continue
+        if status != 429 and status < 500 or attempt == MAX_RETRIES:
+            return status, body
+        await asyncio.sleep(float(retry_after) if retry_after.isdigit() else 0.5 * 2 ** attempt)
+        attempt += 1
+
+
+async def _keyword_search(session, headers, part, base_url, limiter=None, token_manager=None):
+    """Look up one part. Returns (specs, error); specs is None for a miss."""
+    body = {"keywords": part, "recordCount": 1}
     try:
-            #Li = [p.strip() for p in lis1.split(',') if p.strip()]
-            Li= uniq
-            
-            fin_11 = []
-            total = len(Li) if hasattr(Li, "__len__") else 0
-            done = 0
-            #Step 1: Get access token
-            client_id = "0dhv3AZgnR9XJnjvVs8RMwI5c2aWbUNA"
-            client_secret = "bKXnVOBACsXedDa5"
-            auth_url = "https://api.digikey.com/v1/oauth2/token"
-            data = {
-                "grant_type": "client_credentials"
-            }
-
-            token_response = requests.post(auth_url, data=data, auth=HTTPBasicAuth(client_id, client_secret))
-
-            if token_response.status_code == 200:
-                access_token = token_response.json()["access_token"]
-                print("Access token received.")
+        status, result = await _post_json(
+            session, base_url + KEYWORD_SEARCH_PATH, limiter=limiter, token_manager=token_manager,
+            headers=headers, json=body,
+        )
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        return None, f"{type(e).__name__}: {e}"
+    if status != 200:
+        print("Search error:", result)
+        return None, f"HTTP {status}"
+    if result["Products"] == []:
+        return None, None
+    return parse_product(part, result["Products"][0]), None
+
+
+async def _batch_details(session, headers, parts, base_url, limiter=None, token_manager=None):
+    """Fetch exact part numbers in one request.
+
+    Returns ``(products, status)``: products keyed by upper-cased
+    manufacturer and Digi-Key part number, and the HTTP status (None when the
+    request itself failed).
+    """
+    try:
+        status, result = await _post_json(
+            session, base_url + BATCH_DETAILS_PATH, limiter=limiter, token_manager=token_manager,
+            headers=headers, json={"Products": parts},
+        )
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print("Batch error:", e)
+        return {}, None
+    if status != 200:
+        print("Batch error:", result)
+        return {}, status
+    products = {}
+    for product in result.get("ProductDetails") or []:
+        for number in (product.get("ManufacturerPartNumber"), product.get("DigiKeyPartNumber")):
+            if number:
+                products.setdefault(cache_key(number), product)
+    return products, status
+
+
+async def digikey_search_async(
+    parts,
+    on_progress=None,
+    concurrency=DEFAULT_CONCURRENCY,
+    rate_limit=DEFAULT_RATE_LIMIT,
+    timeout=DEFAULT_TIMEOUT,
+    session=None,
+    base_url=API_BASE,
+    cache=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+    on_result=None,
+):
+    """Search Digi-Key for every part number concurrently.
+
+    At most ``concurrency`` requests are in flight at once and, when
+    ``rate_limit`` is set, no more than that many are started per second.
+    ``on_progress(done, total)`` is called after every part, in completion
+    order. The access token comes from the process-wide
+    :class:`TokenManager`, so repeated searches skip the OAuth exchange.
+    Pass an existing ``aiohttp.ClientSession`` to reuse its connection pool;
+    otherwise one pooled session is opened for the duration of the search.
+
+    With a :class:`part_cache.PartCache`, cached records and remembered
+    misses are served locally and only the remaining parts go to Digi-Key;
+    their results are written back to the cache. Transient errors are not
+    cached. The cache is read and written in a worker thread, so a shared
+    SQLite cache does not stall the event loop.
+
+    With ``batch_size`` > 1 the remaining parts are first looked up in
+    groups through Batch Product Details. Only parts without an exact match
+    there go to keyword search. If the batch endpoint is unavailable to the
+    app (403/404), every part falls back to keyword search.
+
+    ``on_result(result)``, when given, receives each :class:`PartResult` as
+    soon as it is known.
+
+    Returns a :class:`SearchResults` list with one :class:`PartResult` per
+    input part, in input order.
+    """
+    part_list = list(parts)
+    total = len(part_list)
+    done = 0
+    results = SearchResults([None] * total)
+
+    def record(index, part, status, specs=None, error=None, source="", started=None):
+        nonlocal done
+        latency = time.perf_counter() - started if started is not None else 0.0
+        result = PartResult(part, status, specs, error, source, latency)
+        results[index] = result
+        done += 1
+        if on_result is not None:
+            on_result(result)
+        if on_progress is not None and total:
+            on_progress(done, total)
+
+    pending = list(enumerate(part_list))
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get_many, part_list)
+        pending = []
+        for index, part in enumerate(part_list):
+            key = cache_key(part)
+            if key not in cached:
+                pending.append((index, part))
+            elif cached[key] is None:
+                record(index, part, "miss", source="cache")
             else:
-                print("Token error:", token_response.text)
-                access_token = None
-            part_list = Li
-
-            if access_token:
-                headers = {
-                    "Authorization": f"Bearer {access_token}",
-                    "X-DIGIKEY-Client-Id": client_id,
-                    "Content-Type": "application/json",
-                    "Accept": "application/json"
-                }
-                product_url = "https://api.digikey.com/products/v4/search/keyword"
-                #part_number = "GCM1885C1H180JA16D"
-                miss = []
-
-                for part in range(len(part_list)):
-                    body = {
-                        "keywords": part_list[part],
-                        "recordCount": 1
-                    }
-
-                    response = requests.post(product_url, headers=headers, json=body)
-                    specs = {"Part Number": part_list[part].upper()}
-
-                    if response.status_code == 200:
-                        result = response.json()
-                        print("Search result:", result)
-                        if result['Products'] == []:
-                            miss.append(part)
-                            done += 1
-                            if on_progress is not None and total:
-                                on_progress(done, total)
-                        else:
-                            pr = result['Products'][0]["Parameters"]
-                            specs["Mfr"] = result['Products'][0]['Manufacturer']['Name']
-                            specs["Part Status"] = result['Products'][0]['ProductStatus']['Status']
-                            for e in pr:
-                                specs[e['ParameterText']] = e["ValueText"]
-                            fin_11.append(specs)
-                            done += 1
-                            if on_progress is not None and total:
-                                on_progress(done, total)
-                    else:
-                        print("Search error:", response.text)
-                        done += 1
-                        if on_progress is not None and total:
-                            on_progress(done, total)
-            p_1 = [pd.DataFrame(d.items(), columns=["Attribute", "Value"]) for d in fin_11]
-            
-            
-            # with open('parts1.json', 'w', encoding='utf-8') as json_file:
-            #     json.dump(fin_11, json_file, indent=2, ensure_ascii=False)
-            # print(fin_11)
-            # print("parts.json has been created successfully!")
-            out_path = Path(__file__).parent / "parts.json"
-            with out_path.open('w', encoding='utf-8') as json_file:
-                json.dump(fin_11, json_file, indent=2, ensure_ascii=False)
-
-            print(f"parts.json has been created successfully at: {out_path.resolve()}")
-    except Exception as e: #genai
+                record(index, part, "found", cached[key], source="cache")
+    if not pending:
+        # Nothing to ask Digi-Key (no parts, or all cached): skip the session and token
+        return results
+
+    own_session = session is None
+    if own_session:
+        session = open_session(concurrency, timeout)
+    try:
+        token_manager = get_token_manager(base_url)
+        access_token = await token_manager.get_token_async()
+        if not access_token:
+            for index, part in pending:
+                record(index, part, "error", error="No Digi-Key access token")
+            return results
+
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "X-DIGIKEY-Client-Id": CLIENT_ID,
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        }
+        semaphore = asyncio.Semaphore(concurrency)
+        limiter = RateLimiter(rate_limit) if rate_limit else None
+
+        batch_available = batch_size > 1
+
+        async def keyword_worker(index, part):
+            async with semaphore:
+                started = time.perf_counter()
+                specs, error = await _keyword_search(session, headers, part, base_url, limiter, token_manager)
+            status = "error" if error else ("found" if specs is not None else "miss")
+            record(index, part, status, specs, error, "keyword", started)
+
+        async def lookup_batch(chunk):
+            nonlocal batch_available
+            if not batch_available:
+                return {}, None
+            numbers = list(dict.fromkeys(part.strip() for _, part in chunk))
+            async with semaphore:
+                started = time.perf_counter()
+                products, status = await _batch_details(session, headers, numbers, base_url, limiter, token_manager)
+            if status in (403, 404):
+                batch_available = False
+            return products, started
+
+        async def resolve_batch(chunk, products, started):
+            fallback = []
+            for index, part in chunk:
+                product = products.get(cache_key(part))
+                if product is None:
+                    fallback.append((index, part))
+                else:
+                    record(index, part, "found", parse_batch_product(part, product), None, "batch", started)
+            await asyncio.gather(*(keyword_worker(i, p) for i, p in fallback))
+
+        async def batch_worker(chunk):
+            await resolve_batch(chunk, *await lookup_batch(chunk))
+
+        if batch_available:
+            chunks = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+            # The first batch doubles as a probe, so an app without batch
+            # access wastes one request rather than one per chunk.
+            first = await lookup_batch(chunks[0])
+            await asyncio.gather(resolve_batch(chunks[0], *first), *(batch_worker(c) for c in chunks[1:]))
+        else:
+            await asyncio.gather(*(keyword_worker(i, p) for i, p in pending))
+    finally:
+        if own_session:
+            await session.close()
+        if cache is not None:
+            await asyncio.to_thread(cache.put_many, [
+                (r.part_number, r.record) for r in results
+                if r is not None and r.source != "cache" and r.status != "error"
+            ])
+
+    return results
+
+
+def _run_sync(coro):
+    """Run a coroutine to completion, even when called from inside an event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+def write_parts_json(records, out_path):
+    """Persist found records in the parts.json format the tables read."""
+    out_path = Path(out_path)
+    with out_path.open('w', encoding='utf-8') as json_file:
+        json.dump(records, json_file, indent=2, ensure_ascii=False)
+    print(f"parts.json has been created successfully at: {out_path.resolve()}")
+
+
+def digikey_search(uniq, on_progress=None, use_cache=True, out_path=None, **options):
+    """Blocking entry point used by the Tk app, the Flask backend and IntelliDraft.
+
+    Runs :func:`digikey_search_async` (``options`` are passed through),
+    reading through the shared on-disk part cache unless ``use_cache`` is
+    False, and returns its :class:`SearchResults`. When ``out_path`` is
+    given the found records are also written there as parts.json.
+    """
+    try:
+        if use_cache:
+            options.setdefault("cache", get_part_cache())
+        results = _run_sync(digikey_search_async(uniq, on_progress=on_progress, **options))
+        if results.misses:
+            print("No Digi-Key match for:", ", ".join(results.misses))
+        if out_path is not None:
+            write_parts_json(results.records, out_path)
+        return results
+    except Exception as e:
         print("Error:", e)
-    return uniq
\ No newline at end of file
+        return SearchResults(PartResult(part, "error", error=str(e)) for part in uniq)
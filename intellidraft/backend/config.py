@@ -12,14 +12,37 @@ load_dotenv()
 class Settings:
     # OpenRouter API (replaces OpenAI)
     openrouter_api_key: str = os.getenv("OPENROUTER_API_KEY", "")
+    openrouter_api_url: str = os.getenv("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions")
     
     # Digi-Key (optional - can use hardcoded values in digikey.py for now)
     digikey_client_id: str = os.getenv("DIGIKEY_CLIENT_ID", "")
     digikey_client_secret: str = os.getenv("DIGIKEY_CLIENT_SECRET", "")
     
+    # Shared upstream HTTP client
+    http_timeout: float = float(os.getenv("HTTP_TIMEOUT", "30"))
+    http_max_connections: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    http_retries: int = int(os.getenv("HTTP_RETRIES", "3"))
+    http_backoff: float = float(os.getenv("HTTP_BACKOFF", "0.5"))
+    
+    # OpenRouter budget and batch classification
+    llm_requests_per_minute: float = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+    llm_tokens_per_minute: float = float(os.getenv("LLM_TOKENS_PER_MINUTE", "90000"))
+    llm_batch_size: int = int(os.getenv("LLM_BATCH_SIZE", "40"))
+    llm_batch_concurrency: int = int(os.getenv("LLM_BATCH_CONCURRENCY", "4"))
+    
+    # Batch pipeline (workers per stage, queue size between stages, concurrent jobs)
+    batch_classify_workers: int = int(os.getenv("BATCH_CLASSIFY_WORKERS", "2"))
+    batch_fetch_workers: int = int(os.getenv("BATCH_FETCH_WORKERS", "8"))
+    batch_generate_workers: int = int(os.getenv("BATCH_GENERATE_WORKERS", "2"))
+    batch_queue_size: int = int(os.getenv("BATCH_QUEUE_SIZE", "100"))
+    batch_max_jobs: int = int(os.getenv("BATCH_MAX_JOBS", "2"))
+    batch_max_parts: int = int(os.getenv("BATCH_MAX_PARTS", "5000"))
+    
     # Paths
     library_path: Path = Path(__file__).parent.parent / "Library"
     upload_dir: Path = Path(__file__).parent / "uploads"
     output_dir: Path = Path(__file__).parent / "outputs"
+    jobs_dir: Path = Path(os.getenv("BATCH_JOBS_DIR") or Path(__file__).parent / "jobs")
+    classifier_cache_path: Path = Path(os.getenv("CLASSIFIER_CACHE_PATH") or Path(__file__).parent / "classifier_cache.sqlite3")
 
 settings = Settings()
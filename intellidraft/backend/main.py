@@ -2,15 +2,30 @@
 IntelliDraft Backend - FastAPI Application
 Main entry point for the API server
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
 from pathlib import Path
 
-from routers import components
+from config import settings
+from routers import batch, components
+from services.batch_service import resume_jobs, shutdown_jobs
+from services.http_client import close_session
 
-app = FastAPI(title="IntelliDraft API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pick up batch jobs interrupted by a crash or restart
+    resumed = resume_jobs()
+    if resumed:
+        print(f"Resumed {resumed} batch job(s)")
+    yield
+    await shutdown_jobs()
+    # Close the pooled upstream HTTP session on shutdown
+    await close_session()
+
+app = FastAPI(title="IntelliDraft API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware to allow React frontend
 app.add_middleware(
@@ -23,12 +38,14 @@ app.add_middleware(
 
 # Include routers
 app.include_router(components.router, prefix="/api", tags=["components"])
+app.include_router(batch.router, prefix="/api", tags=["batch"])
 
 # Create necessary directories
 UPLOAD_DIR = Path(__file__).parent / "uploads"
 OUTPUT_DIR = Path(__file__).parent / "outputs"
 UPLOAD_DIR.mkdir(exist_ok=True)
 OUTPUT_DIR.mkdir(exist_ok=True)
+settings.jobs_dir.mkdir(parents=True, exist_ok=True)
 
 @app.get("/")
 async def root():
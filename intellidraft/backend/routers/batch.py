@@ -0,0 +1,83 @@
+"""
+API Routes for Batch Processing
+Upload a CSV of part numbers, follow the job, download the documents as a ZIP
+"""
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form
+from fastapi.responses import StreamingResponse
+from pathlib import Path
+
+from services.batch_service import DONE, get_job, iter_zip, list_jobs, parse_part_numbers_csv, start_job
+from routers.components import uploaded_templates
+from config import settings
+
+router = APIRouter()
+
+@router.post("/batch/jobs")
+async def create_batch_job(file: UploadFile = File(...), template_id: str = Form(...)):
+    """
+    Start a batch job from a CSV of part numbers and an uploaded template
+    """
+    if not file.filename.lower().endswith('.csv'):
+        raise HTTPException(status_code=400, detail="Only .csv files are supported")
+    
+    # Resolve template_id the same way generate-document does
+    template_path = uploaded_templates.get(template_id) or str(settings.upload_dir / Path(template_id).name)
+    if not Path(template_path).exists():
+        raise HTTPException(status_code=404, detail="Template file not found. Please upload a template first.")
+    
+    try:
+        text = (await file.read()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV must be UTF-8 encoded")
+    
+    part_numbers = parse_part_numbers_csv(text)
+    if not part_numbers:
+        raise HTTPException(status_code=400, detail="No part numbers found in CSV")
+    if len(part_numbers) > settings.batch_max_parts:
+        raise HTTPException(status_code=400, detail=f"At most {settings.batch_max_parts} part numbers per job")
+    
+    job = start_job(part_numbers, template_path)
+    return job.summary()
+
+@router.get("/batch/jobs")
+async def list_batch_jobs():
+    """
+    List batch jobs, newest first
+    """
+    return {"jobs": list_jobs()}
+
+@router.get("/batch/jobs/{job_id}")
+async def get_batch_job(job_id: str):
+    """
+    Job summary plus per-part status
+    """
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    # Every item has its file name reserved up front; report it once the document exists
+    items = [
+        {key: item.get(key) for key in ("part_number", "status", "component_type", "confidence", "error")}
+        | {"output_filename": item.get("output_filename") if item["status"] == DONE else None}
+        for item in job.state["items"]
+    ]
+    return {**job.summary(), "items": items}
+
+@router.get("/batch/jobs/{job_id}/download")
+async def download_batch_job(job_id: str):
+    """
+    Stream the generated documents of a job as a ZIP file
+    """
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    documents = job.documents()
+    if not documents:
+        raise HTTPException(status_code=404, detail="No documents generated yet")
+    
+    return StreamingResponse(
+        iter_zip(documents),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="intellidraft-{job_id}.zip"'}
+    )
@@ -9,9 +9,11 @@ from typing import Dict, List, Optional
 import shutil
 from pathlib import Path
 
-from services.openai_service import classify_component, get_component_description
+from services.openai_service import get_component_description
+from services.classifier import classifier
 from services.digikey_service import fetch_component_parameters
 from services.document_service import update_functional_description, validate_template
+from services.single_flight import classify_flight, parameters_flight, single_flight_stats
 from config import settings
 
 router = APIRouter()
@@ -24,6 +26,10 @@ class ClassifyResponse(BaseModel):
     component_type: str
     confidence: str
     part_number: str
+    source: Optional[str] = None
+
+class ClassifyBatchRequest(BaseModel):
+    part_numbers: List[str]
 
 class FetchParametersRequest(BaseModel):
     part_number: str
@@ -81,23 +87,40 @@ async def upload_template(file: UploadFile = File(...)):
 @router.post("/classify-component", response_model=ClassifyResponse)
 async def classify_component_endpoint(request: ClassifyRequest):
     """
-    Classify component type using OpenAI
+    Classify component type: cache, Digi-Key category, prefix rules, then OpenRouter
     """
     try:
-        result = await classify_component(request.part_number)
+        # Identical in-flight lookups share one classification
+        key = request.part_number.strip().upper()
+        result = await classify_flight.do(key, lambda: classifier.classify(request.part_number))
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Classification failed: {str(e)}")
 
+@router.post("/classify-batch")
+async def classify_batch_endpoint(request: ClassifyBatchRequest):
+    """
+    Classify many part numbers at once; parts no cheaper tier knows are packed
+    into batched OpenRouter prompts
+    """
+    if len(request.part_numbers) > 5000:
+        raise HTTPException(status_code=400, detail="At most 5000 part numbers per request")
+    try:
+        return await classifier.classify_many(request.part_numbers)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch classification failed: {str(e)}")
+
 @router.post("/fetch-parameters")
 async def fetch_parameters_endpoint(request: FetchParametersRequest):
     """
     Fetch component parameters from Digi-Key API
     """
     try:
-        result = await fetch_component_parameters(
-            request.part_number,
-            request.component_type
+        # Identical in-flight lookups share one Digi-Key call
+        key = (request.part_number.strip().upper(), request.component_type)
+        result = await parameters_flight.do(
+            key,
+            lambda: fetch_component_parameters(request.part_number, request.component_type)
         )
         
         if "error" in result:
@@ -172,3 +195,13 @@ async def list_templates():
             for tid, path in uploaded_templates.items()
         ]
     }
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Request coalescing metrics and per-tier classifier hit rates
+    """
+    return {
+        "single_flight": single_flight_stats(),
+        "classifier": classifier.stats()
+    }
@@ -0,0 +1,363 @@
+"""
+Batch Service - CSV to ZIP Pipeline
+Runs classify -> fetch parameters -> generate document for every part of an
+uploaded CSV as a staged pipeline with bounded workers per stage.
+Job state is persisted to jobs/<job_id>/state.json so unfinished jobs resume
+after a restart.
+"""
+import asyncio
+import csv
+import io
+import json
+import os
+import time
+import uuid
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from config import settings
+from services.classifier import classifier
+from services.digikey_service import fetch_component_parameters
+from services.document_service import safe_part_number, update_functional_description
+
+# Item status -> stage that picks it up on (re)start
+PENDING, CLASSIFIED, FETCHED, DONE, FAILED = "pending", "classified", "fetched", "done", "failed"
+
+# Column headers recognised as the part number column (lowercase)
+PART_COLUMNS = ("part_number", "part number", "partnumber", "part", "mpn", "manufacturer part number", "mfr part number")
+
+_jobs: Dict[str, "BatchJob"] = {}
+_job_slots: Optional[asyncio.Semaphore] = None
+
+
+def parse_part_numbers_csv(text: str) -> List[str]:
+    """
+    Extract part numbers from CSV text
+
+    Uses a recognised part number column when the first row is a header,
+    otherwise the first column. Blank cells and duplicates are dropped.
+    """
+    rows = [row for row in csv.reader(io.StringIO(text)) if any(cell.strip() for cell in row)]
+    if not rows:
+        return []
+    header = [cell.strip().lower() for cell in rows[0]]
+    column = next((header.index(name) for name in PART_COLUMNS if name in header), None)
+    if column is not None:
+        rows = rows[1:]
+    else:
+        column = 0
+    parts = [row[column].strip() for row in rows if len(row) > column and row[column].strip()]
+    return list(dict.fromkeys(parts))
+
+
+def _assign_output_filenames(items: List[dict]):
+    """
+    Give every item without one its own .docx name
+
+    Different part numbers can clean up to the same file name (or differ
+    only in case), so repeats get a _2, _3, ... suffix; names are compared
+    case-insensitively.
+    """
+    taken = {item["output_filename"].lower() for item in items if item.get("output_filename")}
+    for item in items:
+        if item.get("output_filename"):
+            continue
+        base = safe_part_number(item["part_number"]) or "part"
+        name, n = f"{base}.docx", 1
+        while name.lower() in taken:
+            n += 1
+            name = f"{base}_{n}.docx"
+        taken.add(name.lower())
+        item["output_filename"] = name
+
+
+def _fail(job: "BatchJob", item: dict, error: str):
+    """Mark an item failed; a state.json write error must not stop the worker"""
+    try:
+        job.update(item, status=FAILED, error=error)
+    except Exception as e:
+        print(f"Batch job {job.job_id}: could not save state: {e}")
+
+
+class BatchJob:
+    """One batch job: its items, their progress and the on-disk state file"""
+
+    def __init__(self, state: dict):
+        self.state = state
+        self.dir = settings.jobs_dir / state["job_id"]
+        self.documents_dir = self.dir / "documents"
+        self.task: Optional[asyncio.Task] = None
+        self._dirty = False
+        self._saved_at = 0.0
+
+    @classmethod
+    def create(cls, part_numbers: List[str], template_path: str) -> "BatchJob":
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        job = cls({
+            "job_id": job_id,
+            "status": "queued",
+            "template_path": template_path,
+            "created_at": now,
+            "updated_at": now,
+            "error": None,
+            "items": [{"part_number": p, "status": PENDING} for p in part_numbers],
+        })
+        _assign_output_filenames(job.state["items"])
+        job.documents_dir.mkdir(parents=True, exist_ok=True)
+        job.save()
+        return job
+
+    @classmethod
+    def load(cls, state_path: Path) -> "BatchJob":
+        with open(state_path, "r", encoding="utf-8") as f:
+            job = cls(json.load(f))
+        _assign_output_filenames(job.state["items"])
+        return job
+
+    @property
+    def job_id(self) -> str:
+        return self.state["job_id"]
+
+    def save(self, force: bool = True):
+        """Write state.json atomically; unforced saves are throttled to one per second"""
+        self._dirty = True
+        if not force and time.time() - self._saved_at < 1.0:
+            return
+        self.state["updated_at"] = time.time()
+        tmp_path = self.dir / "state.json.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.dir / "state.json")
+        self._dirty = False
+        self._saved_at = time.time()
+
+    def update(self, item: dict, **changes):
+        item.update(changes)
+        self.save(force=False)
+
+    def summary(self) -> dict:
+        counts = {}
+        for item in self.state["items"]:
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+        total = len(self.state["items"])
+        finished = counts.get(DONE, 0) + counts.get(FAILED, 0)
+        return {
+            "job_id": self.job_id,
+            "status": self.state["status"],
+            "created_at": self.state["created_at"],
+            "updated_at": self.state["updated_at"],
+            "error": self.state["error"],
+            "total": total,
+            "counts": counts,
+            "progress": round(100 * finished / total) if total else 100,
+        }
+
+    def documents(self) -> List[Path]:
+        return [
+            self.documents_dir / item["output_filename"]
+            for item in self.state["items"]
+            if item["status"] == DONE and (self.documents_dir / item["output_filename"]).exists()
+        ]
+
+
+async def _classify_worker(job: BatchJob, inbox: asyncio.Queue, outbox: asyncio.Queue):
+    # Drain whatever is queued so the LLM leftovers go out as one packed prompt
+    while True:
+        items = [await inbox.get()]
+        while len(items) < settings.llm_batch_size and not inbox.empty():
+            items.append(inbox.get_nowait())
+        try:
+            try:
+                results = (await classifier.classify_many([item["part_number"] for item in items]))["results"]
+            except Exception as e:
+                for item in items:
+                    _fail(job, item, f"Classification failed: {e}")
+                continue
+            for item, classified in zip(items, results):
+                try:
+                    job.update(item, status=CLASSIFIED, component_type=classified["component_type"],
+                               confidence=classified["confidence"])
+                    await outbox.put(item)
+                except Exception as e:
+                    _fail(job, item, f"Classification failed: {e}")
+        finally:
+            for _ in items:
+                inbox.task_done()
+
+
+async def _fetch_worker(job: BatchJob, inbox: asyncio.Queue, outbox: asyncio.Queue):
+    while True:
+        item = await inbox.get()
+        try:
+            result = await fetch_component_parameters(item["part_number"], item["component_type"])
+            job.update(item, status=FETCHED, parameters=result.get("parameters", {}))
+            await outbox.put(item)
+        except Exception as e:
+            _fail(job, item, f"Parameter fetch failed: {e}")
+        finally:
+            inbox.task_done()
+
+
+async def _generate_worker(job: BatchJob, inbox: asyncio.Queue):
+    while True:
+        item = await inbox.get()
+        try:
+            result = await update_functional_description(
+                template_path=job.state["template_path"],
+                part_number=item["part_number"],
+                parameters=item["parameters"],
+                component_type=item["component_type"],
+                output_dir=job.documents_dir,
+                output_filename=item["output_filename"]
+            )
+            if result.get("success"):
+                job.update(item, status=DONE)
+            else:
+                _fail(job, item, result.get("error"))
+        except Exception as e:
+            _fail(job, item, f"Document generation failed: {e}")
+        finally:
+            inbox.task_done()
+
+
+async def _run_pipeline(job: BatchJob):
+    """Feed unfinished items to the stage matching their status and wait for all stages to drain"""
+    size = settings.batch_queue_size
+    to_classify, to_fetch, to_generate = asyncio.Queue(size), asyncio.Queue(size), asyncio.Queue(size)
+    workers = (
+        [asyncio.create_task(_classify_worker(job, to_classify, to_fetch))
+         for _ in range(settings.batch_classify_workers)]
+        + [asyncio.create_task(_fetch_worker(job, to_fetch, to_generate))
+           for _ in range(settings.batch_fetch_workers)]
+        + [asyncio.create_task(_generate_worker(job, to_generate))
+           for _ in range(settings.batch_generate_workers)]
+    )
+    entry = {PENDING: to_classify, CLASSIFIED: to_fetch, FETCHED: to_generate}
+    try:
+        for item in job.state["items"]:
+            queue = entry.get(item["status"])
+            if queue is not None:
+                await queue.put(item)
+        # Each stage enqueues into the next before marking its item done,
+        # so joining in stage order waits for the whole pipeline
+        await to_classify.join()
+        await to_fetch.join()
+        await to_generate.join()
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def _run_job(job: BatchJob):
+    global _job_slots
+    if _job_slots is None:
+        _job_slots = asyncio.Semaphore(settings.batch_max_jobs)
+    async with _job_slots:
+        job.state["status"] = "running"
+        job.save()
+        try:
+            await _run_pipeline(job)
+            job.state["status"] = "completed"
+        except asyncio.CancelledError:
+            # Shutdown: leave the job "running" so it resumes on the next start
+            job.save()
+            raise
+        except Exception as e:
+            print(f"Batch job {job.job_id} failed: {e}")
+            job.state["status"] = "failed"
+            job.state["error"] = str(e)
+        job.save()
+
+
+def start_job(part_numbers: List[str], template_path: str) -> BatchJob:
+    """Create a job and schedule it on the running event loop"""
+    job = BatchJob.create(part_numbers, template_path)
+    _jobs[job.job_id] = job
+    job.task = asyncio.create_task(_run_job(job))
+    return job
+
+
+def get_job(job_id: str) -> Optional[BatchJob]:
+    job = _jobs.get(job_id)
+    if job is None:
+        state_path = settings.jobs_dir / job_id / "state.json"
+        if job_id.isalnum() and state_path.exists():
+            job = _jobs[job_id] = BatchJob.load(state_path)
+    return job
+
+
+def list_jobs() -> List[dict]:
+    for state_path in settings.jobs_dir.glob("*/state.json"):
+        get_job(state_path.parent.name)
+    return sorted((job.summary() for job in _jobs.values()), key=lambda s: s["created_at"], reverse=True)
+
+
+def resume_jobs() -> int:
+    """
+    Reschedule jobs that were queued or running when the server stopped
+
+    Returns:
+        Number of resumed jobs
+    """
+    resumed = 0
+    for state_path in settings.jobs_dir.glob("*/state.json"):
+        job = get_job(state_path.parent.name)
+        if job and job.state["status"] in ("queued", "running") and job.task is None:
+            job.task = asyncio.create_task(_run_job(job))
+            resumed += 1
+    return resumed
+
+
+async def shutdown_jobs():
+    """Cancel running jobs and flush their state"""
+    tasks = [job.task for job in _jobs.values() if job.task and not job.task.done()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for job in _jobs.values():
+        if job._dirty:
+            job.save()
+
+
+class _ZipStream(io.RawIOBase):
+    """Write-only sink that hands zipfile output to a generator in chunks"""
+
+    def __init__(self):
+        self.chunks = []
+        self.offset = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.offset
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_zip(paths: List[Path], chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+    """
+    Stream a ZIP archive of the given files without building it in memory or on disk
+
+    .docx files are already deflated, so entries are stored uncompressed.
+    """
+    sink = _ZipStream()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        for path in paths:
+            with archive.open(zipfile.ZipInfo.from_file(path, path.name), "w") as entry, open(path, "rb") as f:
+                for block in iter(lambda: f.read(chunk_size), b""):
+                    entry.write(block)
+                    yield sink.drain()
+        yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,295 @@
+"""
+Tiered Component Classifier
+Answers from the cheapest tier that is confident, in order:
+cache (past classifications) -> digikey (category of a cached Digi-Key record)
+-> rules (built-in and learned prefix rules) -> llm (OpenRouter)
+"""
+import asyncio
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+from services.openai_service import classify_component, classify_components_batch
+
+sys.path.insert(0, str(settings.library_path))
+
+from part_cache import cache_key, get_part_cache
+
+# Built-in prefix rules for well-known part number families
+BUILTIN_RULES = [
+    (r"^(ERJ|CRCW|RMCF|RC0[0-9]|CRG|RK73|MCR[0-9])", "resistor"),
+    (r"^(GRM|GCM|GRT|CL[0-9]{2}|C[0-9]{4}[A-Z]|CGA|EEE-|UMK|EMK)", "capacitor"),
+    (r"^(LQ[GHMW]|SRR|SRN|XAL|XFL|IHLP|MLZ|NR[0-9])", "inductor"),
+    (r"^(1N[0-9]|BAT[0-9]|BAV|BAS|BZX|BZT|MBR|SS[0-9]|SMBJ|SMAJ|ES[0-9])", "diode"),
+    (r"^(2N[0-9]|BC[0-9]{3}|MMBT|PMBT|IRF|IRL|BSS|SI[0-9]{4}|AO[0-9]{4})", "transistor"),
+    (r"^(LM[0-9]|TPS|TL[0-9]|NE555|STM32|ATMEGA|ATTINY|PIC[0-9]|MAX[0-9]|LT[0-9]|AD[0-9]|OPA)", "ic"),
+    (r"^(TSW-|SSW-|DF1[0-9]|B[0-9]+B-|PPTC|SM[0-9]+B-|TSM-)", "connector"),
+]
+_BUILTIN = [(re.compile(pattern), component_type) for pattern, component_type in BUILTIN_RULES]
+
+# Digi-Key category name keywords -> component type (first match wins)
+CATEGORY_KEYWORDS = [
+    (re.compile(r"connector|header|socket|terminal block"), "connector"),
+    (re.compile(r"resistor"), "resistor"),
+    (re.compile(r"capacitor"), "capacitor"),
+    (re.compile(r"inductor|choke|ferrite"), "inductor"),
+    (re.compile(r"diode|rectifier|zener|tvs"), "diode"),
+    (re.compile(r"transistor|\bfets?\b|mosfet|bjt|igbt"), "transistor"),
+    (re.compile(r"\bics?\b|pmic|microcontroller|embedded|linear|amplifier|interface|logic|memory|regulator|clock|timing|data acquisition"), "ic"),
+]
+
+# Leading letters (ERJ, GRM) or digits + letters (2N, 1N) of a part number
+_PREFIX = re.compile(r"[A-Z]+|[0-9]+[A-Z]+")
+
+
+def category_to_type(category: Optional[str]) -> Optional[str]:
+    """Map a Digi-Key category name to a component type, or None if unknown"""
+    if not category:
+        return None
+    name = category.lower()
+    for pattern, component_type in CATEGORY_KEYWORDS:
+        if pattern.search(name):
+            return component_type
+    return None
+
+
+def part_prefix(part_number: str) -> Optional[str]:
+    """Family prefix used for learned rules (at least two characters)"""
+    match = _PREFIX.match(cache_key(part_number))
+    if match and len(match.group(0)) >= 2:
+        return match.group(0)
+    return None
+
+
+class ClassificationCache:
+    """Persistent part number -> (component_type, source) store"""
+
+    def __init__(self, path: Path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS classifications ("
+            " key TEXT PRIMARY KEY,"
+            " component_type TEXT NOT NULL,"
+            " source TEXT NOT NULL,"
+            " stored_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, part_number: str) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT component_type, source FROM classifications WHERE key = ?",
+                (cache_key(part_number),)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def put(self, part_number: str, component_type: str, source: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO classifications VALUES (?, ?, ?, ?)",
+                (cache_key(part_number), component_type, source, time.time())
+            )
+            self._conn.commit()
+
+    def put_many(self, entries: List[Tuple[str, str, str]]):
+        """Store (part_number, component_type, source) triples"""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO classifications VALUES (?, ?, ?, ?)",
+                [(cache_key(part), component_type, source, now) for part, component_type, source in entries]
+            )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM classifications").fetchone()[0]
+
+
+class TieredClassifier:
+    """
+    Classify part numbers, calling the LLM only when no cheaper tier is confident
+
+    Learned rules map a part prefix to the component type seen in cached
+    Digi-Key records; a prefix is only trusted once it has enough support and
+    its records agree on the type. Latency saved is estimated from the running
+    average of real LLM calls.
+    """
+
+    TIERS = ("cache", "digikey", "rules", "llm")
+
+    def __init__(self, cache_path: Path, min_support: int = 3, min_confidence: float = 0.9,
+                 relearn_interval: float = 600.0):
+        self.cache = ClassificationCache(cache_path)
+        self.min_support = min_support
+        self.min_confidence = min_confidence
+        self.relearn_interval = relearn_interval
+        self.learned: Dict[str, Tuple[str, float, int]] = {}
+        self.learned_at = 0.0
+        self._learn_lock = threading.Lock()
+        self.hits = Counter()
+        self.llm_calls = 0
+        self.llm_time = 0.0
+
+    def learn_rules(self) -> int:
+        """
+        Rebuild the learned prefix rules from cached Digi-Key records
+
+        Returns:
+            Number of learned rules
+        """
+        votes = defaultdict(Counter)
+        for key, record in get_part_cache().records():
+            component_type = category_to_type(record.get("Category"))
+            prefix = part_prefix(key)
+            if component_type and prefix:
+                votes[prefix][component_type] += 1
+        learned = {}
+        for prefix, counts in votes.items():
+            component_type, count = counts.most_common(1)[0]
+            support = sum(counts.values())
+            if support >= self.min_support:
+                learned[prefix] = (component_type, count / support, support)
+        self.learned = learned
+        self.learned_at = time.time()
+        return len(learned)
+
+    def _relearn_if_stale(self):
+        """
+        Rebuild the learned rules once they are older than relearn_interval
+
+        Only one thread rebuilds; the others keep using the current rules
+        (before the first build they wait for it).
+        """
+        if time.time() - self.learned_at <= self.relearn_interval:
+            return
+        if not self._learn_lock.acquire(blocking=not self.learned_at):
+            return
+        try:
+            if time.time() - self.learned_at > self.relearn_interval:
+                self.learn_rules()
+        finally:
+            self._learn_lock.release()
+
+    def _from_digikey(self, part_number: str) -> Optional[str]:
+        hit, record = get_part_cache().get(part_number)
+        return category_to_type(record.get("Category")) if hit and record else None
+
+    def _from_rules(self, part_number: str) -> Optional[Tuple[str, float]]:
+        key = cache_key(part_number)
+        for pattern, component_type in _BUILTIN:
+            if pattern.match(key):
+                return component_type, 1.0
+        rule = self.learned.get(part_prefix(key))
+        if rule:
+            return rule[0], rule[1]
+        return None
+
+    def _local(self, part_number: str) -> Optional[dict]:
+        """Cache, Digi-Key and rule tiers (blocking; SQLite reads only)"""
+        self._relearn_if_stale()
+
+        cached = self.cache.get(part_number)
+        if cached:
+            return {"component_type": cached[0], "confidence": "high", "source": "cache"}
+
+        component_type = self._from_digikey(part_number)
+        if component_type:
+            self.cache.put(part_number, component_type, "digikey")
+            return {"component_type": component_type, "confidence": "high", "source": "digikey"}
+
+        rule = self._from_rules(part_number)
+        if rule and rule[1] >= self.min_confidence:
+            return {"component_type": rule[0], "confidence": "high", "source": "rules"}
+        return None
+
+    async def classify(self, part_number: str) -> dict:
+        """
+        Classify a part number through the tiers
+
+        Args:
+            part_number: Electronic component part number
+
+        Returns:
+            dict with 'component_type', 'confidence', 'part_number' and 'source'
+        """
+        result = await asyncio.to_thread(self._local, part_number)
+        if result:
+            self.hits[result["source"]] += 1
+            return {**result, "part_number": part_number}
+
+        start = time.perf_counter()
+        result = await classify_component(part_number)
+        self.hits["llm"] += 1
+        if "error" not in result:
+            # Only successful calls feed the latency estimate and the cache
+            self.llm_time += time.perf_counter() - start
+            self.llm_calls += 1
+            if result["confidence"] == "high":
+                # A reply outside VALID_TYPES comes back as a low-confidence 'other'
+                await asyncio.to_thread(self.cache.put, part_number, result["component_type"], "llm")
+        return {**result, "source": "llm"}
+
+    async def classify_many(self, part_numbers: List[str]) -> dict:
+        """
+        Classify many part numbers, packing the LLM leftovers into batched prompts
+
+        Args:
+            part_numbers: Component part numbers (duplicates are classified once)
+
+        Returns:
+            dict with 'results' (one classify result per input, in order),
+            'llm_parts' and 'llm_calls'
+        """
+        unique = list(dict.fromkeys(cache_key(p) for p in part_numbers if p.strip()))
+        local = await asyncio.to_thread(lambda: {key: self._local(key) for key in unique})
+        by_key = {}
+        for key, result in local.items():
+            if result:
+                self.hits[result["source"]] += 1
+                by_key[key] = result
+
+        leftover = [key for key in unique if key not in by_key]
+        batch = {"results": {}, "calls": 0}
+        if leftover:
+            batch = await classify_components_batch(leftover)
+            self.hits["llm"] += len(leftover)
+            await asyncio.to_thread(self.cache.put_many, [
+                (part, result["component_type"], "llm")
+                for part, result in batch["results"].items() if "error" not in result
+            ])
+            for part, result in batch["results"].items():
+                by_key[part] = {**result, "source": "llm"}
+
+        results = [
+            {**by_key[cache_key(p)], "part_number": p}
+            for p in part_numbers if p.strip()
+        ]
+        return {"results": results, "llm_parts": len(leftover), "llm_calls": batch["calls"]}
+
+    def stats(self) -> dict:
+        total = sum(self.hits.values())
+        avg_llm = self.llm_time / self.llm_calls if self.llm_calls else None
+        avoided = total - self.hits["llm"]
+        return {
+            "total": total,
+            "tiers": {
+                tier: {"hits": self.hits[tier], "rate": self.hits[tier] / total if total else 0.0}
+                for tier in self.TIERS
+            },
+            "llm_avg_latency_s": avg_llm,
+            "latency_saved_s": avoided * avg_llm if avg_llm is not None else None,
+            "learned_rules": len(self.learned),
+            "cached_classifications": len(self.cache),
+        }
+
+
+classifier = TieredClassifier(settings.classifier_cache_path)
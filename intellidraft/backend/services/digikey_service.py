@@ -11,7 +11,9 @@ from typing import List, Dict, Optional
 library_path = Path(__file__).parent.parent.parent / "Library"
 sys.path.insert(0, str(library_path))
 
-from digikey import digikey_search
+from digikey import digikey_search_async
+from part_cache import get_part_cache
+from services.http_client import get_session
 
 # Load parameters configuration
 PARAMS_CONFIG_PATH = library_path / "parameters.json"
@@ -59,37 +61,34 @@ async def fetch_component_parameters(part_number: str, component_type: str) -> d
             filtered_params[display_name] = ""
         
         try:
-            # Call the existing digikey_search function
-            # It expects a list of part numbers
-            result = digikey_search([part_number])
+            # Search on the shared session, reading through the part cache
+            # It expects a list of part numbers and returns one result per part
+            results = await digikey_search_async(
+                [part_number], session=get_session(), cache=get_part_cache()
+            )
+            result = results[0]
             
-            # Read the generated parts.json file
-            parts_json_path = library_path / "parts.json"
-            
-            if parts_json_path.exists():
-                with open(parts_json_path, 'r', encoding='utf-8') as f:
-                    parts_data = json.load(f)
+            if result.error:
+                print(f"Digi-Key API error (will use empty template): {result.error}")
+            elif result.record:
+                raw_params = result.record
+                
+                # Always include basic info if available
+                if "Part Number" in raw_params:
+                    filtered_params["Part Number"] = raw_params["Part Number"]
+                if "Mfr" in raw_params:
+                    filtered_params["Manufacturer"] = raw_params["Mfr"]
+                if "Part Status" in raw_params:
+                    filtered_params["Part Status"] = raw_params["Part Status"]
                 
-                if parts_data and len(parts_data) > 0:
-                    # Get the first result
-                    raw_params = parts_data[0]
-                    
-                    # Always include basic info if available
-                    if "Part Number" in raw_params:
-                        filtered_params["Part Number"] = raw_params["Part Number"]
-                    if "Mfr" in raw_params:
-                        filtered_params["Manufacturer"] = raw_params["Mfr"]
-                    if "Part Status" in raw_params:
-                        filtered_params["Part Status"] = raw_params["Part Status"]
-                    
-                    # Map required parameters (case-insensitive matching)
-                    for req_param in required_params:
-                        # Try to find matching parameter in raw data
-                        for key, value in raw_params.items():
-                            # Normalize both strings for comparison
-                            if req_param.lower().replace("_", " ") in key.lower().replace("-", " "):
-                                filtered_params[key] = value
-                                break
+                # Map required parameters (case-insensitive matching)
+                for req_param in required_params:
+                    # Try to find matching parameter in raw data
+                    for key, value in raw_params.items():
+                        # Normalize both strings for comparison
+                        if req_param.lower().replace("_", " ") in key.lower().replace("-", " "):
+                            filtered_params[key] = value
+                            break
         except Exception as digikey_error:
             print(f"Digi-Key API error (will use empty template): {digikey_error}")
             # Continue with empty parameters - user can fill them manually
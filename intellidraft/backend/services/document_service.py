@@ -7,29 +7,56 @@ from docx.shared import Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from pathlib import Path
 from typing import Dict, Optional
+import asyncio
 import shutil
 from config import settings
 
+def safe_part_number(part_number: str) -> str:
+    """Part number with everything but letters, digits, '-' and '_' removed"""
+    return "".join(c for c in part_number if c.isalnum() or c in ('-', '_'))
+
 async def update_functional_description(
     template_path: str,
     part_number: str,
     parameters: Dict[str, str],
     component_type: str,
-    description: str = ""
+    description: str = "",
+    output_dir: Optional[Path] = None,
+    output_filename: Optional[str] = None
 ) -> dict:
     """
     Update the Functional Description section (section 2) in the .docx template
     
+    The document is built in a worker thread so python-docx does not block
+    the event loop.
+    
     Args:
         template_path: Path to the template .docx file
         part_number: Component part number (used for output filename)
         parameters: Dictionary of component parameters to insert
         component_type: Type of component
         description: Optional text description
+        output_dir: Directory for the generated file (defaults to settings.output_dir)
+        output_filename: Name of the generated file (defaults to <part number>.docx)
         
     Returns:
         Dictionary with output file path and status
     """
+    return await asyncio.to_thread(
+        build_document, template_path, part_number, parameters, component_type, description, output_dir,
+        output_filename
+    )
+
+def build_document(
+    template_path: str,
+    part_number: str,
+    parameters: Dict[str, str],
+    component_type: str,
+    description: str = "",
+    output_dir: Optional[Path] = None,
+    output_filename: Optional[str] = None
+) -> dict:
+    """Blocking implementation of update_functional_description"""
     try:
         # Load the template document
         doc = Document(template_path)
@@ -79,9 +106,8 @@ async def update_functional_description(
         
         # Generate output filename
         # Clean part number for filename
-        safe_part_number = "".join(c for c in part_number if c.isalnum() or c in ('-', '_'))
-        output_filename = f"{safe_part_number}.docx"
-        output_path = settings.output_dir / output_filename
+        output_filename = output_filename or f"{safe_part_number(part_number)}.docx"
+        output_path = Path(output_dir or settings.output_dir) / output_filename
         
         # Save the document
         doc.save(str(output_path))
@@ -0,0 +1,92 @@
+"""
+Shared HTTP Client
+One pooled aiohttp session for all upstream calls (OpenRouter, Digi-Key),
+with keep-alive, timeouts and retry with exponential backoff
+"""
+import asyncio
+import random
+from typing import Optional
+
+import aiohttp
+
+from config import settings
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+class UpstreamError(Exception):
+    """Raised when an upstream call still fails after all retries"""
+
+    def __init__(self, status: int, body: str):
+        super().__init__(f"HTTP {status}: {body[:200]}")
+        self.status = status
+        self.body = body
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    Return the shared session, creating it on first use
+
+    Must be called from the running event loop.
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=settings.http_timeout),
+            connector=aiohttp.TCPConnector(
+                limit=settings.http_max_connections,
+                keepalive_timeout=30,
+            ),
+        )
+    return _session
+
+
+async def close_session():
+    """Close the shared session (called on application shutdown)"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def post_json(url: str, headers: dict, payload: dict, retries: Optional[int] = None) -> dict:
+    """
+    POST a JSON payload and return the decoded JSON response
+
+    Connection errors, timeouts and retryable statuses are retried with
+    exponential backoff and jitter; Retry-After is honoured when present.
+
+    Args:
+        url: Endpoint URL
+        headers: Request headers
+        payload: JSON body
+        retries: Number of retries (defaults to settings.http_retries)
+
+    Returns:
+        Decoded JSON response body
+
+    Raises:
+        UpstreamError: Non-retryable status, or retries exhausted
+        aiohttp.ClientError / asyncio.TimeoutError: Network failure after retries
+    """
+    retries = settings.http_retries if retries is None else retries
+    session = get_session()
+    for attempt in range(retries + 1):
+        delay = settings.http_backoff * (2 ** attempt) * (0.5 + random.random())
+        try:
+            async with session.post(url, headers=headers, json=payload) as response:
+                if response.status < 400:
+                    return await response.json(content_type=None)
+                body = await response.text()
+                if response.status not in RETRY_STATUSES or attempt == retries:
+                    raise UpstreamError(response.status, body)
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = float(retry_after)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == retries:
+                raise
+        await asyncio.sleep(delay)
@@ -3,14 +3,66 @@ OpenRouter Service - Component Classification
 Uses OpenRouter API to classify electronic component types from part numbers
 OpenRouter provides access to multiple LLM models through a unified API
 """
-import requests
-from typing import Optional
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional
 from config import settings
+from services.http_client import post_json
 
 # OpenRouter API configuration
-OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+OPENROUTER_API_URL = settings.openrouter_api_url
 OPENROUTER_API_KEY = settings.openrouter_api_key
 
+VALID_TYPES = ["resistor", "capacitor", "inductor", "diode", "transistor", "ic", "connector", "other"]
+
+def _headers() -> dict:
+    return {
+        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "http://localhost:3000",
+        "X-Title": "IntelliDraft"
+    }
+
+class RateBudget:
+    """
+    Request and token budget for OpenRouter calls (per minute token buckets)
+
+    Callers wait in arrival order until both one request and their estimated
+    token count are available.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.request_rate = requests_per_minute / 60.0
+        self.token_rate = tokens_per_minute / 60.0
+        self.request_capacity = max(1.0, requests_per_minute / 60.0 * 5)
+        self.token_capacity = tokens_per_minute
+        self.requests = self.request_capacity
+        self.tokens = self.token_capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated
+        self.updated = now
+        self.requests = min(self.request_capacity, self.requests + elapsed * self.request_rate)
+        self.tokens = min(self.token_capacity, self.tokens + elapsed * self.token_rate)
+
+    async def acquire(self, tokens: int):
+        tokens = min(tokens, self.token_capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.requests >= 1 and self.tokens >= tokens:
+                    self.requests -= 1
+                    self.tokens -= tokens
+                    return
+                wait = max((1 - self.requests) / self.request_rate, (tokens - self.tokens) / self.token_rate, 0.01)
+                await asyncio.sleep(wait)
+
+llm_budget = RateBudget(settings.llm_requests_per_minute, settings.llm_tokens_per_minute)
+
 async def classify_component(part_number: str) -> dict:
     """
     Classify the component type using OpenAI API
@@ -40,12 +92,7 @@ If you're unsure, respond with 'other'.
 
 Component type:"""
 
-        headers = {
-            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "http://localhost:3000",  # Optional, for rankings
-            "X-Title": "IntelliDraft"  # Optional, for rankings
-        }
+        headers = _headers()
         
         payload = {
             "model": "openai/gpt-3.5-turbo",  # Can use other models like "anthropic/claude-3-haiku"
@@ -57,20 +104,19 @@ Component type:"""
             "max_tokens": 20
         }
         
-        response = requests.post(OPENROUTER_API_URL, headers=headers, json=payload)
-        response.raise_for_status()
-        
-        result = response.json()
+        await llm_budget.acquire(len(prompt) // 4 + payload["max_tokens"])
+        result = await post_json(OPENROUTER_API_URL, headers, payload)
         component_type = result['choices'][0]['message']['content'].strip().lower()
+        confidence = "high"
         
         # Validate response
-        valid_types = ["resistor", "capacitor", "inductor", "diode", "transistor", "ic", "connector", "other"]
-        if component_type not in valid_types:
+        if component_type not in VALID_TYPES:
             component_type = "other"
+            confidence = "low"
         
         return {
             "component_type": component_type,
-            "confidence": "high",
+            "confidence": confidence,
             "part_number": part_number
         }
         
@@ -83,6 +129,110 @@ Component type:"""
             "part_number": part_number
         }
 
+def _parse_batch_response(content: str, part_numbers: List[str]) -> Dict[str, str]:
+    """
+    Pull valid {part_number: component_type} pairs out of a JSON array reply
+
+    Entries for unknown parts or with a type outside VALID_TYPES are dropped,
+    so the caller retries them.
+    """
+    start, end = content.find("["), content.rfind("]")
+    if start < 0 or end < start:
+        return {}
+    try:
+        entries = json.loads(content[start:end + 1])
+    except ValueError:
+        return {}
+    wanted = {p.strip().upper(): p for p in part_numbers}
+    parsed = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        part = wanted.get(str(entry.get("part_number", "")).strip().upper())
+        component_type = str(entry.get("component_type", "")).strip().lower()
+        if part and component_type in VALID_TYPES:
+            parsed[part] = component_type
+    return parsed
+
+async def _classify_chunk(part_numbers: List[str]) -> Dict[str, str]:
+    """One OpenRouter call classifying several part numbers"""
+    prompt = f"""You are an expert in electronic components. Identify the component type of each part number below.
+
+Respond with ONLY a JSON array containing one object per part number, for example:
+[{{"part_number": "ERJ-2RKF1002X", "component_type": "resistor"}}]
+
+component_type must be exactly one of: {", ".join(VALID_TYPES)}
+If you're unsure, use "other".
+
+Part numbers:
+{json.dumps(part_numbers)}"""
+
+    payload = {
+        "model": "openai/gpt-3.5-turbo",
+        "messages": [
+            {"role": "system", "content": "You are an expert in electronic component identification. Respond with only a JSON array."},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.0,
+        # About 15 tokens per {"part_number", "component_type"} object
+        "max_tokens": 15 * len(part_numbers) + 50
+    }
+    await llm_budget.acquire(len(prompt) // 4 + payload["max_tokens"])
+    result = await post_json(OPENROUTER_API_URL, _headers(), payload)
+    return _parse_batch_response(result['choices'][0]['message']['content'], part_numbers)
+
+async def classify_components_batch(part_numbers: List[str], batch_size: Optional[int] = None,
+                                    max_retries: int = 2) -> dict:
+    """
+    Classify many part numbers with a few packed prompts
+    
+    Parts are split into batches that run concurrently under the shared
+    request/token budget. Entries missing from a reply or with an invalid
+    type are retried, alone with the other failures of their batch, up to
+    max_retries times; what still fails is reported as 'other' / 'low'.
+    
+    Args:
+        part_numbers: Component part numbers (deduplicated by the caller)
+        batch_size: Parts per prompt (defaults to settings.llm_batch_size)
+        max_retries: Retries for failed entries of each batch
+        
+    Returns:
+        dict with 'results' ({part_number: classify result}) and 'calls'
+    """
+    batch_size = batch_size or settings.llm_batch_size
+    semaphore = asyncio.Semaphore(settings.llm_batch_concurrency)
+    results = {}
+    calls = 0
+
+    async def run_batch(batch: List[str]):
+        nonlocal calls
+        pending = batch
+        error = None
+        for _ in range(max_retries + 1):
+            if not pending:
+                break
+            calls += 1
+            try:
+                async with semaphore:
+                    parsed = await _classify_chunk(pending)
+            except Exception as e:
+                print(f"OpenRouter batch classification error: {e}")
+                error, parsed = str(e), {}
+            for part, component_type in parsed.items():
+                results[part] = {"component_type": component_type, "confidence": "high", "part_number": part}
+            pending = [p for p in pending if p not in parsed]
+        for part in pending:
+            results[part] = {
+                "component_type": "other",
+                "confidence": "low",
+                "error": error or "No valid classification in response",
+                "part_number": part
+            }
+
+    batches = [part_numbers[i:i + batch_size] for i in range(0, len(part_numbers), batch_size)]
+    await asyncio.gather(*(run_batch(batch) for batch in batches))
+    return {"results": results, "calls": calls}
+
 async def get_component_description(component_type: str, parameters: dict) -> str:
     """
     Generate a natural language description of the component based on its parameters
@@ -104,12 +254,7 @@ Parameters:
 
 Description:"""
 
-        headers = {
-            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "http://localhost:3000",
-            "X-Title": "IntelliDraft"
-        }
+        headers = _headers()
         
         payload = {
             "model": "openai/gpt-3.5-turbo",
@@ -121,10 +266,8 @@ Description:"""
             "max_tokens": 150
         }
         
-        response = requests.post(OPENROUTER_API_URL, headers=headers, json=payload)
-        response.raise_for_status()
-        
-        result = response.json()
+        await llm_budget.acquire(len(prompt) // 4 + payload["max_tokens"])
+        result = await post_json(OPENROUTER_API_URL, headers, payload)
         return result['choices'][0]['message']['content'].strip()
         
     except Exception as e:
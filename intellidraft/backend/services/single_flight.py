@@ -0,0 +1,71 @@
+"""
+Single-Flight Request Coalescing
+Concurrent callers asking for the same key share one in-flight upstream call
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Run at most one upstream call per key at a time
+
+    The first caller for a key starts the call as a task; callers that arrive
+    while it is running await the same task instead of starting their own.
+    The task is shielded, so a caller that disconnects does not cancel the
+    call for the others. All waiters receive the same result object.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the result of fn(), sharing it with concurrent callers of the same key
+
+        Args:
+            key: Identity of the upstream call (e.g. normalized part number)
+            fn: Zero-argument coroutine function that performs the call
+
+        Returns:
+            Whatever fn() returns (or raises)
+        """
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter went away
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
+
+
+# Shared groups for the component endpoints
+classify_flight = SingleFlight("classify-component")
+parameters_flight = SingleFlight("fetch-parameters")
+
+
+def single_flight_stats() -> dict:
+    """Coalescing metrics for every shared group"""
+    return {group.name: group.stats() for group in (classify_flight, parameters_flight)}
@@ -1,36 +1,174 @@
-import { FileText } from 'lucide-react'
+import { useEffect, useState } from 'react'
+import { Upload, Loader2, Download, AlertCircle, CheckCircle } from 'lucide-react'
+import { createBatchJob, getBatchJob, listBatchJobs, downloadBatchZip } from '../services/api'
+
+const STATUS_STYLES = {
+  pending: 'text-gray-500',
+  classified: 'text-blue-600',
+  fetched: 'text-indigo-600',
+  done: 'text-green-600',
+  failed: 'text-red-600',
+}
 
 function BatchProcessing({ templateInfo }) {
+  const [file, setFile] = useState(null)
+  const [starting, setStarting] = useState(false)
+  const [job, setJob] = useState(null)
+  const [error, setError] = useState(null)
+
+  // Reattach to the most recent job (e.g. after a page reload or server restart)
+  useEffect(() => {
+    listBatchJobs()
+      .then(jobs => jobs.length > 0 && getBatchJob(jobs[0].job_id).then(setJob))
+      .catch(() => {})
+  }, [])
+
+  // Poll the job while it is running
+  useEffect(() => {
+    if (!job || !['queued', 'running'].includes(job.status)) return
+    const timer = setTimeout(async () => {
+      try {
+        setJob(await getBatchJob(job.job_id))
+      } catch (err) {
+        setError(err.response?.data?.detail || 'Lost track of the batch job.')
+      }
+    }, 1000)
+    return () => clearTimeout(timer)
+  }, [job])
+
+  const handleFileChange = (e) => {
+    const selectedFile = e.target.files[0]
+    if (selectedFile && selectedFile.name.toLowerCase().endsWith('.csv')) {
+      setFile(selectedFile)
+      setError(null)
+    } else {
+      setError('Please select a .csv file')
+    }
+  }
+
+  const handleStart = async () => {
+    if (!file) return
+
+    setStarting(true)
+    setError(null)
+
+    try {
+      const created = await createBatchJob(file, templateInfo.template_id)
+      setJob(await getBatchJob(created.job_id))
+    } catch (err) {
+      setError(err.response?.data?.detail || 'Failed to start batch job. Please try again.')
+    } finally {
+      setStarting(false)
+    }
+  }
+
+  const running = job && ['queued', 'running'].includes(job.status)
+  const doneCount = job?.counts?.done || 0
+  const failedCount = job?.counts?.failed || 0
+
   return (
-    <div className="text-center py-12">
-      <FileText className="w-16 h-16 text-gray-300 mx-auto mb-4" />
-      <h3 className="text-xl font-semibold text-gray-700 mb-2">
-        Batch Processing
-      </h3>
-      <p className="text-gray-600 mb-4">
-        This feature will be available in Phase 2
-      </p>
-      <div className="max-w-md mx-auto text-left bg-gray-50 rounded-lg p-4">
-        <h4 className="font-semibold text-gray-800 mb-2">Planned Features:</h4>
-        <ul className="space-y-2 text-sm text-gray-600">
-          <li className="flex items-start">
-            <span className="mr-2">•</span>
-            <span>Upload CSV file with multiple part numbers</span>
-          </li>
-          <li className="flex items-start">
-            <span className="mr-2">•</span>
-            <span>Process all components automatically</span>
-          </li>
-          <li className="flex items-start">
-            <span className="mr-2">•</span>
-            <span>Generate individual documents for each component</span>
-          </li>
-          <li className="flex items-start">
-            <span className="mr-2">•</span>
-            <span>Download all documents as a ZIP file</span>
-          </li>
-        </ul>
+    <div className="space-y-6">
+      {/* CSV Upload */}
+      <div className="space-y-4">
+        <div className="flex space-x-4">
+          <label className="flex-1">
+            <div className="flex items-center justify-center w-full h-24 px-4 transition bg-white border-2 border-gray-300 border-dashed rounded-lg cursor-pointer hover:border-indigo-400">
+              <div className="flex flex-col items-center space-y-2">
+                <Upload className="w-6 h-6 text-gray-400" />
+                <span className="text-sm text-gray-600">
+                  {file ? file.name : 'Click to select a CSV of part numbers'}
+                </span>
+              </div>
+              <input type="file" className="hidden" accept=".csv" onChange={handleFileChange} />
+            </div>
+          </label>
+          <button
+            onClick={handleStart}
+            disabled={!file || starting || running}
+            className="px-6 py-2 bg-indigo-600 text-white rounded-lg hover:bg-indigo-700 disabled:bg-gray-400 disabled:cursor-not-allowed transition-colors flex items-center space-x-2 self-center"
+          >
+            {starting ? (
+              <>
+                <Loader2 className="w-5 h-5 animate-spin" />
+                <span>Starting...</span>
+              </>
+            ) : (
+              <span>Process All</span>
+            )}
+          </button>
+        </div>
+
+        {/* Error Message */}
+        {error && (
+          <div className="flex items-center space-x-2 p-3 bg-red-50 text-red-800 rounded-lg">
+            <AlertCircle className="w-5 h-5" />
+            <span className="text-sm">{error}</span>
+          </div>
+        )}
       </div>
+
+      {/* Job Progress */}
+      {job && (
+        <div className="bg-gray-50 rounded-lg p-4 space-y-4">
+          <div className="flex items-center justify-between">
+            <h3 className="text-lg font-semibold text-gray-800 flex items-center space-x-2">
+              {running ? (
+                <Loader2 className="w-5 h-5 animate-spin text-indigo-600" />
+              ) : (
+                <CheckCircle className="w-5 h-5 text-green-600" />
+              )}
+              <span>Job {job.job_id}</span>
+            </h3>
+            <span className="text-sm text-gray-600 capitalize">{job.status}</span>
+          </div>
+
+          <div className="w-full bg-gray-200 rounded-full h-3">
+            <div
+              className="bg-indigo-600 h-3 rounded-full transition-all"
+              style={{ width: `${job.progress}%` }}
+            />
+          </div>
+          <p className="text-sm text-gray-600">
+            {doneCount} of {job.total} documents generated{failedCount > 0 && `, ${failedCount} failed`}
+          </p>
+
+          {doneCount > 0 && (
+            <div className="flex justify-end">
+              <button
+                onClick={() => downloadBatchZip(job.job_id)}
+                className="px-6 py-3 bg-green-600 text-white rounded-lg hover:bg-green-700 transition-colors flex items-center space-x-2"
+              >
+                <Download className="w-5 h-5" />
+                <span>Download ZIP</span>
+              </button>
+            </div>
+          )}
+
+          {/* Per-part status */}
+          <div className="max-h-80 overflow-y-auto border border-gray-200 rounded-lg bg-white">
+            <table className="w-full text-sm">
+              <thead className="bg-gray-100 sticky top-0">
+                <tr>
+                  <th className="text-left px-3 py-2">Part Number</th>
+                  <th className="text-left px-3 py-2">Type</th>
+                  <th className="text-left px-3 py-2">Status</th>
+                </tr>
+              </thead>
+              <tbody>
+                {job.items?.map(item => (
+                  <tr key={item.part_number} className="border-t border-gray-100">
+                    <td className="px-3 py-1 font-mono">{item.part_number}</td>
+                    <td className="px-3 py-1 capitalize">{item.component_type || '-'}</td>
+                    <td className={`px-3 py-1 capitalize ${STATUS_STYLES[item.status] || ''}`} title={item.error || ''}>
+                      {item.status}
+                    </td>
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          </div>
+        </div>
+      )}
     </div>
   )
 }
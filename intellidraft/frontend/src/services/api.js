@@ -52,4 +52,32 @@ export const downloadDocument = (filename) => {
   window.open(`${API_BASE_URL}/download/${filename}`, '_blank');
 };
 
+export const createBatchJob = async (file, templateId) => {
+  const formData = new FormData();
+  formData.append('file', file);
+  formData.append('template_id', templateId);
+  
+  const response = await axios.post(`${API_BASE_URL}/batch/jobs`, formData, {
+    headers: {
+      'Content-Type': 'multipart/form-data',
+    },
+  });
+  
+  return response.data;
+};
+
+export const getBatchJob = async (jobId) => {
+  const response = await api.get(`/batch/jobs/${jobId}`);
+  return response.data;
+};
+
+export const listBatchJobs = async () => {
+  const response = await api.get('/batch/jobs');
+  return response.data.jobs;
+};
+
+export const downloadBatchZip = (jobId) => {
+  window.open(`${API_BASE_URL}/batch/jobs/${jobId}/download`, '_blank');
+};
+
 export default api;
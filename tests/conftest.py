@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The projects are run as scripts from their own folders rather than
+# installed, so put those folders on the path the same way
+for folder in ("WCCA_WEB", "WCCA_WEB/backend", "Siemens", "benchmarks"):
+    sys.path.insert(0, str(ROOT / folder))
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from digikey import digikey_search_async, parse_batch_product, parse_product
+from fake_digikey_server import fake_batch_product, fake_product, start_fake_server
+from part_cache import PartCache
+
+
+@pytest.fixture
+def api():
+    server, url = start_fake_server(latency=0)
+    yield server, url
+    server.shutdown()
+    server.server_close()
+
+
+def search(parts, url, **options):
+    return asyncio.run(digikey_search_async(parts, base_url=url, **options))
+
+
+def test_parse_product_normalizes_the_part_number():
+    assert parse_product(" rc0603fr-0710kl\n", fake_product("RC0603FR-0710KL"))["Part Number"] == "RC0603FR-0710KL"
+    record = parse_batch_product("  rc0603 ", fake_batch_product("RC0603"))
+    assert record["Part Number"] == "RC0603"
+    assert record["Category"] == "Chip Resistor - Surface Mount"
+    assert record["Resistance"] == "10 kOhms"
+
+
+def test_empty_input_makes_no_requests(api):
+    server, url = api
+    results = search([], url)
+    assert results == []
+    assert sum(server.counts.values()) == 0
+
+
+def test_batch_then_keyword_fallback(api):
+    server, url = api
+    results = search(["R1", "FUZZY1", "MISS1", " r2 "], url, batch_size=10)
+    assert [r.status for r in results] == ["found", "found", "miss", "found"]
+    assert [r.source for r in results] == ["batch", "keyword", "keyword", "batch"]
+    assert results[3].record["Part Number"] == "R2"
+    assert results.misses == ["MISS1"]
+    assert server.counts["/BatchSearch/v3/ProductDetails"] == 1
+    assert server.counts["/products/v4/search/keyword"] == 2
+
+
+def test_batch_forbidden_falls_back_to_keyword_search(api):
+    server, url = api
+    server.batch_enabled = False
+    results = search([f"R{i}" for i in range(7)], url, batch_size=2)
+    assert all(r.status == "found" and r.source == "keyword" for r in results)
+    # Only the first chunk probes the batch endpoint
+    assert server.counts["/BatchSearch/v3/ProductDetails"] == 1
+    assert server.counts["/products/v4/search/keyword"] == 7
+
+
+def test_cache_serves_repeat_searches(api, tmp_path):
+    server, url = api
+    cache = PartCache(tmp_path / "parts.sqlite3")
+    first = search(["R1", "MISS1"], url, cache=cache)
+    requests = sum(server.counts.values())
+    second = search(["r1 ", "MISS1"], url, cache=cache)
+    assert sum(server.counts.values()) == requests
+    assert [r.source for r in second] == ["cache", "cache"]
+    assert [r.status for r in second] == [r.status for r in first] == ["found", "miss"]
+    assert second[0].record == first[0].record
+    cache.close()
+
+
+def test_fully_cached_search_skips_the_api(api, tmp_path):
+    server, url = api
+    cache = PartCache(tmp_path / "parts.sqlite3")
+    cache.put("R1", {"Part Number": "R1"})
+    results = search(["R1"], url, cache=cache)
+    assert results.records == [{"Part Number": "R1"}]
+    assert sum(server.counts.values()) == 0
+    cache.close()
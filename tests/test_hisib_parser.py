@@ -0,0 +1,116 @@
+import os
+from pathlib import Path
+
+import pytest
+
+import hisib_parser
+from hisib_parser import (DISCONNECTS, ERRORS, SHUTDOWNS, iter_blocks, iter_events, parse_log,
+                          read_new_events, scan_new_events)
+
+SINON_LOG = Path(__file__).resolve().parent.parent / "Siemens" / "SINON.log"
+
+LOG = (
+    "[D]250203 12:00:00 Start\n"
+    "[D]250203 12:00:01 IntMsgHandlerHisib::checkAndReportHISIBDisconect: Detected HISIB Disconnect \n"
+    "\n"
+    "[D]250203 12:00:01 Last SampleNo before disconnect = 5000 \n"
+    "\n"
+    "[D]250203 12:00:01 First SampleNo after reconnect = 12 \n"
+    "[I]250203 12:00:02 Command channel: Client shutdown \n"
+    "[D]250203 12:00:03 DataHandler::setHisibErrorStatus: 0x40000012\n"
+    "[D]250203 12:00:04 DataHandler::setHisibErrorStatus: 0x0\n"
+    "[D]250203 12:00:05 DataHandler::setHisibErrorStatus = 0x4000000A\n"
+    "[D]250203 12:00:06 DataHandler::setHisibErrorStatus = 0x40000000\n"
+    "[D]250203 12:00:07 DataHandler::setHisibErrorStatus: 0x4000007F\n"
+)
+
+
+def write(path, text):
+    with open(path, "ab") as f:
+        f.write(text.encode())
+
+
+def test_sinon_log():
+    events = parse_log(SINON_LOG)
+    assert len(events[DISCONNECTS]) == 6
+    assert len(events[SHUTDOWNS]) == 23
+    assert events[DISCONNECTS][0] == {
+        "Date": "03-Feb-25", "Time": "12:39:48",
+        "Last Sample No. before disconnect": "5138896", "First Sample No. after reconnect": "14432",
+    }
+    assert events[SHUTDOWNS][0] == {"Date": "250203", "Time": "12:39:48"}
+    # Its six clears of the error status are not errors
+    assert events[ERRORS] == [{"Error code": "12", "Error name": "HS_WDOG_TIMEOUT_ERROR"}] * 6
+
+
+def test_error_status_lines(tmp_path):
+    path = tmp_path / "SINON.log"
+    write(path, LOG)
+    events = parse_log(path)
+    assert events[ERRORS] == [
+        {"Error code": "12", "Error name": "HS_WDOG_TIMEOUT_ERROR"},
+        {"Error code": "A", "Error name": "HS_NBP_INIT_ERROR"},
+        {"Error code": "7F", "Error name": "Unknown error code 7F"},
+    ]
+    assert events[DISCONNECTS][0]["Last Sample No. before disconnect"] == "5000"
+    assert events[DISCONNECTS][0]["First Sample No. after reconnect"] == "12"
+
+
+@pytest.mark.parametrize("block_size", [1, 40, 200])
+def test_blocks_split_anywhere(tmp_path, block_size):
+    path = tmp_path / "SINON.log"
+    write(path, LOG * 3)
+    with open(path, "rb") as f:
+        events = list(iter_events(iter_blocks(f, block_size)))
+    expected = parse_log(path)
+    assert [record for kind, record in events if kind == DISCONNECTS] == expected[DISCONNECTS]
+    assert len(events) == sum(len(v) for v in expected.values()) == 15
+
+
+def test_parallel_parse_matches_streaming(tmp_path, monkeypatch):
+    path = tmp_path / "SINON.log"
+    write(path, SINON_LOG.read_text(encoding="utf-8", errors="replace") * 3)
+    monkeypatch.setattr(hisib_parser, "PARALLEL_MIN_BYTES", 0)
+    assert parse_log(path, workers=2) == parse_log(path)
+
+
+def test_follow_mode_reads_only_new_events(tmp_path):
+    path = tmp_path / "SINON.log"
+    lines = LOG.splitlines(keepends=True)
+    # Stop inside the disconnect block and in the middle of a line
+    write(path, "".join(lines[:3]) + lines[3][:10])
+    events, state = read_new_events(path)
+    assert events == {DISCONNECTS: [], SHUTDOWNS: [], ERRORS: []}
+
+    write(path, lines[3][10:] + "".join(lines[4:8]))
+    events, state = read_new_events(path, state)
+    assert events[DISCONNECTS][0]["First Sample No. after reconnect"] == "12"
+    assert len(events[SHUTDOWNS]) == len(events[ERRORS]) == 1
+
+    events, state = read_new_events(path, state)
+    assert sum(len(v) for v in events.values()) == 0
+
+    write(path, "".join(lines[8:]))
+    events, state = read_new_events(path, state)
+    assert [e["Error code"] for e in events[ERRORS]] == ["A", "7F"]
+
+
+def test_follow_mode_after_rotation(tmp_path):
+    path = tmp_path / "SINON.log"
+    lines = LOG.splitlines(keepends=True)
+    write(path, "".join(lines[:7]))
+    _, state = scan_new_events(path)
+    write(path, lines[7])
+    os.rename(path, tmp_path / "SINON.log.1")
+    write(path, lines[9])
+    events, state = scan_new_events(path, state)
+    assert [record["Error code"] for _, kind, record, _ in events] == ["12", "A"]
+
+
+def test_follow_mode_after_rewrite(tmp_path):
+    path = tmp_path / "SINON.log"
+    write(path, LOG)
+    _, state = scan_new_events(path)
+    path.write_bytes(LOG.replace("12:00:01", "13:00:01").encode())
+    events, _ = scan_new_events(path, state)
+    assert len(events) == 5
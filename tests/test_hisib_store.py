@@ -0,0 +1,83 @@
+import pytest
+
+import hisib_store
+
+
+def event_lines(stamp, kind, value=0):
+    """Log lines of one event, each followed by a blank line as in SINON.log."""
+    if kind == "disconnect":
+        return (f"[D]{stamp} Detected HISIB Disconnect \n\n"
+                f"[D]{stamp} Last SampleNo before disconnect = {value} \n\n"
+                f"[D]{stamp} First SampleNo after reconnect = {value + 100} \n\n")
+    if kind == "shutdown":
+        return f"[I]{stamp} Command channel: Client shutdown \n\n"
+    return f"[D]{stamp} DataHandler::setHisibErrorStatus: 0x{0x40000000 + value:X}\n\n"
+
+
+LOG = "".join([
+    event_lines("250201 10:15:00", "disconnect", 1000),
+    event_lines("250201 10:30:00", "error", 0x12),
+    event_lines("250201 10:31:00", "error", 0),
+    event_lines("250201 11:05:00", "shutdown"),
+    event_lines("250202 09:00:00", "error", 0x12),
+    event_lines("250202 09:30:00", "error", 0x8),
+    event_lines("250202 09:45:00", "disconnect", 5000),
+])
+
+
+@pytest.fixture
+def store(tmp_path):
+    log = tmp_path / "SINON.log"
+    log.write_text(LOG, encoding="utf-8")
+    conn = hisib_store.connect(str(tmp_path / "events.sqlite"))
+    assert hisib_store.ingest(conn, log) == 6
+    yield conn, log
+    conn.close()
+
+
+def test_counts(store):
+    conn, _ = store
+    totals = {r["type"]: r["count"] for r in hisib_store.counts(conn)}
+    assert totals == {"disconnect": 2, "error": 3, "shutdown": 1}
+    by_day = [(r["period"], r["type"], r["count"]) for r in hisib_store.counts(conn, by="day")]
+    assert by_day == [("2025-02-01", "disconnect", 1), ("2025-02-01", "error", 1), ("2025-02-01", "shutdown", 1),
+                      ("2025-02-02", "disconnect", 1), ("2025-02-02", "error", 2)]
+
+
+def test_counts_over_partial_hours_match_hourly_rollup(store):
+    conn, _ = store
+    whole = hisib_store.counts(conn, "2025-02-01 10", "2025-02-02 09")
+    partial = hisib_store.counts(conn, "2025-02-01 10:00:00", "2025-02-01 10:59:59")
+    assert {r["type"]: r["count"] for r in whole} == {"disconnect": 1, "error": 1, "shutdown": 1}
+    assert {r["type"]: r["count"] for r in partial} == {"disconnect": 1, "error": 1}
+
+
+def test_error_histogram(store):
+    conn, _ = store
+    assert hisib_store.error_histogram(conn) == [
+        {"code": "12", "name": "HS_WDOG_TIMEOUT_ERROR", "count": 2},
+        {"code": "8", "name": "HS_SPO2_CONN_ERROR", "count": 1},
+    ]
+    assert hisib_store.error_histogram(conn, "2025-02-02 09:15") == [
+        {"code": "8", "name": "HS_SPO2_CONN_ERROR", "count": 1},
+    ]
+
+
+def test_gaps(store):
+    conn, log = store
+    gaps = hisib_store.gaps(conn)
+    assert [(g["ts"], g["gap"]) for g in gaps] == [("2025-02-01 10:15:00", 100), ("2025-02-02 09:45:00", 100)]
+    assert gaps[0]["log"] == str(log)
+    summary = hisib_store.gap_summary(conn, start="2025-02-02")
+    assert (summary["count"], summary["min"], summary["max"], summary["mean"]) == (1, 100, 100, 100.0)
+
+
+def test_ingest_is_incremental(store):
+    conn, log = store
+    assert hisib_store.ingest(conn, log) == 0
+    with open(log, "a", encoding="utf-8") as f:
+        f.write(event_lines("250203 08:00:00", "error", 0x12))
+    assert hisib_store.ingest(conn, log) == 1
+    assert hisib_store.error_histogram(conn)[0]["count"] == 3
+    by_month = hisib_store.counts(conn, by="month")
+    assert sum(r["count"] for r in by_month) == 7
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+
+from job_queue import JobCancelled, JobQueue, QueueFull
+
+
+def wait_for(queue, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_jobs_run_and_record_their_summary(tmp_path):
+    queue = JobQueue(lambda job, cancel: {"file": job["filename"]}, tmp_path / "jobs.sqlite3", workers=1)
+    queue.start()
+    job = wait_for(queue, queue.submit("alice", "bom.csv"))
+    assert job["status"] == "completed"
+    assert job["summary"] == {"file": "bom.csv"}
+    assert job["started_at"] and job["finished_at"]
+
+
+def test_failed_jobs_keep_their_error(tmp_path):
+    def run_job(job, cancel):
+        raise RuntimeError("bad BOM")
+
+    queue = JobQueue(run_job, tmp_path / "jobs.sqlite3", workers=1)
+    queue.start()
+    job = wait_for(queue, queue.submit("alice", "bom.csv"))
+    assert (job["status"], job["error"]) == ("error", "bad BOM")
+
+
+def test_queue_limits(tmp_path):
+    queue = JobQueue(None, tmp_path / "jobs.sqlite3", max_queued=3, max_per_user=2)
+    queue.submit("alice", "1.csv")
+    queue.submit("alice", "2.csv")
+    with pytest.raises(QueueFull):
+        queue.submit("alice", "3.csv")
+    queue.submit("bob", "1.csv")
+    with pytest.raises(QueueFull):
+        queue.submit("carol", "1.csv")
+    assert queue.stats()["queued_per_user"] == {"alice": 2, "bob": 1}
+
+
+def test_users_are_served_round_robin(tmp_path):
+    order = []
+    started, gate = threading.Event(), threading.Event()
+
+    def run_job(job, cancel):
+        order.append(job["filename"])
+        started.set()
+        gate.wait(5)
+
+    queue = JobQueue(run_job, tmp_path / "jobs.sqlite3", workers=1)
+    queue.start()
+    queue.submit("alice", "a1")
+    assert started.wait(5)
+    for name in ("a2", "a3"):
+        queue.submit("alice", name)
+    last = queue.submit("bob", "b1")
+    gate.set()
+    wait_for(queue, last)
+    wait_for(queue, queue.list(user="alice")[0]["job_id"])
+    assert order == ["a1", "a2", "b1", "a3"]
+
+
+def test_cancel_queued_and_running_jobs(tmp_path):
+    started = threading.Event()
+
+    def run_job(job, cancel):
+        started.set()
+        if not cancel.wait(5):
+            return {}
+        raise JobCancelled()
+
+    queue = JobQueue(run_job, tmp_path / "jobs.sqlite3", workers=1)
+    queue.start()
+    running = queue.submit("alice", "1.csv")
+    assert started.wait(5)
+    queued = queue.submit("alice", "2.csv")
+    assert queue.cancel(queued) == "queued"
+    assert queue.get(queued)["status"] == "cancelled"
+    assert queue.cancel(running) == "running"
+    assert wait_for(queue, running)["status"] == "cancelled"
+    assert queue.cancel(running) is None
+
+
+def test_unfinished_jobs_are_requeued_on_restart(tmp_path):
+    db = tmp_path / "jobs.sqlite3"
+    job_id = JobQueue(None, db).submit("alice", "bom.csv")
+    queue = JobQueue(lambda job, cancel: {}, db, workers=1)
+    assert queue.start() == 1
+    assert wait_for(queue, job_id)["status"] == "completed"
+
+
+def test_schema_has_no_part_list(tmp_path):
+    queue = JobQueue(None, tmp_path / "jobs.sqlite3")
+    columns = [row[1] for row in queue._conn.execute("PRAGMA table_info(jobs)")]
+    assert "part_numbers" not in columns
+    assert "filename" in columns
@@ -0,0 +1,66 @@
+from unittest import mock
+
+import pytest
+
+import json_table
+from json_table import CategorizedTables, CategoryIndex, VirtualTable
+
+
+@pytest.fixture(autouse=True)
+def ttk(monkeypatch):
+    """Stand-in for tkinter.ttk, so the tables run without a display."""
+    fake = mock.MagicMock()
+    for widget in ("Treeview", "Scrollbar", "Frame", "Notebook", "Label"):
+        getattr(fake, widget).side_effect = lambda *args, **kwargs: mock.MagicMock()
+    monkeypatch.setattr(json_table, "ttk", fake)
+    return fake
+
+
+def test_virtual_table_renders_only_visible_rows():
+    table = VirtualTable(mock.MagicMock(), ["Part Number", "Mfr"], height_rows=5)
+    table.set_rows([{"Part Number": f"R{i}", "Mfr": "Yageo"} for i in range(1000)])
+    assert len(table._slots) == 5
+    table.scroll(998)
+    assert table.offset == 995
+    table.tree.item.assert_called_with(table._slots[-1], values=["R999", "Yageo"])
+    table.append([{"Part Number": "R-LONGEST-PART-NUMBER", "Mfr": "Yageo"}])
+    assert table._longest["Part Number"] == len("R-LONGEST-PART-NUMBER")
+
+
+def test_set_rows_replaces_columns():
+    table = VirtualTable(mock.MagicMock(), ["Part Number", "Mfr"])
+    table.set_rows([{"Part Number": "F1", "Mfr": "Sunon", "Airflow": "10.5 CFM"}], ["Part Number", "Mfr", "Airflow"])
+    assert table.columns == ["Part Number", "Mfr", "Airflow"]
+    table.tree.configure.assert_any_call(columns=["Part Number", "Mfr", "Airflow"])
+    assert table._longest["Airflow"] == len("10.5 CFM")
+    table.tree.item.assert_called_with(table._slots[0], values=["F1", "Sunon", "10.5 CFM"])
+
+
+def test_category_index():
+    index = CategoryIndex()
+    added = index.add([
+        {"Part Number": "R1", "Mfr": "Yageo", "Category": "Chip Resistor - Surface Mount",
+         "Resistance": "10 kOhms", "Tolerance": "±1%"},
+        {"Part Number": "C1", "Mfr": "Murata", "Capacitance": "100nF"},
+        {"Part Number": "F1", "Mfr": "Sunon", "Category": "Fans", "Airflow": "10 CFM"},
+        {"Part Number": "X1", "Mfr": "Acme"},
+    ])
+    assert {c: len(rows) for c, rows in added.items()} == {"Resistors": 1, "Capacitors": 1, "Fans": 1, "Others": 1}
+    assert index.columns("Resistors")[:4] == ["Part Number", "Mfr", "Resistance", "Tolerance"]
+    assert index.columns("Fans") == ["Part Number", "Mfr", "Airflow"]
+    assert sorted(added, key=index.sort_key) == ["Capacitors", "Resistors", "Fans", "Others"]
+
+
+def test_replaced_rows_bring_columns_from_later_batches():
+    tables = CategorizedTables(mock.MagicMock())
+    tables.nb.select.side_effect = lambda: str(tables.frames["Fans"])
+    first = [{"Part Number": "F1", "Mfr": "Sunon", "Category": "Fans", "Airflow": "10 CFM"}]
+    later = [{"Part Number": "F2", "Mfr": "Sunon", "Category": "Fans", "Noise": "25 dB"}]
+    tables.append(first)
+    table = tables.tables["Fans"]
+    assert table.columns == ["Part Number", "Mfr", "Airflow"]
+    tables.append(later)
+    assert len(table.rows) == 2
+    tables.set_rows(first + later)
+    assert table.columns == ["Part Number", "Mfr", "Airflow", "Noise"]
+    table.tree.configure.assert_any_call(columns=["Part Number", "Mfr", "Airflow", "Noise"])
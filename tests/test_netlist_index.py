@@ -0,0 +1,79 @@
+import pytest
+
+from bom_reader import BomLine
+from netlist_index import NetlistIndex
+
+NETLIST = """<?xml version="1.0" encoding="utf-8"?>
+<export version="D">
+  <components>
+    <comp ref="R1"><value>10k</value><footprint>R_0603</footprint>
+      <fields><field name="MPN">RC0603FR-0710KL</field></fields></comp>
+    <comp ref="C1"><value>100n</value><footprint>C_0603</footprint></comp>
+    <comp ref="U1"><value>LM317</value></comp>
+  </components>
+  <nets>
+    <net code="1" name="/VIN"><node ref="U1" pin="3"/><node ref="C1" pin="1"/></net>
+    <net code="2" name="GND"><node ref="C1" pin="2"/><node ref="R1" pin="2"/></net>
+    <net code="3" name="/ADJ"><node ref="U1" pin="1"/><node ref="R1" pin="1"/></net>
+    <net code="4"><node ref="U1" pin="2"/></net>
+  </nets>
+</export>
+"""
+
+
+@pytest.fixture
+def netlist_path(tmp_path):
+    path = tmp_path / "design.xml"
+    path.write_text(NETLIST, encoding="utf-8")
+    return path
+
+
+def test_parse(netlist_path):
+    index = NetlistIndex.parse(netlist_path)
+    assert index.stats()["components"] == 3
+    assert index.stats()["nets"] == 4
+    assert index.stats()["pins"] == 7
+    assert index.pins_of("GND") == [("C1", "2"), ("R1", "2")]
+    assert index.nets_of("U1") == {"3": "/VIN", "1": "/ADJ", "2": "Net-4"}
+    assert index.components_on("/ADJ") == ["U1", "R1"]
+    assert index.component("R1")["mpn"] == "RC0603FR-0710KL"
+    assert index.component("C1")["footprint"] == "C_0603"
+
+
+def test_invalid_xml(tmp_path):
+    path = tmp_path / "broken.xml"
+    path.write_text("<export><nets>", encoding="utf-8")
+    with pytest.raises(ValueError, match="Invalid netlist XML"):
+        NetlistIndex.parse(path)
+
+
+def test_load_uses_the_cache_for_unchanged_files(netlist_path, tmp_path):
+    cache_dir = tmp_path / "cache"
+    first = NetlistIndex.load(netlist_path, cache_dir)
+    second = NetlistIndex.load(netlist_path, cache_dir)
+    assert not first.cached and second.cached
+    assert second.source_hash == first.source_hash
+    assert second.pins_of("/VIN") == first.pins_of("/VIN")
+    netlist_path.write_text(NETLIST.replace("100n", "1u"), encoding="utf-8")
+    third = NetlistIndex.load(netlist_path, cache_dir)
+    assert not third.cached
+    assert third.component("C1")["value"] == "1u"
+
+
+def test_corrupt_cache_is_rebuilt(netlist_path, tmp_path):
+    cache_dir = tmp_path / "cache"
+    index = NetlistIndex.load(netlist_path, cache_dir)
+    for path in cache_dir.iterdir():
+        path.write_bytes(b"not an npz file")
+    rebuilt = NetlistIndex.load(netlist_path, cache_dir)
+    assert not rebuilt.cached
+    assert rebuilt.stats()["pins"] == index.stats()["pins"]
+
+
+def test_link_bom(netlist_path):
+    index = NetlistIndex.parse(netlist_path)
+    lines = [BomLine(1, "RC0603FR-0710KL", ref_designators=["R1"]),
+             BomLine(2, "CL10B104", ref_designators=["C1", "C2"])]
+    assert index.link_bom(lines) == (["U1"], ["C2"])
+    assert index.component("C1")["bom_line"] == 2
+    assert index.component("U1")["bom_line"] is None
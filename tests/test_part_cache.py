@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from part_cache import PartCache, cache_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PartCache(tmp_path / "parts.sqlite3")
+    yield cache
+    cache.close()
+
+
+def test_cache_key():
+    assert cache_key("  rc0603fr-0710kl\t") == "RC0603FR-0710KL"
+
+
+def test_hits_and_remembered_misses(cache):
+    cache.put("r1", {"Part Number": "R1"})
+    cache.put_miss("MISS1")
+    assert cache.get(" R1 ") == (True, {"Part Number": "R1"})
+    assert cache.get("miss1") == (True, None)
+    assert cache.get("R2") == (False, None)
+    assert cache.get_many(["R1", "r1", "MISS1", "R2"]) == {"R1": {"Part Number": "R1"}, "MISS1": None}
+    assert cache.stats()["hits"] == 2
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = PartCache(tmp_path / "parts.sqlite3", ttl=60, negative_ttl=0)
+    cache.put("R1", {"Part Number": "R1"})
+    cache.put_miss("MISS1")
+    assert cache.get_many(["R1", "MISS1"]) == {"R1": {"Part Number": "R1"}}
+    assert len(cache) == 1
+    cache.close()
+
+
+def test_purge_expired(tmp_path):
+    cache = PartCache(tmp_path / "parts.sqlite3", ttl=0.05)
+    cache.put_many([("R1", {}), ("R2", {})])
+    time.sleep(0.1)
+    assert cache.purge_expired() == 2
+    assert len(cache) == 0
+    cache.close()
+
+
+def test_least_recently_used_rows_are_evicted(tmp_path):
+    cache = PartCache(tmp_path / "parts.sqlite3", max_entries=2)
+    cache.put("R1", {})
+    time.sleep(0.01)
+    cache.put("R2", {})
+    time.sleep(0.01)
+    cache.get("R1")
+    cache.put("R3", {})
+    assert set(cache.get_many(["R1", "R2", "R3"])) == {"R1", "R3"}
+    assert cache.stats()["evictions"] == 1
+    cache.close()
+
+
+def test_lookups_of_many_parts(cache):
+    # More keys than SQLite allows in one statement
+    cache.put_many((f"R{i}", {"i": i}) for i in range(1200))
+    found = cache.get_many(f"r{i}" for i in range(1500))
+    assert len(found) == 1200
+    assert found["R1199"] == {"i": 1199}
+
+
+def test_records_skip_misses(cache):
+    cache.put("R1", {"Part Number": "R1"})
+    cache.put_miss("MISS1")
+    assert cache.records() == [("R1", {"Part Number": "R1"})]
@@ -0,0 +1,122 @@
+from pathlib import Path
+
+import pytest
+
+from bom_reader import BomLine
+from netlist_index import NetlistIndex
+from part_params import normalize_record
+from rules_engine import RuleChecker, compile_rules, load_rules
+
+CONSTRAINTS_CSV = Path(__file__).resolve().parent.parent / "WCCA_WEB" / "Constraints.yaml"
+
+RULES = """
+derating:
+  resistors: {power: 0.5}
+operating_temperature: [-40, 85]
+allowed_manufacturers: [Yageo, Texas Instruments]
+manufacturer_aliases: {TI: Texas Instruments}
+nets: {/VIN: 12, GND: 0}
+floating_nets: true
+"""
+
+NETLIST = """<export>
+  <components><comp ref="R1"/><comp ref="R2"/></components>
+  <nets>
+    <net name="/VIN"><node ref="R1" pin="1"/><node ref="R2" pin="1"/></net>
+    <net name="GND"><node ref="R1" pin="2"/></net>
+    <net name="/FB"><node ref="R2" pin="2"/></net>
+  </nets>
+</export>
+"""
+
+
+def resistor(part, ohms, watts="0.1W", temperature="-55°C ~ 155°C", mfr="Yageo"):
+    return {"Part Number": part, "Mfr": mfr, "Resistance": ohms, "Power (Watts)": watts,
+            "Operating Temperature": temperature}
+
+
+def parts(*records):
+    return {r["Part Number"].upper(): normalize_record(r) for r in records}
+
+
+def rules_of(report):
+    return [(v["rule"], v.get("ref") or v.get("net")) for v in report["violations"]]
+
+
+@pytest.fixture
+def netlist(tmp_path):
+    path = tmp_path / "design.xml"
+    path.write_text(NETLIST, encoding="utf-8")
+    return NetlistIndex.parse(path)
+
+
+def test_approved_vendor_csv():
+    plan = load_rules(CONSTRAINTS_CSV)
+    assert plan.names == ["approved_alternates"]
+    lines = [
+        BomLine(1, "UCC3946D", "Texas Instruments", ["UCC2946DTR"], ["U1"]),
+        BomLine(2, "LTV-815S", "Acme", [], ["U2"]),
+        BomLine(3, "UCC3946D", "Texas Instruments", ["LTV-815S-TA"], ["U3"]),
+    ]
+    report = RuleChecker(plan, lines, {}).report()
+    assert [(v["line_no"], v["message"]) for v in report["violations"]] == [
+        (2, "manufacturer 'Acme' is not approved for LTV-815S"),
+        (3, "alternate LTV-815S-TA is not an approved alternate of UCC3946D"),
+    ]
+
+
+def test_yaml_rules(netlist):
+    lines = [
+        BomLine(1, "RC-1K", "Yageo", ref_designators=["R1"]),
+        BomLine(2, "RC-10K", "TI", ref_designators=["R2"]),
+        BomLine(3, "RC-HOT", "Acme", ref_designators=["R3"]),
+    ]
+    catalog = parts(resistor("RC-1K", "1 kOhms"), resistor("RC-10K", "10 kOhms"),
+                    resistor("RC-HOT", "10 kOhms", temperature="0°C ~ 70°C"))
+    report = RuleChecker(compile_rules(RULES), lines, catalog, netlist).report()
+    # R1 dissipates 144 mW across /VIN-GND; R2's other end is on an unknown net
+    assert rules_of(report) == [
+        ("derating.resistors.power", "R1"),
+        ("operating_temperature", "R3"),
+        ("allowed_manufacturers", "R3"),
+        ("floating_nets", "GND"),
+        ("floating_nets", "/FB"),
+    ]
+    assert report["summary"]["errors"] == 3
+    assert report["summary"]["warnings"] == 2
+
+
+def test_required_nets(netlist):
+    plan = compile_rules("nets: {/VIN: 12, /VOUT: 5}")
+    report = RuleChecker(plan, [], {}, netlist).report()
+    assert rules_of(report) == [("nets", "/VOUT")]
+
+
+def test_incremental_rechecks():
+    plan = compile_rules(RULES)
+    lines = [BomLine(1, "RC-1K", "Yageo", ref_designators=["R1", "R2"]),
+             BomLine(2, "RC-10K", "Yageo", ref_designators=["R3"])]
+    checker = RuleChecker(plan, lines, parts(resistor("RC-1K", "1 kOhms"), resistor("RC-10K", "10 kOhms")))
+    assert checker.report()["violations"] == []
+
+    assert checker.update_line(BomLine(2, "RC-10K", "Vishay Dale", ref_designators=["R3", "R4"])) == 2
+    assert rules_of(checker.report()) == [("allowed_manufacturers", "R3"), ("allowed_manufacturers", "R4")]
+
+    assert checker.update_part(resistor("rc-1k", "1 kOhms", temperature="0°C ~ 70°C")) == 2
+    assert rules_of(checker.report()) == [
+        ("operating_temperature", "R1"), ("operating_temperature", "R2"),
+        ("allowed_manufacturers", "R3"), ("allowed_manufacturers", "R4"),
+    ]
+    assert checker.report()["summary"]["rows"] == 4
+
+
+@pytest.mark.parametrize("text, message", [
+    ("derating: {resistors: {current: 0.5}}", "Unknown derating parameter"),
+    ("derating: {inductors: {power: 0.5}}", "Unknown derating category"),
+    ("operating_temperature: 85", "Malformed constraints"),
+    ("- just\n- a list", "must be a YAML mapping"),
+    ("derating: [", "Invalid constraints YAML"),
+])
+def test_malformed_constraints(text, message):
+    with pytest.raises(ValueError, match=message):
+        compile_rules(text)
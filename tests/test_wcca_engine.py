@@ -0,0 +1,76 @@
+import pytest
+
+from wcca_engine import analysis_from_spec, parts_by_number
+
+DIVIDER = {
+    "variables": {
+        "VREF": {"nominal": 1.25, "tolerance": 0.01},
+        "R1": {"nominal": 10e3, "tolerance": 0.01},
+        "R2": {"nominal": 30e3, "tolerance": 0.01},
+    },
+    "nodes": {
+        "VOUT": {"expr": "VREF * (1 + R2 / R1)", "min": 4.9, "max": 5.1},
+        "I_DIV": "VOUT / (R1 + R2)",
+    },
+}
+
+
+def test_divider_nominal_eva_and_rss():
+    report = analysis_from_spec(DIVIDER).run(samples=2000, seed=1)
+    vout = report["nodes"]["VOUT"]
+    assert vout["nominal"] == pytest.approx(5.0)
+    # Worst case: VREF high, R2 high and R1 low
+    assert vout["eva"]["max"] == pytest.approx(1.25 * 1.01 * (1 + 30e3 * 1.01 / (10e3 * 0.99)))
+    assert vout["eva"]["min"] < vout["rss"]["min"] < 5.0 < vout["rss"]["max"] < vout["eva"]["max"]
+    assert vout["eva"]["min"] <= vout["monte_carlo"]["min"] <= vout["monte_carlo"]["max"] <= vout["eva"]["max"]
+    assert vout["eva"]["pass"] is False and vout["rss"]["pass"] is True
+    assert report["nodes"]["I_DIV"]["nominal"] == pytest.approx(5.0 / 40e3)
+
+
+def test_eva_with_more_variables_than_corners():
+    names = [f"R{i}" for i in range(14)]
+    spec = {"variables": {n: {"nominal": 1.0, "tolerance": 0.1} for n in names},
+            "nodes": {"SUM": " + ".join(names)}}
+    eva = analysis_from_spec(spec).eva()["SUM"]
+    assert eva["method"] == "sensitivity"
+    assert (eva["min"], eva["max"]) == pytest.approx((14 * 0.9, 14 * 1.1))
+
+
+def test_analysis_without_variables():
+    report = analysis_from_spec({"nodes": {"TWO": "1 + 1", "FOUR": "TWO * 2"}}).run(samples=10, seed=1)
+    four = report["nodes"]["FOUR"]
+    assert four["nominal"] == four["eva"]["min"] == four["eva"]["max"] == 4.0
+    assert four["rss"]["min"] == four["rss"]["max"] == 4.0
+    assert four["monte_carlo"]["std"] == 0.0
+
+
+def test_names_bound_to_bom_parts():
+    records = [{"Part Number": "RC0603-10K", "Category": "Chip Resistor - Surface Mount",
+                "Resistance": "10 kOhms", "Tolerance": "±1%", "Temperature Coefficient": "±100ppm/°C"}]
+    spec = {"temperature": [-40, 125], "nodes": {"I": "5 / R3"}}
+    analysis = analysis_from_spec(spec, parts_by_number(records), {"R3": "rc0603-10k"})
+    r3 = analysis.variables["R3"]
+    assert r3.nominal == pytest.approx(10e3)
+    assert r3.part_number == "RC0603-10K"
+    low, high = r3.bounds(analysis.temperature)
+    assert low == pytest.approx(10e3 * (1 - 0.01 - 100e-6 * 100))
+    assert high == pytest.approx(10e3 * (1 + 0.01 + 100e-6 * 100))
+
+
+@pytest.mark.parametrize("spec, message", [
+    ([], "must be an object"),
+    ({"nodes": []}, "'nodes' must be an object"),
+    ({"nodes": {"A": "1"}, "variables": ["R1"]}, "'variables' must be an object"),
+    ({"nodes": {}}, "defines no nodes"),
+    ({"nodes": {"A": {"min": 1}}}, "has no 'expr'"),
+    ({"nodes": {"A": 5}}, "must be an expression"),
+    ({"nodes": {"A": "R1 +"}}, "Invalid expression"),
+    ({"nodes": {"A": "__import__('os')"}}, "Unsupported function call"),
+    ({"nodes": {"A": "R9"}}, "neither a declared variable"),
+    ({"nodes": {"A": "B", "B": "A"}}, "Circular node definitions"),
+    ({"nodes": {"A": "R1"}, "variables": {"R1": {"tolerance": 0.1}}}, "has no 'nominal'"),
+    ({"nodes": {"A": "1"}, "distribution": "cauchy"}, "distribution must be one of"),
+])
+def test_malformed_specs(spec, message):
+    with pytest.raises(ValueError, match=message):
+        analysis_from_spec(spec)